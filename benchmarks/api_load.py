@@ -0,0 +1,254 @@
+"""Load the API endpoints one at a time and report latency, throughput and queries.
+
+Drives the app from main.py in-process through httpx's ASGI transport, against
+the database configured in dev.conf (fill it with benchmarks.seed first).
+Each endpoint gets a warm-up and then a measured phase with ``--concurrency``
+clients; request parameters are drawn from a seeded RNG so runs are
+repeatable. SQL statements are counted per request through a context
+variable, so concurrent requests do not mix their counts; statements run on
+the group-commit writer thread are not attributed to a request.
+
+Results are JSON (see benchmarks.compare to diff two runs).
+
+Usage (from a directory with dev.conf):
+    python -m benchmarks.api_load --requests 500 --concurrency 8 --output run.json
+    python -m benchmarks.api_load --endpoints properties.list,properties.detail --writes
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import event, func
+from sqlalchemy.engine import Engine
+
+from benchmarks.login_load import summarize
+from benchmarks.seed import ADMIN_EMAIL, BENCH_PASSWORD, CITIES, WORDS
+from core.config import DATABASE_URL
+from database.models import Booking, Property, Review, User
+from database.session import SessionLocal
+from main import app
+
+PROPERTY = "/rest/v1/property/properties"
+BOOKING = "/rest/v1/booking"
+
+_statements = contextvars.ContextVar("bench_statements", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def _stay(rng: random.Random, nights: int = 3):
+    start = date.today() + timedelta(days=rng.randint(200, 500))
+    return start, start + timedelta(days=nights)
+
+
+def _stay_params(rng: random.Random) -> str:
+    start, end = _stay(rng)
+    return f"start_date={start}&end_date={end}"
+
+
+# name -> (method, request builder taking (rng, ctx) and returning (path, json body), statuses that count as success)
+ENDPOINTS = {
+    "properties.list": ("GET", lambda rng, ctx: (f"{PROPERTY}?limit=50", None), {200}),
+    "properties.list_price": ("GET", lambda rng, ctx: (
+        f"{PROPERTY}?sort_by=price&min_price={rng.randint(40, 120)}&max_price={rng.randint(150, 400)}&limit=50", None,
+    ), {200}),
+    "properties.list_city": ("GET", lambda rng, ctx: (f"{PROPERTY}?city={rng.choice(CITIES)[0]}&limit=50", None), {200}),
+    "properties.list_rating": ("GET", lambda rng, ctx: (
+        f"{PROPERTY}?sort_by=rating&descending=true&limit=20", None,
+    ), {200}),
+    "properties.list_stay": ("GET", lambda rng, ctx: (f"{PROPERTY}?{_stay_params(rng)}&limit=20", None), {200}),
+    "properties.search": ("GET", lambda rng, ctx: (
+        f"{PROPERTY}?q={'+'.join(rng.sample(WORDS, rng.randint(1, 2)))}&limit=20", None,
+    ), {200}),
+    "properties.nearby": ("GET", lambda rng, ctx: (
+        f"{PROPERTY}/nearby?near={ctx['near'](rng)}&radius_km={rng.choice([2, 5, 10])}&limit=50", None,
+    ), {200}),
+    "properties.get": ("GET", lambda rng, ctx: (f"{PROPERTY}/{ctx['property'](rng)}", None), {200}),
+    "properties.detail": ("GET", lambda rng, ctx: (f"{PROPERTY}/{ctx['property'](rng)}/detail", None), {200}),
+    "images.list": ("GET", lambda rng, ctx: (
+        f"/rest/v1/property-image/properties/{ctx['property'](rng)}/images", None,
+    ), {200}),
+    "amenities.list": ("GET", lambda rng, ctx: ("/rest/v1/amenity/amenities", None), {200}),
+    "booking.availability": ("GET", lambda rng, ctx: (
+        f"{BOOKING}/properties/{ctx['property'](rng)}/availability?{_stay_params(rng)}&nights=3", None,
+    ), {200}),
+    "booking.quote": ("GET", lambda rng, ctx: (
+        f"{BOOKING}/properties/{ctx['property'](rng)}/quote?{_stay_params(rng)}", None,
+    ), {200}),
+    "booking.quotes": ("POST", lambda rng, ctx: (f"{BOOKING}/properties/quotes", {
+        "property_ids": [ctx["property"](rng) for _ in range(50)],
+        **dict(zip(("start_date", "end_date"), map(str, _stay(rng, 5)))),
+    }), {200}),
+    "user.me": ("GET", lambda rng, ctx: ("/rest/v1/user/me", None), {200}),
+}
+
+# Only run with --writes: they add rows to the database
+WRITE_ENDPOINTS = {
+    # Lost races and taken dates are expected outcomes, not errors
+    "booking.hold": ("POST", lambda rng, ctx: (f"{BOOKING}/bookings", {
+        "property_id": ctx["property"](rng),
+        **dict(zip(("start_date", "end_date"), map(str, _stay(rng, rng.randint(1, 7))))),
+        "guests": 1,
+    }), {200, 400, 409}),
+    "auth.login": ("POST", lambda rng, ctx: ("/rest/v1/auth/login/", {
+        "email": f"bench-{rng.randint(2, ctx['users'])}@example.com", "password": BENCH_PASSWORD,
+    }), {200}),
+}
+
+
+def _dataset() -> dict:
+    with SessionLocal() as db:
+        return {
+            "users": db.query(func.count(User.user_id)).scalar(),
+            "properties": db.query(func.count(Property.property_id)).scalar(),
+            "bookings": db.query(func.count(Booking.booking_id)).scalar(),
+            "reviews": db.query(func.count(Review.review_id)).scalar(),
+            "max_property_id": db.query(func.max(Property.property_id)).scalar() or 0,
+        }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _client_loop(client, method, build, ok, rng, ctx, remaining, results):
+    while remaining[0] > 0:
+        remaining[0] -= 1
+        path, body = build(rng, ctx)
+        counter = [0]
+        token = _statements.set(counter)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body, headers=ctx["headers"])
+            status = response.status_code
+        except Exception as e:
+            status = type(e).__name__
+        finally:
+            _statements.reset(token)
+        results.append(((time.perf_counter() - started) * 1000, counter[0], status, status in ok))
+
+
+async def _phase(client, spec, ctx, requests, concurrency, seed):
+    method, build, ok = spec
+    remaining = [requests]
+    results = []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _client_loop(client, method, build, ok, random.Random(seed * 1000 + i), ctx, remaining, results)
+        for i in range(concurrency)
+    ))
+    return results, time.perf_counter() - started
+
+
+def _report(results, elapsed) -> dict:
+    succeeded = [latency for latency, _, _, ok in results if ok]
+    queries = sorted(count for _, count, _, _ in results)
+    return {
+        **summarize(succeeded),
+        "requests": len(results),
+        "errors": len(results) - len(succeeded),
+        "status_codes": {str(status): n for status, n in sorted(Counter(r[2] for r in results).items(), key=str)},
+        "throughput_rps": round(len(results) / elapsed, 1) if elapsed else None,
+        "queries_per_request": {
+            "mean": round(sum(queries) / len(queries), 2) if queries else 0,
+            "p50": queries[len(queries) // 2] if queries else 0,
+            "max": queries[-1] if queries else 0,
+        },
+    }
+
+
+async def run(endpoints, requests: int, warmup: int, concurrency: int, seed: int) -> dict:
+    dataset = _dataset()
+    if not dataset["max_property_id"]:
+        raise SystemExit("No properties found; run python -m benchmarks.seed first")
+
+    ctx = {
+        "users": dataset["users"],
+        "property": lambda rng: rng.randint(1, dataset["max_property_id"]),
+        "near": lambda rng: "{:.4f},{:.4f}".format(*rng.choice(CITIES)[2:]),
+        "headers": {},
+    }
+    transport = httpx.ASGITransport(app=app)
+    # The ASGI transport does not send lifespan events
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        response = await client.post("/rest/v1/auth/login/", json={"email": ADMIN_EMAIL, "password": BENCH_PASSWORD})
+        if response.status_code == 200:
+            ctx["headers"] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        report = {}
+        for name, spec in endpoints.items():
+            if warmup:
+                await _phase(client, spec, ctx, warmup, concurrency, seed + 1)
+            results, elapsed = await _phase(client, spec, ctx, requests, concurrency, seed)
+            report[name] = _report(results, elapsed)
+            print(f"{name}: p50 {report[name].get('p50_ms')} ms, p99 {report[name].get('p99_ms')} ms, "
+                  f"{report[name]['throughput_rps']} req/s, {report[name]['queries_per_request']['mean']} queries")
+
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "database": DATABASE_URL.split("://", 1)[0],
+            "dataset": dataset,
+            "requests": requests,
+            "warmup": warmup,
+            "concurrency": concurrency,
+            "seed": seed,
+        },
+        "endpoints": report,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--endpoints", help=f"Comma separated subset of: {', '.join([*ENDPOINTS, *WRITE_ENDPOINTS])}")
+    parser.add_argument("--writes", action="store_true", help="Also run endpoints that write")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    available = {**ENDPOINTS, **(WRITE_ENDPOINTS if args.writes else {})}
+    if args.endpoints:
+        names = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+        unknown = [name for name in names if name not in {**ENDPOINTS, **WRITE_ENDPOINTS}]
+        if unknown:
+            parser.error(f"unknown endpoints: {', '.join(unknown)}")
+        available = {name: {**ENDPOINTS, **WRITE_ENDPOINTS}[name] for name in names}
+
+    result = asyncio.run(run(available, args.requests, args.warmup, args.concurrency, args.seed))
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
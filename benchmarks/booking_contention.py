@@ -0,0 +1,154 @@
+"""N concurrent clients race to book the same dates of one property.
+
+Each round, every client tries to hold the same stay; exactly one may win.
+Rounds move to fresh dates, and after the run the database is checked for
+overlapping blocking bookings.
+
+Modes:
+    service  services.bookings.create_hold (per-property lock + row lock)
+    naive    check-then-insert in the caller's own transaction, no locking
+
+Usage (from a directory with dev.conf):
+    python -m benchmarks.booking_contention --clients 32 --rounds 50
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.exc import OperationalError
+
+from custom_exception.my_exceptions import BookingError
+from database.migrations import upgrade
+from database.models import Booking, BookingStatus, Property, User
+from database.session import SessionLocal, engine
+from services import bookings
+
+MODES = ("service", "naive")
+STAY_NIGHTS = 3
+FIRST_NIGHT = date(2030, 1, 1)
+
+
+def _naive_hold(traveler_id: int, property_id: int, start: date, end: date) -> None:
+    with SessionLocal() as db:
+        start_at, end_at = datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time())
+        taken = (
+            db.query(Booking.booking_id)
+            .filter(
+                Booking.property_id == property_id,
+                Booking.start_date < end_at,
+                Booking.end_date > start_at,
+                bookings.blocking_filter(datetime.utcnow()),
+            )
+            .first()
+        )
+        if taken is not None:
+            raise BookingError("Dates are no longer available")
+        db.add(Booking(
+            traveler_id=traveler_id, property_id=property_id, start_date=start_at, end_date=end_at,
+            guests=1, status=BookingStatus.pending, total_price=0.0,
+            hold_expires_at=datetime.utcnow() + timedelta(minutes=15),
+        ))
+        db.commit()
+
+
+def _setup() -> tuple:
+    upgrade(engine)
+    with SessionLocal() as db:
+        user = User(email=f"bench-{uuid.uuid4().hex[:12]}@example.com", password="x", is_admin=0, is_staff=0)
+        db.add(user)
+        db.flush()
+        prop = Property(
+            owner_id=user.user_id, title="Contended loft", price_per_night=100.0, address="1 Bench St",
+            city="Benchmark", country="XX", max_guests=4, property_type="apartment", is_available=1,
+        )
+        db.add(prop)
+        db.commit()
+        return user.user_id, prop.property_id
+
+
+def _double_bookings(property_id: int) -> int:
+    """Pairs of blocking bookings of the property whose nights overlap."""
+    with SessionLocal() as db:
+        rows = (
+            db.query(Booking.start_date, Booking.end_date)
+            .filter(Booking.property_id == property_id, bookings.blocking_filter(datetime.utcnow()))
+            .order_by(Booking.start_date)
+            .all()
+        )
+    return sum(1 for prev, cur in zip(rows, rows[1:]) if cur.start_date < prev.end_date)
+
+
+def run_mode(mode: str, clients: int, rounds: int) -> dict:
+    user_id, property_id = _setup()
+    wins = [0] * rounds
+    conflicts = 0
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients)
+
+    def client():
+        nonlocal conflicts
+        for r in range(rounds):
+            start = FIRST_NIGHT + timedelta(days=r * STAY_NIGHTS)
+            end = start + timedelta(days=STAY_NIGHTS)
+            barrier.wait()
+            try:
+                if mode == "service":
+                    with SessionLocal() as db:
+                        bookings.create_hold(db, user_id, property_id, start, end, 1)
+                else:
+                    _naive_hold(user_id, property_id, start, end)
+            except BookingError:
+                with lock:
+                    conflicts += 1
+                continue
+            except OperationalError as e:
+                with lock:
+                    errors.append(str(e.orig))
+                continue
+            with lock:
+                wins[r] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    attempts = clients * rounds
+    result = {
+        "attempts": attempts,
+        "attempts_per_s": round(attempts / elapsed, 1),
+        "rounds_per_s": round(rounds / elapsed, 1),
+        "holds": sum(wins),
+        "conflicts": conflicts,
+        "errors": len(errors),
+        "rounds_without_winner": sum(1 for w in wins if w == 0),
+        "rounds_with_several_winners": sum(1 for w in wins if w > 1),
+        "overlapping_bookings": _double_bookings(property_id),
+    }
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+def run(clients: int, rounds: int, modes) -> dict:
+    return {
+        "clients": clients,
+        "rounds": rounds,
+        "modes": {mode: run_mode(mode, clients, rounds) for mode in modes},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--mode", action="append", choices=MODES, help="Modes to run (default: all)")
+    args = parser.parse_args()
+    print(json.dumps(run(args.clients, args.rounds, args.mode or MODES), indent=2))
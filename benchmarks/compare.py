@@ -0,0 +1,78 @@
+"""Compare two benchmarks.api_load JSON reports endpoint by endpoint.
+
+Exits non-zero when an endpoint's p95 latency grew by more than
+``--threshold`` percent, its throughput dropped by more than that, or its
+median request started issuing more queries. Cache hits make the mean query
+count drift between runs, so only the median is held to this.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json --threshold 15
+"""
+import argparse
+import json
+import sys
+
+COLUMNS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+
+
+def _change(before, after):
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(baseline: dict, candidate: dict, threshold: float):
+    """Returns ``(rows, regressions)``; each row is ``(endpoint, {column: (before, after, change %)})``."""
+    rows, regressions = [], []
+    for name, after in candidate["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if before is None:
+            continue
+        cells = {column: (before.get(column), after.get(column), _change(before.get(column), after.get(column)))
+                 for column in COLUMNS}
+        queries = (before["queries_per_request"]["mean"], after["queries_per_request"]["mean"])
+        cells["queries"] = (*queries, _change(*queries))
+        rows.append((name, cells))
+
+        p95 = cells["p95_ms"][2]
+        throughput = cells["throughput_rps"][2]
+        if p95 is not None and p95 > threshold:
+            regressions.append(f"{name}: p95 {p95:+.1f}%")
+        if throughput is not None and throughput < -threshold:
+            regressions.append(f"{name}: throughput {throughput:+.1f}%")
+        median = (before["queries_per_request"]["p50"], after["queries_per_request"]["p50"])
+        if median[1] > median[0]:
+            regressions.append(f"{name}: median queries per request {median[0]} -> {median[1]}")
+    return rows, regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed change in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    if baseline["meta"]["dataset"] != candidate["meta"]["dataset"]:
+        print("warning: the runs used different datasets", file=sys.stderr)
+
+    rows, regressions = compare(baseline, candidate, args.threshold)
+    print(f"{'endpoint':<24}" + "".join(f" {column:>28}" for column in (*COLUMNS, "queries")))
+    for name, cells in rows:
+        line = f"{name:<24}"
+        for before, after, change in cells.values():
+            cell = f"{before} -> {after}" + (f" ({change:+.0f}%)" if change is not None else "")
+            line += f" {cell:>28}"
+        print(line)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
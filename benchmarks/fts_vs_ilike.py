@@ -0,0 +1,105 @@
+"""Compare FTS5 search against the ilike substring path on a synthetic catalog.
+
+Usage (from a directory with dev.conf):
+    python -m benchmarks.fts_vs_ilike --rows 100000 --repeat 20
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from database.models import Base, Property, User
+from services import search_index
+
+CITIES = ["Goa", "Paris", "Berlin", "Lisbon", "Kyoto", "Austin", "Cape Town", "Manali", "Oslo", "Hanoi"]
+COUNTRIES = ["India", "France", "Germany", "Portugal", "Japan", "USA", "South Africa", "Norway", "Vietnam"]
+WORDS = ["sea", "view", "cozy", "loft", "garden", "villa", "beach", "mountain", "central", "quiet",
+         "modern", "rustic", "pool", "terrace", "studio", "family", "historic", "lake", "forest", "city"]
+QUERIES = ["beach", "mountain cabin", "goa", "pari", "quiet garden terrace"]
+
+
+def seed(db: Session, rows: int, batch_size: int = 5000) -> None:
+    rng = random.Random(42)
+    db.execute(insert(User), [{"email": "owner@example.com", "password": "x"}])
+    for start in range(0, rows, batch_size):
+        batch = []
+        for _ in range(start, min(rows, start + batch_size)):
+            batch.append({
+                "owner_id": 1,
+                "title": " ".join(rng.choices(WORDS, k=3)).title(),
+                "description": " ".join(rng.choices(WORDS, k=25)),
+                "price_per_night": rng.randint(20, 500),
+                "address": "1 Main St",
+                "city": rng.choice(CITIES),
+                "country": rng.choice(COUNTRIES),
+                "max_guests": rng.randint(1, 8),
+                "property_type": "apartment",
+                "is_available": 1,
+            })
+        db.execute(insert(Property), batch)
+    db.commit()
+
+
+def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"p50_ms": round(statistics.median(samples), 3), "max_ms": round(max(samples), 3)}
+
+
+def run(rows: int, repeat: int, limit: int) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+
+    results = {"rows": rows, "repeat": repeat, "limit": limit, "queries": {}}
+    with Session(engine) as db:
+        started = time.perf_counter()
+        seed(db, rows)
+        results["seed_s"] = round(time.perf_counter() - started, 2)
+
+        started = time.perf_counter()
+        search_index.ensure_index(db)
+        results["index_build_s"] = round(time.perf_counter() - started, 2)
+
+        for q in QUERIES:
+            def fts():
+                query, rank = search_index.apply_text_search(db.query(Property), q)
+                return query.order_by(rank).limit(limit).all()
+
+            def ilike():
+                search_index.enabled = False
+                try:
+                    query, _ = search_index.apply_text_search(db.query(Property), q)
+                    return query.order_by(Property.property_id).limit(limit).all()
+                finally:
+                    search_index.enabled = True
+
+            def city_ilike():
+                return db.query(Property).filter(Property.city.ilike(f"%{q}%")).limit(limit).all()
+
+            results["queries"][q] = {
+                "fts": timed(fts, repeat),
+                "ilike_all_columns": timed(ilike, repeat),
+                "ilike_city": timed(city_ilike, repeat),
+            }
+
+    engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.repeat, args.limit), indent=2))
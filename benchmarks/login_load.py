@@ -0,0 +1,86 @@
+"""Show that unauthenticated GET latency stays flat while logins run.
+
+Drives the app in-process through httpx's ASGI transport, so login work that
+blocks the event loop shows up directly as GET latency.
+
+Usage (from a directory with dev.conf):
+    python -m benchmarks.login_load --seconds 5 --login-concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+import httpx
+
+from main import app
+
+GET_PATH = "/rest/v1/amenity/amenities"
+
+
+def summarize(samples) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+    return {"count": len(ordered), "p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99),
+            "mean_ms": round(statistics.fmean(ordered), 3)}
+
+
+async def get_loop(client, deadline, samples):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get(GET_PATH)
+        response.raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+        # Pace GETs so they measure loop responsiveness, not saturation
+        await asyncio.sleep(0.005)
+
+
+async def login_loop(client, credentials, deadline, samples):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.post("/rest/v1/auth/login/", json=credentials)
+        if response.status_code == 200:
+            samples.append((time.perf_counter() - started) * 1000)
+
+
+async def phase(client, seconds, get_concurrency, login_concurrency, credentials) -> dict:
+    deadline = time.perf_counter() + seconds
+    get_samples, login_samples = [], []
+    tasks = [get_loop(client, deadline, get_samples) for _ in range(get_concurrency)]
+    tasks += [login_loop(client, credentials, deadline, login_samples) for _ in range(login_concurrency)]
+    await asyncio.gather(*tasks)
+    return {"get": summarize(get_samples), "login": summarize(login_samples)}
+
+
+async def run(seconds: float, get_concurrency: int, login_concurrency: int) -> dict:
+    credentials = {"email": f"load-{uuid.uuid4().hex[:12]}@example.com", "password": "load-test-password"}
+    transport = httpx.ASGITransport(app=app)
+    # The ASGI transport does not send lifespan events
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/rest/v1/auth/signup/", json=credentials)
+        response.raise_for_status()
+
+        idle = await phase(client, seconds, get_concurrency, 0, credentials)
+        loaded = await phase(client, seconds, get_concurrency, login_concurrency, credentials)
+
+    return {
+        "seconds_per_phase": seconds,
+        "get_concurrency": get_concurrency,
+        "login_concurrency": login_concurrency,
+        "idle": idle,
+        "with_logins": loaded,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--get-concurrency", type=int, default=4)
+    parser.add_argument("--login-concurrency", type=int, default=8)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.seconds, args.get_concurrency, args.login_concurrency)), indent=2))
@@ -0,0 +1,218 @@
+"""Fill the configured database with a synthetic catalog for the benchmarks.
+
+Generates users, properties with coordinates, images, amenity assignments,
+bookings and reviews at a chosen scale, with Core bulk inserts and fixed
+primary keys, then rebuilds the geo, full-text and rating indexes that the
+ORM events would otherwise maintain. Every seeded user can log in with
+``BENCH_PASSWORD``; ``bench-admin@example.com`` is an admin.
+
+Usage (from a directory with dev.conf pointing at an empty database):
+    python -m benchmarks.seed --scale 10k
+    python -m benchmarks.seed --properties 25000 --seed 7
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from database.migrations import upgrade
+from database.models import (
+    Amenity, Booking, BookingStatus, Property, PropertyImage, Review, User, UserProfile, property_amenity,
+)
+from database.session import SessionLocal, engine
+from routers.request_models.property_models import PropertyType
+from services import geo_index, ratings, search_index
+from utils.auth_utils import hash_password
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+BENCH_PASSWORD = "bench-password"
+ADMIN_EMAIL = "bench-admin@example.com"
+BATCH_SIZE = 5000
+
+# (city, country, latitude, longitude)
+CITIES = [
+    ("Goa", "India", 15.49, 73.82), ("Manali", "India", 32.24, 77.19), ("Paris", "France", 48.86, 2.35),
+    ("Berlin", "Germany", 52.52, 13.40), ("Lisbon", "Portugal", 38.72, -9.14), ("Kyoto", "Japan", 35.01, 135.77),
+    ("Austin", "USA", 30.27, -97.74), ("Cape Town", "South Africa", -33.92, 18.42), ("Oslo", "Norway", 59.91, 10.75),
+    ("Hanoi", "Vietnam", 21.03, 105.85), ("Barcelona", "Spain", 41.39, 2.17), ("Sydney", "Australia", -33.87, 151.21),
+]
+WORDS = ["sea", "view", "cozy", "loft", "garden", "villa", "beach", "mountain", "central", "quiet",
+         "modern", "rustic", "pool", "terrace", "studio", "family", "historic", "lake", "forest", "city"]
+AMENITIES = ["wifi", "kitchen", "parking", "pool", "air conditioning", "heating", "washer", "dryer", "tv",
+             "workspace", "gym", "hot tub", "breakfast", "pets allowed", "fireplace", "balcony", "garden",
+             "bbq grill", "crib", "elevator", "ev charger", "beach access", "sauna", "coffee maker"]
+# Weighted towards good ratings, like real review data
+RATING_WEIGHTS = [0.03, 0.05, 0.12, 0.35, 0.45]
+
+IMAGES_PER_PROPERTY = (1, 5)
+AMENITIES_PER_PROPERTY = (2, 8)
+BOOKINGS_PER_PROPERTY = (0, 6)
+REVIEW_SHARE = 0.6
+
+
+def _users(rng: random.Random, count: int, password_hash: str, now: datetime):
+    owners = max(1, count // 50)
+    for user_id in range(1, count + 1):
+        admin = user_id == 1
+        yield {
+            "user_id": user_id,
+            "email": ADMIN_EMAIL if admin else f"bench-{user_id}@example.com",
+            "password": password_hash,
+            "is_admin": 1 if admin else 0,
+            "is_staff": 1 if user_id <= owners else 0,
+            "created_at": now - timedelta(days=rng.randint(0, 900)),
+        }
+
+
+def _property(rng: random.Random, property_id: int, owners: int, now: datetime) -> dict:
+    city, country, lat, lng = rng.choice(CITIES)
+    words = rng.choices(WORDS, k=3)
+    return {
+        "property_id": property_id,
+        "owner_id": rng.randint(1, owners),
+        "title": " ".join(words).title(),
+        "description": " ".join(rng.choices(WORDS, k=rng.randint(15, 40))),
+        "price_per_night": round(rng.lognormvariate(4.7, 0.5), 2),
+        "address": f"{rng.randint(1, 999)} {rng.choice(WORDS).title()} Street",
+        "city": city,
+        "country": country,
+        # Within roughly 25 km of the city centre
+        "latitude": round(lat + rng.uniform(-0.22, 0.22), 6),
+        "longitude": round(lng + rng.uniform(-0.22, 0.22), 6),
+        "max_guests": rng.randint(1, 10),
+        "property_type": rng.choice(list(PropertyType)).value,
+        "is_available": 0 if rng.random() < 0.05 else 1,
+        "created_at": now - timedelta(days=rng.randint(0, 730), seconds=rng.randint(0, 86399)),
+    }
+
+
+def _bookings(rng: random.Random, prop: dict, travelers: int, next_id: int, today: datetime):
+    """Non-overlapping stays from a year ago to six months ahead."""
+    day = today - timedelta(days=365 + rng.randint(0, 30))
+    for booking_id in range(next_id, next_id + rng.randint(*BOOKINGS_PER_PROPERTY)):
+        start = day + timedelta(days=rng.randint(1, 90))
+        nights = rng.randint(1, 10)
+        end = start + timedelta(days=nights)
+        day = end
+        if start >= today:
+            status = BookingStatus.confirmed if rng.random() < 0.8 else BookingStatus.cancelled
+        else:
+            status = BookingStatus.confirmed if rng.random() < 0.9 else BookingStatus.cancelled
+        yield {
+            "booking_id": booking_id,
+            "traveler_id": rng.randint(1, travelers),
+            "property_id": prop["property_id"],
+            "start_date": start,
+            "end_date": end,
+            "guests": rng.randint(1, prop["max_guests"]),
+            "status": status,
+            "total_price": round(prop["price_per_night"] * nights, 2),
+        }
+
+
+def _insert(db: Session, table, rows) -> int:
+    batch = []
+    total = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            db.execute(insert(table), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        db.execute(insert(table), batch)
+        total += len(batch)
+    return total
+
+
+def seed(db: Session, properties: int, seed_value: int = 42, progress=print) -> dict:
+    """Insert a catalog of ``properties`` properties and everything hanging off them. Returns row counts."""
+    rng = random.Random(seed_value)
+    now = datetime.utcnow().replace(microsecond=0)
+    today = now.replace(hour=0, minute=0, second=0)
+    users = max(100, properties // 2)
+    owners = max(1, users // 50)
+    counts = dict.fromkeys(["users", "profiles", "amenities", "properties", "images", "property_amenity",
+                            "bookings", "reviews"], 0)
+
+    counts["users"] = _insert(db, User.__table__, _users(rng, users, hash_password(BENCH_PASSWORD), now))
+    counts["profiles"] = _insert(db, UserProfile.__table__, (
+        {"user_id": user_id, "full_name": f"Bench User {user_id}", "preferred_language": "en"}
+        for user_id in range(1, users + 1, 3)
+    ))
+    counts["amenities"] = _insert(db, Amenity.__table__, (
+        {"amenity_id": amenity_id, "name": name} for amenity_id, name in enumerate(AMENITIES, start=1)
+    ))
+    db.commit()
+    progress(f"users: {users}")
+
+    next_image, next_booking, next_review = 1, 1, 1
+    for first in range(1, properties + 1, BATCH_SIZE):
+        props = [_property(rng, pid, owners, now) for pid in range(first, min(properties, first + BATCH_SIZE - 1) + 1)]
+        images, assigned, stays, reviews = [], [], [], []
+        for prop in props:
+            pid = prop["property_id"]
+            for position in range(rng.randint(*IMAGES_PER_PROPERTY)):
+                images.append({
+                    "image_id": next_image,
+                    "property_id": pid,
+                    "image_url": f"https://images.example.com/{pid}/{position}.jpg",
+                    "is_cover": 1 if position == 0 else 0,
+                })
+                next_image += 1
+            for amenity_id in rng.sample(range(1, len(AMENITIES) + 1), rng.randint(*AMENITIES_PER_PROPERTY)):
+                assigned.append({"property_id": pid, "amenity_id": amenity_id})
+            for stay in _bookings(rng, prop, users, next_booking, today):
+                stays.append(stay)
+                if stay["status"] == BookingStatus.confirmed and stay["end_date"] <= today and rng.random() < REVIEW_SHARE:
+                    reviews.append({
+                        "review_id": next_review,
+                        "booking_id": stay["booking_id"],
+                        "traveler_id": stay["traveler_id"],
+                        "property_id": pid,
+                        "rating": rng.choices(range(1, 6), RATING_WEIGHTS)[0],
+                        "comment": " ".join(rng.choices(WORDS, k=rng.randint(5, 20))),
+                    })
+                    next_review += 1
+            if stays:
+                next_booking = stays[-1]["booking_id"] + 1
+
+        counts["properties"] += _insert(db, Property.__table__, props)
+        counts["images"] += _insert(db, PropertyImage.__table__, images)
+        counts["property_amenity"] += _insert(db, property_amenity, assigned)
+        counts["bookings"] += _insert(db, Booking.__table__, stays)
+        counts["reviews"] += _insert(db, Review.__table__, reviews)
+        db.commit()
+        progress(f"properties: {counts['properties']}/{properties}")
+
+    # Core inserts bypass the ORM events that keep these in sync
+    geo_index.rebuild(db)
+    search_index.ensure_index(db)
+    ratings.rebuild(db)
+    return counts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="10k", help="Number of properties")
+    parser.add_argument("--properties", type=int, help="Overrides --scale")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    upgrade(engine)
+    with SessionLocal() as db:
+        if db.query(func.count(User.user_id)).scalar():
+            parser.error("the database already has users; point dev.conf at an empty database")
+        started = time.perf_counter()
+        counts = seed(db, args.properties or SCALES[args.scale], args.seed)
+
+    print(json.dumps({"rows": counts, "seconds": round(time.perf_counter() - started, 1)}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+"""Throughput of concurrent SQLite writers, before and after the SQLite profile.
+
+Profiles:
+    baseline     driver defaults (rollback journal), one commit per write
+    wal          WAL + pragmas from [SQLite], one commit per write
+    group_commit WAL + pragmas, writes batched by database.write_queue
+
+Usage (from a directory with dev.conf):
+    python -m benchmarks.sqlite_writers --writers 16 --writes 200
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Base, User
+from database.session import apply_sqlite_profile, sqlite_pragmas
+from database.write_queue import WriteQueue
+
+PROFILES = ("baseline", "wal", "group_commit")
+
+
+def _insert_user(db, email: str) -> int:
+    user = User(email=email, password="x", is_admin=0, is_staff=0)
+    db.add(user)
+    db.flush()
+    return user.user_id
+
+
+def run_profile(profile: str, writers: int, writes: int, synchronous: str) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    # Default driver timeout is 5s; keep it so the baseline fails the way production does
+    engine = create_engine(f"sqlite:///{path}", pool_size=writers, max_overflow=0)
+    if profile != "baseline":
+        apply_sqlite_profile(engine, sqlite_pragmas(synchronous=synchronous))
+    Base.metadata.create_all(engine)
+
+    queue = None
+    if profile == "group_commit":
+        queue = WriteQueue(sessionmaker(bind=engine, expire_on_commit=False))
+    Session = sessionmaker(bind=engine)
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(writers)
+
+    def writer(n: int):
+        barrier.wait()
+        for i in range(writes):
+            email = f"w{n}-{i}@example.com"
+            started = time.perf_counter()
+            try:
+                if queue is not None:
+                    queue.run(_insert_user, email)
+                else:
+                    with Session() as db:
+                        _insert_user(db, email)
+                        db.commit()
+            except OperationalError as e:
+                with lock:
+                    errors.append(str(e.orig))
+                continue
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    latencies.sort()
+    result = {
+        "committed": len(latencies),
+        "errors": len(errors),
+        "writes_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 3) if latencies else None,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 3) if latencies else None,
+    }
+    if errors:
+        result["first_error"] = errors[0]
+    if queue is not None:
+        result["queue"] = queue.stats()
+    return result
+
+
+def run(writers: int, writes: int, synchronous: str, profiles) -> dict:
+    return {
+        "writers": writers,
+        "writes_per_writer": writes,
+        "synchronous": synchronous,
+        "profiles": {profile: run_profile(profile, writers, writes, synchronous) for profile in profiles},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--synchronous", default="NORMAL", help="PRAGMA synchronous for the WAL profiles")
+    parser.add_argument("--profile", action="append", choices=PROFILES, help="Profiles to run (default: all)")
+    args = parser.parse_args()
+    print(json.dumps(run(args.writers, args.writes, args.synchronous, args.profile or PROFILES), indent=2))
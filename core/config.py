@@ -9,4 +9,100 @@ config.read("dev.conf")
 SECRET_KEY = config.get("Jwt", "SECRET_KEY")
 ALGORITHM = config.get("Jwt", "ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = config.get("Jwt", "ACCESS_TOKEN_EXPIRE_MINUTES")
-REFRESH_TOKEN_EXPIRE_DAYS =  config.get("Jwt", "REFRESH_TOKEN_EXPIRE_DAYS")
\ No newline at end of file
+REFRESH_TOKEN_EXPIRE_DAYS =  config.get("Jwt", "REFRESH_TOKEN_EXPIRE_DAYS")
+# Trust signed claims instead of looking tokens up; revocations are tracked in memory
+JWT_STATELESS = config.getboolean("Jwt", "STATELESS", fallback=False)
+# How often each process reloads revocations recorded by other processes
+JWT_REVOCATION_REFRESH_SECONDS = config.getint("Jwt", "REVOCATION_REFRESH_SECONDS", fallback=30)
+
+TOKEN_CACHE_MAX_SIZE = config.getint("TokenCache", "MAX_SIZE", fallback=10000)
+
+PASSWORD_HASH_WORKERS = config.getint("PasswordHashing", "WORKERS", fallback=2)
+PASSWORD_HASH_QUEUE_LIMIT = config.getint("PasswordHashing", "QUEUE_LIMIT", fallback=64)
+
+DATABASE_URL = config.get("Database", "URL", fallback="sqlite:///./hotel.db")
+# Derived from DATABASE_URL (aiosqlite / asyncpg) when left empty
+ASYNC_DATABASE_URL = config.get("Database", "ASYNC_URL", fallback="")
+USE_ASYNC_DB = config.getboolean("Database", "USE_ASYNC", fallback=False)
+POOL_SIZE = config.getint("Database", "POOL_SIZE", fallback=10)
+MAX_OVERFLOW = config.getint("Database", "MAX_OVERFLOW", fallback=15)
+
+# Comma separated read-only URLs, e.g. sqlite:///file:hotel.db?mode=ro&uri=true.
+# A URL may size its own pool with pool_size and max_overflow query
+# parameters, e.g. postgresql://replica-2/hotel?pool_size=20&max_overflow=10
+READ_REPLICA_URLS = [url.strip() for url in config.get("Database", "READ_REPLICA_URLS", fallback="").split(",") if url.strip()]
+REPLICA_POOL_SIZE = config.getint("Database", "REPLICA_POOL_SIZE", fallback=10)
+REPLICA_MAX_OVERFLOW = config.getint("Database", "REPLICA_MAX_OVERFLOW", fallback=15)
+# A replica that failed to connect or to run a query is skipped for this long
+REPLICA_RETRY_SECONDS = config.getint("Database", "REPLICA_RETRY_SECONDS", fallback=30)
+# Reads stay on the primary this long after a client's last write
+READ_YOUR_WRITES_SECONDS = config.getint("Database", "READ_YOUR_WRITES_SECONDS", fallback=5)
+
+# Applied to every SQLite connection of the primary engine
+SQLITE_JOURNAL_MODE = config.get("SQLite", "JOURNAL_MODE", fallback="WAL")
+SQLITE_SYNCHRONOUS = config.get("SQLite", "SYNCHRONOUS", fallback="NORMAL")
+SQLITE_MMAP_SIZE = config.getint("SQLite", "MMAP_SIZE", fallback=256 * 1024 * 1024)
+# Negative values are KiB, positive values are pages
+SQLITE_CACHE_SIZE = config.getint("SQLite", "CACHE_SIZE", fallback=-64000)
+SQLITE_BUSY_TIMEOUT_MS = config.getint("SQLite", "BUSY_TIMEOUT_MS", fallback=5000)
+# Funnel write transactions through one writer thread that commits them in
+# batches. Off by default: in benchmarks/sqlite_writers (16 writers) it cut p99
+# from 187 to 69 ms but throughput from 882 to 674 writes/s; it only wins on
+# throughput when commits are expensive (785 vs 668 writes/s with FULL sync)
+SQLITE_GROUP_COMMIT = config.getboolean("SQLite", "GROUP_COMMIT", fallback=False)
+SQLITE_GROUP_COMMIT_MAX_BATCH = config.getint("SQLite", "GROUP_COMMIT_MAX_BATCH", fallback=64)
+# How long the writer waits for more work before committing a batch
+SQLITE_GROUP_COMMIT_MAX_WAIT_MS = config.getint("SQLite", "GROUP_COMMIT_MAX_WAIT_MS", fallback=2)
+
+# Read-through cache for property, image and amenity reads
+CACHE_ENABLED = config.getboolean("Cache", "ENABLED", fallback=True)
+CACHE_MAX_ENTRIES = config.getint("Cache", "MAX_ENTRIES", fallback=10000)
+CACHE_MAX_BYTES = config.getint("Cache", "MAX_BYTES", fallback=64 * 1024 * 1024)
+CACHE_TTL_SECONDS = config.getint("Cache", "TTL_SECONDS", fallback=300)
+# Listing results are cached per price bucket and filtered exactly in memory
+CACHE_LISTING_PRICE_BUCKET = config.getfloat("Cache", "LISTING_PRICE_BUCKET", fallback=50.0)
+# Result sets with more matches than this are not cached
+CACHE_LISTING_MAX_IDS = config.getint("Cache", "LISTING_MAX_IDS", fallback=5000)
+
+# Pending bookings hold their dates for this long before they must be confirmed
+BOOKING_HOLD_MINUTES = config.getint("Booking", "HOLD_MINUTES", fallback=15)
+# How often expired holds are cancelled in the background
+BOOKING_HOLD_SWEEP_SECONDS = config.getint("Booking", "HOLD_SWEEP_SECONDS", fallback=60)
+# A property calendar is reloaded from the database once it is this old, so
+# bookings written by other processes show up as booked within this time
+BOOKING_AVAILABILITY_TTL_SECONDS = config.getfloat("Booking", "AVAILABILITY_TTL_SECONDS", fallback=5.0)
+
+# Token store backend: "sql" (tokens table) or "memory" (per process, for tests)
+TOKEN_STORE_BACKEND = config.get("TokenStore", "BACKEND", fallback="sql")
+# Expired tokens are deleted in batches of this size every SWEEP_SECONDS
+TOKEN_STORE_SWEEP_SECONDS = config.getint("TokenStore", "SWEEP_SECONDS", fallback=300)
+TOKEN_STORE_SWEEP_BATCH_SIZE = config.getint("TokenStore", "SWEEP_BATCH_SIZE", fallback=1000)
+
+# Per-route request and database metrics, served in Prometheus text format at /metrics
+METRICS_ENABLED = config.getboolean("Metrics", "ENABLED", fallback=True)
+# Upper bounds, in seconds, of the request latency histogram buckets
+METRICS_LATENCY_BUCKETS = [
+    float(bound) for bound in
+    config.get("Metrics", "LATENCY_BUCKETS", fallback="0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10").split(",")
+]
+
+# Opt-in slow query log and N+1 detection, written as JSON lines to a rotating file
+QUERY_PROFILER_ENABLED = config.getboolean("QueryProfiler", "ENABLED", fallback=False)
+QUERY_PROFILER_SLOW_QUERY_MS = config.getfloat("QueryProfiler", "SLOW_QUERY_MS", fallback=100.0)
+# A request running one statement template more often than this is flagged as N+1
+QUERY_PROFILER_REPEAT_THRESHOLD = config.getint("QueryProfiler", "REPEAT_THRESHOLD", fallback=10)
+QUERY_PROFILER_LOG_FILE = config.get("QueryProfiler", "LOG_FILE", fallback="query_profile.log")
+QUERY_PROFILER_LOG_MAX_BYTES = config.getint("QueryProfiler", "LOG_MAX_BYTES", fallback=10 * 1024 * 1024)
+QUERY_PROFILER_LOG_BACKUP_COUNT = config.getint("QueryProfiler", "LOG_BACKUP_COUNT", fallback=5)
+# Distinct (route, statement) offenders kept for the admin endpoint
+QUERY_PROFILER_MAX_OFFENDERS = config.getint("QueryProfiler", "MAX_OFFENDERS", fallback=500)
+
+# Admins can profile a single request by sending "X-Profile: 1"; the sampled
+# stacks are stored in DIRECTORY and served by the admin API
+PROFILING_ENABLED = config.getboolean("Profiling", "ENABLED", fallback=True)
+PROFILING_INTERVAL_MS = config.getfloat("Profiling", "INTERVAL_MS", fallback=1.0)
+# Sampling stops after this long; the rest of the request runs unprofiled
+PROFILING_MAX_SECONDS = config.getfloat("Profiling", "MAX_SECONDS", fallback=30.0)
+PROFILING_DIRECTORY = config.get("Profiling", "DIRECTORY", fallback="profiles")
+# Oldest profiles are deleted beyond this many
+PROFILING_MAX_STORED = config.getint("Profiling", "MAX_STORED", fallback=50)
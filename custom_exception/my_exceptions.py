@@ -17,4 +17,18 @@ class PermissionNotAllowed(Exception):
         self.message = message
         self.status_code = status_code
         self.error_code = error_code
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+class ServiceBusy(Exception):
+    def __init__(self, message="Server busy, try again later", status_code=503, error_code=1003):
+        self.message = message
+        self.status_code = status_code
+        self.error_code = error_code
+        super().__init__(self.message)
+
+class BookingError(Exception):
+    def __init__(self, message="Booking not possible", status_code=409, error_code=1004):
+        self.message = message
+        self.status_code = status_code
+        self.error_code = error_code
+        super().__init__(self.message)
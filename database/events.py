@@ -0,0 +1,41 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_CALLBACKS_KEY = "after_commit_callbacks"
+_SAVEPOINTS_KEY = "after_commit_savepoints"
+
+
+def run_after_commit(session: Session, callback, *args) -> None:
+    """Run ``callback(*args)`` once the session's current transaction commits.
+
+    Callbacks registered inside a savepoint that is rolled back, or inside a
+    transaction that is rolled back, are discarded.
+    """
+    session.info.setdefault(_CALLBACKS_KEY, []).append((callback, args))
+
+
+@event.listens_for(Session, "after_transaction_create")
+def _mark_savepoint(session, transaction):
+    if transaction.nested:
+        callbacks = session.info.get(_CALLBACKS_KEY, ())
+        session.info.setdefault(_SAVEPOINTS_KEY, {})[transaction] = len(callbacks)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_savepoint(session, previous_transaction):
+    marks = session.info.get(_SAVEPOINTS_KEY)
+    if marks and previous_transaction in marks:
+        del session.info.get(_CALLBACKS_KEY, [])[marks.pop(previous_transaction):]
+
+
+@event.listens_for(Session, "after_commit")
+def _run_callbacks(session):
+    session.info.pop(_SAVEPOINTS_KEY, None)
+    for callback, args in session.info.pop(_CALLBACKS_KEY, ()):
+        callback(*args)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_callbacks(session):
+    session.info.pop(_SAVEPOINTS_KEY, None)
+    session.info.pop(_CALLBACKS_KEY, None)
@@ -0,0 +1,130 @@
+"""Schema upgrades that `create_all` does not perform on existing databases.
+
+`create_all` only creates missing tables. Columns added to an existing model
+are added here with ``ALTER TABLE ... ADD COLUMN``; such columns must be
+nullable and have no server default so every backend can add them in place.
+Indexes declared on existing tables are created here as well.
+"""
+from sqlalchemy import DateTime, Integer, String, and_, column, delete, func, insert, inspect, select, table
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+
+from database.models import Token, property_amenity
+from database.session import Base
+from utils.auth_utils import token_digest
+
+BATCH_SIZE = 1000
+
+
+def add_missing_columns(engine: Engine) -> list:
+    """Add model columns missing from existing tables. Returns ``table.column`` names added."""
+    added = []
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable or column.server_default is not None:
+                    raise RuntimeError(f"Cannot add column {table.name}.{column.name} in place")
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def hash_stored_tokens(engine: Engine) -> int:
+    """Replace a `tokens` table holding raw JWTs by the digest-only schema.
+
+    The old table is renamed, the new one created with its indexes, and every
+    row copied over with its digest. Returns the number of tokens copied.
+    """
+    inspector = inspect(engine)
+    if "tokens" not in inspector.get_table_names():
+        return 0
+    if "token" not in {c["name"] for c in inspector.get_columns("tokens")}:
+        return 0
+
+    legacy = table(
+        "tokens_legacy",
+        column("user_id", Integer),
+        column("token_type", String),
+        column("token", String),
+        column("expires_at", DateTime),
+    )
+    copied = 0
+    seen = set()
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE tokens RENAME TO tokens_legacy")
+        Token.__table__.create(conn)
+        result = conn.execution_options(yield_per=BATCH_SIZE).execute(select(legacy))
+        for rows in result.partitions():
+            values = []
+            for row in rows:
+                digest = token_digest(row.token)
+                # Identical JWTs (same claims, same second) collapse into one row
+                if digest in seen:
+                    continue
+                seen.add(digest)
+                values.append({
+                    "user_id": row.user_id,
+                    "token_type": row.token_type,
+                    "token_hash": digest,
+                    "expires_at": row.expires_at,
+                })
+            if values:
+                conn.execute(insert(Token.__table__), values)
+                copied += len(values)
+        conn.exec_driver_sql("DROP TABLE tokens_legacy")
+    return copied
+
+
+def dedupe_property_amenity(engine: Engine) -> int:
+    """Collapse duplicate ``(property_id, amenity_id)`` rows into one so the
+    unique index can be built. Returns the number of rows removed."""
+    c = property_amenity.c
+    duplicates = (
+        select(c.property_id, c.amenity_id, func.count().label("copies"))
+        .where(c.property_id.is_not(None), c.amenity_id.is_not(None))
+        .group_by(c.property_id, c.amenity_id)
+        .having(func.count() > 1)
+    )
+    removed = 0
+    with engine.begin() as conn:
+        for property_id, amenity_id, copies in conn.execute(duplicates).all():
+            conn.execute(delete(property_amenity).where(and_(c.property_id == property_id, c.amenity_id == amenity_id)))
+            conn.execute(insert(property_amenity).values(property_id=property_id, amenity_id=amenity_id))
+            removed += copies - 1
+    return removed
+
+
+def create_missing_indexes(engine: Engine) -> list:
+    """Create model indexes missing from existing tables. Returns the index names created."""
+    created = []
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                index.create(conn)
+                created.append(index.name)
+    return created
+
+
+def upgrade(engine: Engine) -> None:
+    hash_stored_tokens(engine)
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    dedupe_property_amenity(engine)
+    create_missing_indexes(engine)
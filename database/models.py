@@ -1,15 +1,23 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Text, DateTime, JSON, ARRAY, Enum, Table, Float
+from sqlalchemy import Column, ForeignKey, Integer, String, Text, DateTime, JSON, ARRAY, Enum, Table, Float, Index
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import relationship
 from .session import Base
 from sqlalchemy.sql import func
 import enum
+
+# SQLite stores CURRENT_TIMESTAMP with second precision; bind parameters must
+# use the same text format or range/keyset comparisons on these columns break.
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
  
 class BaseTable(Base):
     __abstract__ = True
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
     created_by = Column(Integer, nullable=True)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(Timestamp, server_default=func.now(), onupdate=func.now())
     updated_by = Column(Integer, nullable=True)
 
 class User(BaseTable):
@@ -22,8 +30,9 @@ class User(BaseTable):
     is_staff = Column(Integer, nullable=True)
 
     # Relationships
-    tokens = relationship('Token', back_populates='user')  # Added relationship'
-    profile = relationship('UserProfile', back_populates='user')
+    # Deleting a user deletes their tokens and profile; user_profiles.user_id cannot be NULL
+    tokens = relationship('Token', back_populates='user', cascade='all, delete-orphan')
+    profile = relationship('UserProfile', back_populates='user', cascade='all, delete-orphan')
 
 
 class Token(Base):
@@ -32,12 +41,35 @@ class Token(Base):
     token_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.user_id'))
     token_type = Column(String, nullable=False)  # e.g., 'access' or 'refresh'
-    token = Column(String, nullable=False)
+    # SHA-256 hex digest of the JWT (utils.auth_utils.token_digest); raw tokens are not stored
+    token_hash = Column(String(64), nullable=False)
     expires_at = Column(DateTime, nullable=False)
 
     # Relationships
     user = relationship('User', back_populates='tokens')
 
+    __table_args__ = (
+        Index('ux_tokens_token_hash', 'token_hash', unique=True),
+        Index('ix_tokens_user_id', 'user_id'),
+        Index('ix_tokens_expires_at', 'expires_at'),
+    )
+
+
+class TokenRevocation(Base):
+    """
+    Tokens of ``user_id`` issued before ``revoked_before`` are revoked. Rows
+    outlive deleted users and expire once every such token has expired.
+    """
+    __tablename__ = 'token_revocations'
+
+    user_id = Column(Integer, primary_key=True)
+    revoked_before = Column(Float, nullable=False)  # unix time, compared with the JWT iat claim
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('ix_token_revocations_expires_at', 'expires_at'),
+    )
+
 
 class UserProfile(BaseTable):
     __tablename__ = 'user_profiles'
@@ -76,8 +108,36 @@ class Property(BaseTable):
 
     owner = relationship('User')
     images = relationship('PropertyImage', back_populates='property')
+    amenities = relationship('Amenity', secondary='property_amenity')
     bookings = relationship('Booking', back_populates='property')
 
+    # Listings filter on is_available and page by keyset on (sort column, id).
+    # city/country are substring matches, which no B-tree index can serve.
+    __table_args__ = (
+        Index('ix_properties_available_id', 'is_available', 'property_id'),
+        Index('ix_properties_available_price', 'is_available', 'price_per_night', 'property_id'),
+        Index('ix_properties_available_created', 'is_available', 'created_at', 'property_id'),
+        Index('ix_properties_owner_id', 'owner_id'),
+    )
+
+
+class PropertyGeoCell(Base):
+    """
+    Spatial index of properties with coordinates. Rows are kept in sync with
+    `properties` by mapper events in services/geo_index.py.
+    """
+    __tablename__ = 'property_geo_cells'
+
+    property_id = Column(Integer, ForeignKey('properties.property_id'), primary_key=True)
+    cell = Column(Integer, nullable=False)  # grid cell id, see utils/geo_utils.py
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index('ix_property_geo_cells_cell', 'cell'),
+        Index('ix_property_geo_cells_latitude', 'latitude'),
+    )
+
 
 class PropertyImage(BaseTable):
     __tablename__ = 'property_images'
@@ -89,6 +149,10 @@ class PropertyImage(BaseTable):
 
     property = relationship('Property', back_populates='images')
 
+    __table_args__ = (
+        Index('ix_property_images_property_id', 'property_id'),
+    )
+
 class Amenity(Base):
     __tablename__ = 'amenities'
 
@@ -105,7 +169,10 @@ property_amenity = Table(
     'property_amenity',
     Base.metadata,
     Column('property_id', Integer, ForeignKey('properties.property_id')),
-    Column('amenity_id', Integer, ForeignKey('amenities.amenity_id'))
+    Column('amenity_id', Integer, ForeignKey('amenities.amenity_id')),
+    # Also serves lookups by property_id
+    Index('ux_property_amenity_pair', 'property_id', 'amenity_id', unique=True),
+    Index('ix_property_amenity_amenity_id', 'amenity_id'),
 )
 
 class BookingStatus(str, enum.Enum):
@@ -126,10 +193,20 @@ class Booking(BaseTable):
     guests = Column(Integer, nullable=False)
     status = Column(Enum(BookingStatus), default=BookingStatus.pending)
     total_price = Column(Float, nullable=False)
+    # Set while a pending booking holds its dates; expired holds no longer block
+    hold_expires_at = Column(DateTime, nullable=True)
 
     property = relationship('Property', back_populates='bookings')
     traveler = relationship('User')
 
+    __table_args__ = (
+        # Overlap checks and calendar loads: property_id = ? AND start_date < ?
+        Index('ix_bookings_property_dates', 'property_id', 'start_date', 'end_date'),
+        Index('ix_bookings_traveler_id', 'traveler_id'),
+        # Hold sweeper: status = 'pending' AND hold_expires_at <= ?
+        Index('ix_bookings_status_hold', 'status', 'hold_expires_at'),
+    )
+
 class Package(BaseTable):
     __tablename__ = 'packages'
 
@@ -144,6 +221,10 @@ class Package(BaseTable):
 
     property = relationship('Property')
 
+    __table_args__ = (
+        Index('ix_packages_property_id', 'property_id'),
+    )
+
 
 class Review(BaseTable):
     __tablename__ = 'reviews'
@@ -159,6 +240,34 @@ class Review(BaseTable):
     booking = relationship('Booking')
     property = relationship('Property')
 
+    __table_args__ = (
+        # Covers the rating summary rebuild (property_id, sum/count of rating)
+        Index('ix_reviews_property_rating', 'property_id', 'rating'),
+        Index('ix_reviews_traveler_id', 'traveler_id'),
+    )
+
+
+class PropertyRatingSummary(Base):
+    """
+    Per-property review aggregates. Rows are kept in sync with `reviews` by
+    mapper events in services/ratings.py.
+    """
+    __tablename__ = 'property_rating_summary'
+
+    property_id = Column(Integer, ForeignKey('properties.property_id'), primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    rating_avg = Column(Float, nullable=True)  # NULL once the last review is gone
+    rating_1 = Column(Integer, nullable=False, default=0)
+    rating_2 = Column(Integer, nullable=False, default=0)
+    rating_3 = Column(Integer, nullable=False, default=0)
+    rating_4 = Column(Integer, nullable=False, default=0)
+    rating_5 = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('ix_property_rating_summary_rating_avg', 'rating_avg'),
+    )
+
 
 class Payment(BaseTable):
     __tablename__ = 'payments'
@@ -0,0 +1,207 @@
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import List, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from core.config import (
+    READ_REPLICA_URLS, READ_YOUR_WRITES_SECONDS, REPLICA_MAX_OVERFLOW,
+    REPLICA_POOL_SIZE, REPLICA_RETRY_SECONDS, USE_ASYNC_DB,
+)
+from database.session import SessionLocal, AsyncSessionLocal, async_engine, async_url_for, engine, pool_options
+
+# Set by write requests; reads from that client go to the primary until it expires
+READ_PRIMARY_COOKIE = "read_primary_until"
+# Lets a client ask for primary reads explicitly, e.g. right after a redirect
+CONSISTENCY_HEADER = "x-read-consistency"
+# Per-replica pool sizing, given as query parameters on its URL
+POOL_PARAMETERS = ("pool_size", "max_overflow")
+
+
+class ReplicaSet:
+    """Round-robin over read-only engines, skipping ones that recently failed."""
+
+    def __init__(self, engines: List, retry_seconds: int):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._down_until = [0.0] * len(engines)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def candidates(self):
+        """Yield ``(index, engine)`` of healthy replicas, starting at the next in turn."""
+        if not self.engines:
+            return
+        start = next(self._counter)
+        now = time.monotonic()
+        for offset in range(len(self.engines)):
+            idx = (start + offset) % len(self.engines)
+            if self._down_until[idx] <= now:
+                yield idx, self.engines[idx]
+
+    def mark_down(self, idx: int) -> None:
+        with self._lock:
+            self._down_until[idx] = time.monotonic() + self.retry_seconds
+
+    def connect(self) -> Optional[Tuple[int, object]]:
+        """``(index, connection)`` of a healthy replica, or None when all are down."""
+        for idx, replica in self.candidates():
+            try:
+                return idx, replica.connect()
+            except DBAPIError:
+                self.mark_down(idx)
+        return None
+
+    async def connect_async(self) -> Optional[Tuple[int, object]]:
+        for idx, replica in self.candidates():
+            try:
+                return idx, await replica.connect()
+            except DBAPIError:
+                self.mark_down(idx)
+        return None
+
+    def status(self) -> List[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "url": replica.url.render_as_string(hide_password=True),
+                "healthy": self._down_until[idx] <= now,
+                "pool": replica.pool.status(),
+            }
+            for idx, replica in enumerate(self.engines)
+        ]
+
+
+def _replica_failure(error: DBAPIError) -> bool:
+    # Constraint and programming errors are the query's fault, not the replica's
+    return isinstance(error, OperationalError) or error.connection_invalidated
+
+
+class ReplicaSession(Session):
+    """Session on a replica connection that moves to ``primary`` if the replica fails.
+
+    A statement failing with a connection or operational error marks the
+    replica down and is retried once on the primary. The rollback expires
+    objects loaded so far, so they reload from the primary too. Async
+    sessions use it as their ``sync_session_class``.
+    """
+
+    def __init__(self, *args, replica_set: ReplicaSet, replica_index: int, primary, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._replica_set = replica_set
+        self._replica_index = replica_index
+        self._primary = primary
+
+    # execute(), scalar(), scalars(), Query and lazy loads all funnel through here
+    def _execute_internal(self, *args, **kwargs):
+        try:
+            return super()._execute_internal(*args, **kwargs)
+        except DBAPIError as e:
+            if self._primary is None or not _replica_failure(e):
+                raise
+            self._fail_over()
+        return super()._execute_internal(*args, **kwargs)
+
+    def _fail_over(self) -> None:
+        self._replica_set.mark_down(self._replica_index)
+        self.rollback()
+        self.bind, self._primary = self._primary, None
+
+
+def _replica_options(url: str) -> Tuple[str, dict]:
+    """Engine URL and options for a replica; ``pool_size``/``max_overflow`` on the URL override the defaults."""
+    parsed = make_url(url)
+    pool_size = int(parsed.query.get("pool_size", REPLICA_POOL_SIZE))
+    max_overflow = int(parsed.query.get("max_overflow", REPLICA_MAX_OVERFLOW))
+    url = parsed.difference_update_query(POOL_PARAMETERS).render_as_string(hide_password=False)
+    return url, dict(pool_pre_ping=True, **pool_options(url, pool_size, max_overflow))
+
+
+def _replica_engine(url: str, create=create_engine):
+    url, options = _replica_options(url)
+    return create(url, **options)
+
+
+replicas = ReplicaSet([_replica_engine(url) for url in READ_REPLICA_URLS], REPLICA_RETRY_SECONDS)
+_async_replica_urls = [async_url_for(url) for url in READ_REPLICA_URLS] if USE_ASYNC_DB else []
+async_replicas = ReplicaSet(
+    [_replica_engine(url, create_async_engine) for url in _async_replica_urls],
+    REPLICA_RETRY_SECONDS,
+)
+
+
+def prefers_primary(request: Request) -> bool:
+    if request.headers.get(CONSISTENCY_HEADER, "").lower() == "primary":
+        return True
+    pinned_until = request.cookies.get(READ_PRIMARY_COOKIE)
+    try:
+        return pinned_until is not None and float(pinned_until) > time.time()
+    except ValueError:
+        return False
+
+
+def read_primary_cookie() -> dict:
+    """Cookie arguments that pin a client's reads to the primary after a write."""
+    return {
+        "key": READ_PRIMARY_COOKIE,
+        "value": str(int(time.time()) + READ_YOUR_WRITES_SECONDS),
+        "max_age": READ_YOUR_WRITES_SECONDS,
+        "httponly": True,
+    }
+
+
+@contextmanager
+def read_session(primary: bool = False):
+    """Session on a healthy replica, falling back to the primary."""
+    replica = None if primary else replicas.connect()
+    if replica is None:
+        db = SessionLocal()
+    else:
+        idx, connection = replica
+        db = ReplicaSession(bind=connection, autoflush=False, replica_set=replicas, replica_index=idx, primary=engine)
+    try:
+        yield db
+    finally:
+        db.close()
+        if replica is not None:
+            connection.close()
+
+
+@asynccontextmanager
+async def async_read_session(primary: bool = False):
+    replica = None if primary else await async_replicas.connect_async()
+    if replica is None:
+        db = AsyncSessionLocal()
+    else:
+        idx, connection = replica
+        db = AsyncSession(
+            bind=connection, autoflush=False, expire_on_commit=False, sync_session_class=ReplicaSession,
+            replica_set=async_replicas, replica_index=idx, primary=async_engine.sync_engine,
+        )
+    try:
+        yield db
+    finally:
+        await db.close()
+        if replica is not None:
+            await connection.close()
+
+
+# Dependency for read-only handlers
+def get_read_db(request: Request):
+    with read_session(prefers_primary(request)) as db:
+        yield db
+
+
+# Dependency for read-only async handlers
+async def get_async_read_db(request: Request):
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database stack is disabled, set [Database] USE_ASYNC = true")
+    async with async_read_session(prefers_primary(request)) as db:
+        yield db
@@ -1,13 +1,76 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.declarative import declarative_base
 # from typing import Generator
 
-# Define the DATABASE_URL
-DATABASE_URL = "sqlite:///./hotel.db"
+from core.config import (
+    DATABASE_URL, ASYNC_DATABASE_URL, USE_ASYNC_DB, POOL_SIZE, MAX_OVERFLOW,
+    SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE, SQLITE_BUSY_TIMEOUT_MS,
+)
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def pool_options(url: str, pool_size: int, max_overflow: int) -> dict:
+    """Pool sizing arguments, or none for dialects that do not pool (e.g. aiosqlite files)."""
+    parsed = make_url(url)
+    if not issubclass(parsed.get_dialect().get_pool_class(parsed), QueuePool):
+        return {}
+    return {"pool_timeout": 30, "pool_recycle": 600, "pool_size": pool_size, "max_overflow": max_overflow}
+
+
+def sqlite_pragmas(
+    journal_mode: str = SQLITE_JOURNAL_MODE,
+    synchronous: str = SQLITE_SYNCHRONOUS,
+    mmap_size: int = SQLITE_MMAP_SIZE,
+    cache_size: int = SQLITE_CACHE_SIZE,
+    busy_timeout_ms: int = SQLITE_BUSY_TIMEOUT_MS,
+) -> list:
+    return [
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA mmap_size={int(mmap_size)}",
+        f"PRAGMA cache_size={int(cache_size)}",
+        f"PRAGMA busy_timeout={int(busy_timeout_ms)}",
+    ]
+
+
+def apply_sqlite_profile(sync_engine, pragmas=None) -> None:
+    """Run the SQLite pragmas on every new connection of ``sync_engine``.
+
+    Also takes transaction control away from the pysqlite driver, which
+    otherwise defers BEGIN and breaks SAVEPOINT. A connection opened with the
+    ``sqlite_begin="IMMEDIATE"`` execution option takes the write lock up front.
+    """
+    statements = sqlite_pragmas() if pragmas is None else pragmas
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    @event.listens_for(sync_engine, "begin")
+    def _on_begin(conn):
+        mode = conn.get_execution_options().get("sqlite_begin")
+        conn.exec_driver_sql(f"BEGIN {mode}" if mode else "BEGIN")
+
 
 # Create the SQLAlchemy engine
-engine = create_engine(DATABASE_URL, pool_timeout=30, pool_recycle=600, max_overflow=15, pool_size=10)
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL, POOL_SIZE, MAX_OVERFLOW))
+is_sqlite = engine.dialect.name == "sqlite"
+if is_sqlite:
+    apply_sqlite_profile(engine)
 
 # Create a sessionmaker object
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -15,10 +78,38 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Define the base class for declarative models
 Base = declarative_base()
 
+
+def async_url_for(url: str) -> str:
+    """Map a sync database URL onto the matching asyncio driver."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r}, set [Database] ASYNC_URL")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+# The async stack is only built when enabled, so its drivers stay optional
+async_engine = None
+AsyncSessionLocal = None
+if USE_ASYNC_DB:
+    _async_url = ASYNC_DATABASE_URL or async_url_for(DATABASE_URL)
+    async_engine = create_async_engine(_async_url, **pool_options(_async_url, POOL_SIZE, MAX_OVERFLOW))
+    if async_engine.dialect.name == "sqlite":
+        apply_sqlite_profile(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Dependency to get a database session
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Dependency to get an async database session
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database stack is disabled, set [Database] USE_ASYNC = true")
+    async with AsyncSessionLocal() as db:
+        yield db
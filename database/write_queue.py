@@ -0,0 +1,149 @@
+"""Single-writer group commit for SQLite.
+
+SQLite allows one writer at a time, so concurrent request threads that each
+commit their own transaction queue up on the database lock and pay one fsync
+per commit. Instead, write units are handed to one writer thread which runs
+every queued unit in its own SAVEPOINT inside a shared transaction and commits
+the batch once. A failing unit only rolls back its savepoint; its caller gets
+the exception, the rest of the batch still commits.
+
+A write unit is ``fn(db, *args)``: it may query, add and flush, but must not
+commit or roll back the session itself. It runs in a copy of the submitting
+caller's context, so context variables such as the per-request database
+accounting of utils.metrics follow it onto the writer thread.
+"""
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, sessionmaker
+
+from core.config import SQLITE_GROUP_COMMIT, SQLITE_GROUP_COMMIT_MAX_BATCH, SQLITE_GROUP_COMMIT_MAX_WAIT_MS
+from database.session import engine, is_sqlite
+
+
+class WriteQueue:
+    def __init__(self, session_factory, max_batch: int = 64, max_wait_ms: int = 2):
+        self._session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._jobs = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.jobs = 0
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, fn, *args) -> Future:
+        future = Future()
+        self._ensure_started()
+        self._jobs.put((fn, args, future, contextvars.copy_context()))
+        return future
+
+    def run(self, fn, *args):
+        """Run a write unit and block until its batch has committed."""
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def _next_batch(self) -> list:
+        batch = [self._jobs.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                batch.append(self._jobs.get(timeout=timeout) if timeout > 0 else self._jobs.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                self._commit_batch(batch)
+            except Exception as e:
+                for _, _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _commit_batch(self, batch) -> None:
+        results = []
+        with self._session_factory() as db:
+            # Take the write lock up front rather than failing to upgrade later
+            db.connection(execution_options={"sqlite_begin": "IMMEDIATE"})
+            for fn, args, future, context in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with db.begin_nested():
+                        result = context.run(fn, db, *args)
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    results.append((future, result))
+            db.commit()
+
+        self.batches += 1
+        self.jobs += len(batch)
+        for future, result in results:
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "jobs": self.jobs,
+            "avg_batch": round(self.jobs / self.batches, 2) if self.batches else 0.0,
+            "queued": self._jobs.qsize(),
+        }
+
+
+# Results are read after the batch commits, so keep loaded attributes around
+WriterSession = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+write_queue = (
+    WriteQueue(WriterSession, SQLITE_GROUP_COMMIT_MAX_BATCH, SQLITE_GROUP_COMMIT_MAX_WAIT_MS)
+    if is_sqlite and SQLITE_GROUP_COMMIT else None
+)
+
+
+def _run_in_session(db: Session, fn, args):
+    try:
+        result = fn(db, *args)
+        db.commit()
+        return result
+    except Exception:
+        db.rollback()
+        raise
+
+
+def run_write(db: Session, fn, *args):
+    """Run ``fn(db, *args)`` as a committed write.
+
+    Goes through the group-commit writer when it is enabled, otherwise runs
+    on the request session ``db`` and commits it.
+    """
+    if write_queue is not None:
+        # End the request session's read transaction so it cannot hold a lock the writer waits for
+        db.close()
+        return write_queue.run(fn, *args)
+    return _run_in_session(db, fn, args)
+
+
+async def run_write_async(db: Session, fn, *args):
+    if write_queue is not None:
+        db.close()
+        return await write_queue.run_async(fn, *args)
+    return await run_in_threadpool(_run_in_session, db, fn, args)
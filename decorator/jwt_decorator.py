@@ -3,10 +3,14 @@ import jwt
 from functools import wraps
 from sqlalchemy.orm import Session
 from database.session import get_db
-from database.models import User, Token
+from database.models import User
 from fastapi import Header, HTTPException, Depends
 
-from core.config import SECRET_KEY
+from core.config import JWT_STATELESS, SECRET_KEY
+from utils.auth_utils import token_digest
+from utils.token_cache import token_cache
+from utils.revocations import revocation_filter
+from utils.token_store import token_store
 
 
 def jwt_authorization(authorization: str = Header(None), db: Session = Depends(get_db)):
@@ -14,9 +18,16 @@ def jwt_authorization(authorization: str = Header(None), db: Session = Depends(g
             raise HTTPException(status_code=401, detail="Bearer token not provided")
 
     token = authorization.split("Bearer ")[1]
+    cache_key = token_digest(token)
+    principal = token_cache.get(cache_key)
+    if principal is not None:
+        return principal
+
+    if JWT_STATELESS:
+        return _stateless_principal(token, cache_key)
+
     try:
-        login_detail = db.query(Token).filter(Token.token == token).first()
-        if login_detail is None:
+        if token_store.lookup(db, cache_key) is None:
              raise HTTPException(status_code=401, detail="Invalid token")
 
         payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
@@ -31,4 +42,26 @@ def jwt_authorization(authorization: str = Header(None), db: Session = Depends(g
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    return {"user_id": user_id, "is_admin": user.is_admin, "is_staff": user.is_staff}
\ No newline at end of file
+    principal = {"user_id": user_id, "is_admin": user.is_admin, "is_staff": user.is_staff}
+    if payload.get("exp") is not None:
+        token_cache.set(cache_key, principal, payload["exp"])
+
+    return principal
+
+def _stateless_principal(token: str, cache_key: str) -> dict:
+    """Principal from the signed claims alone; no database access."""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token has expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    user_id = payload.get("user_id")
+    if user_id is None or revocation_filter.is_revoked(user_id, payload.get("iat")):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    principal = {"user_id": user_id, "is_admin": payload.get("is_admin"), "is_staff": payload.get("is_staff")}
+    if payload.get("exp") is not None:
+        token_cache.set(cache_key, principal, payload["exp"])
+    return principal
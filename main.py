@@ -1,13 +1,48 @@
-from fastapi import FastAPI, Header, HTTPException
-from database.session import engine
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import Response
+from core.config import METRICS_ENABLED, PROFILING_ENABLED, QUERY_PROFILER_ENABLED, READ_REPLICA_URLS
+from database.session import async_engine, engine, SessionLocal
+from database.replicas import async_replicas, read_primary_cookie, replicas
 from database import models
+from database.migrations import upgrade
 from fastapi.middleware.cors import CORSMiddleware
 
-from routers import auth, admin, user, property, property_image, amenity
+from routers import auth, admin, user, property, property_image, amenity, booking
+from services import geo_index, ratings, search_index
+from services.bookings import hold_sweeper
+from utils import metrics, query_profiler, request_profiler
+from utils.revocations import refresh_revocations, revocation_refresher
+from utils.token_store import token_sweeper
+
+background_tasks = [hold_sweeper, token_sweeper, revocation_refresher]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Importing this module has no side effects; the database is migrated and
+    # the sweepers run only while the app is being served
+    upgrade(engine)
+
+    with SessionLocal() as db:
+        geo_index.ensure_index(db)
+        search_index.ensure_index(db)
+        ratings.ensure_summary(db)
+
+    # Rebuild the revocation filter before serving stateless tokens
+    refresh_revocations()
+
+    for task in background_tasks:
+        task.start()
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            task.stop()
 
-models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS
 origins = ["*"]
@@ -19,12 +54,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Inside the other middlewares, so the sampled task is the one running the endpoint
+if PROFILING_ENABLED:
+    app.add_middleware(request_profiler.RequestProfilerMiddleware)
+
+# Pin a client's reads to the primary for a short while after it writes, so
+# it does not read stale data from a lagging replica
+if READ_REPLICA_URLS:
+    @app.middleware("http")
+    async def read_your_writes(request: Request, call_next):
+        response = await call_next(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            response.set_cookie(**read_primary_cookie())
+        return response
+
+# Sync engines behind every session the app opens, async ones included
+instrumented_engines = [engine, *replicas.engines] + [
+    async_db_engine.sync_engine for async_db_engine in [async_engine, *async_replicas.engines]
+    if async_db_engine is not None
+]
+
+if QUERY_PROFILER_ENABLED:
+    query_profiler.enable()
+    for instrumented in instrumented_engines:
+        query_profiler.instrument_engine(instrumented)
+    app.add_middleware(query_profiler.QueryProfilerMiddleware)
+
+# Outermost, so the latency covers every other middleware
+if METRICS_ENABLED:
+    for instrumented in instrumented_engines:
+        metrics.instrument_engine(instrumented)
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    def get_metrics():
+        return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
 # Include your routers here
 app.include_router(auth.router, prefix="/rest/v1/auth", tags=["Authentication"])
 app.include_router(user.router, prefix="/rest/v1/user", tags=["User Api"])
 app.include_router(property.router, prefix="/rest/v1/property", tags=["Property Api"])
 app.include_router(property_image.router, prefix="/rest/v1/property-image", tags=["Property Images Api"])
 app.include_router(amenity.router, prefix="/rest/v1/amenity", tags=["Amenity Api"])
+app.include_router(booking.router, prefix="/rest/v1/booking", tags=["Booking Api"])
 app.include_router(admin.router, prefix="/rest/v1/admin", tags=["Admin Api"])
 
 
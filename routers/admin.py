@@ -1,12 +1,25 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Path, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
-from typing import Dict
+from typing import Dict, Optional
 from database.session import get_db
 from database.models import User
 from datetime import datetime, timedelta
 from core.config import ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
 from decorator.jwt_decorator import jwt_authorization
+from routers.request_models.user_models import UserRoleUpdate
+from utils.token_cache import token_cache
+from utils.token_store import token_store
+from utils.revocations import revocation_filter, revoke_user_tokens
+from database.replicas import async_replicas, replicas
+from database.write_queue import run_write, write_queue
+from utils.cache_utils import read_cache
+from utils import query_profiler
+from utils.request_profiler import profile_store
+from services.property_import import DEFAULT_CHUNK_SIZE, PropertyImporter, RecordParser
+from services import exports
 
 router = APIRouter()
 
@@ -38,12 +51,208 @@ def delete_user(
     if not token_data.get("is_admin"):
         raise HTTPException(status_code=403, detail="Permission denied")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    run_write(db, _delete_user, user_id)
+    token_cache.invalidate_user(user_id)
     
+    return {"message": "User deleted successfully"}
+
+
+# Write units for database.write_queue.run_write: flush, never commit
+def _get_user(db: Session, user_id: int) -> User:
+    user = db.query(User).filter(User.user_id == user_id).first()
+
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    
+    return user
+
+
+def _delete_user(db: Session, user_id: int) -> None:
+    user = _get_user(db, user_id)
+    token_store.revoke_user(db, user_id)
+    revoke_user_tokens(db, user_id)
     db.delete(user)
-    db.commit()
-    
-    return {"message": "User deleted successfully"}
\ No newline at end of file
+    db.flush()
+
+
+def _update_user_role(db: Session, user_id: int, values: dict) -> User:
+    user = _get_user(db, user_id)
+    for key, value in values.items():
+        setattr(user, key, value)
+
+    # Stateless tokens carry the old roles in their claims
+    revoke_user_tokens(db, user_id)
+    db.flush()
+    return user
+
+
+@router.put("/update-user-role/{user_id}")
+def update_user_role(
+    user_id: int,
+    role: UserRoleUpdate,
+    db: Session = Depends(get_db),
+    token_data: dict = Depends(jwt_authorization)  # Extracting token data
+):
+    # Checking if the user is admin
+    if not token_data.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    user = run_write(db, _update_user_role, user_id, role.dict(exclude_unset=True))
+    # Cached principals carry the old roles
+    token_cache.invalidate_user(user_id)
+
+    return {"message": "User role updated successfully", "user_id": user_id, "is_admin": user.is_admin, "is_staff": user.is_staff}
+
+
+@router.get("/token-cache-stats")
+def get_token_cache_stats(token_data: dict = Depends(jwt_authorization)):
+    if not token_data.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    return {**token_cache.stats(), "revoked_users": revocation_filter.stats()["users"]}
+
+@router.get("/replica-status")
+def get_replica_status(token_data: dict = Depends(jwt_authorization)):
+    if not token_data.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    return {"replicas": replicas.status(), "async_replicas": async_replicas.status()}
+
+
+@router.get("/write-queue-stats")
+def get_write_queue_stats(token_data: dict = Depends(jwt_authorization)):
+    if not token_data.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    return write_queue.stats() if write_queue is not None else {"enabled": False}
+
+
+@router.get("/read-cache-stats")
+def get_read_cache_stats(token_data: dict = Depends(jwt_authorization)):
+    if not token_data.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    return read_cache.stats()
+
+
+@router.get("/query-profile")
+def get_query_profile(
+    limit: int = Query(20, ge=1, le=200),
+    sort_by: str = Query("total_ms", pattern="^(total_ms|max_ms|count|max_executions)$"),
+    token_data: dict = Depends(jwt_authorization)
+):
+    """Top slow statements and N+1 suspects since startup (see utils.query_profiler)."""
+    if not token_data.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    return {
+        "enabled": query_profiler.enabled,
+        "slow_queries": query_profiler.offenders.top("slow_query", limit, sort_by),
+        "n_plus_one": query_profiler.offenders.top("n_plus_one", limit, sort_by),
+    }
+
+
+@router.delete("/query-profile")
+def reset_query_profile(token_data: dict = Depends(jwt_authorization)):
+    if not token_data.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    query_profiler.offenders.reset()
+    return {"msg": "Query profile reset"}
+
+
+@router.get("/profiles")
+def list_profiles(token_data: dict = Depends(jwt_authorization)):
+    """Requests profiled with the X-Profile header, newest first (see utils.request_profiler)."""
+    if not token_data.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    return {"profiles": profile_store.list()}
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(
+    profile_id: str = Path(..., pattern="^[0-9a-f]{32}$"),
+    token_data: dict = Depends(jwt_authorization)
+):
+    """Sampled stacks in collapsed format, for flamegraph.pl or speedscope."""
+    if not token_data.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    path = profile_store.collapsed_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.collapsed")
+
+
+@router.delete("/profiles/{profile_id}")
+def delete_profile(
+    profile_id: str = Path(..., pattern="^[0-9a-f]{32}$"),
+    token_data: dict = Depends(jwt_authorization)
+):
+    if not token_data.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    if not profile_store.delete(profile_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return {"msg": "Profile deleted"}
+
+
+@router.post("/import-properties")
+async def import_properties(
+    request: Request,
+    import_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    start_row: int = Query(1, ge=1, description="Resume with last_committed_row + 1"),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=10000),
+    owner_id: Optional[int] = Query(None, description="Defaults to the caller"),
+    token_data: dict = Depends(jwt_authorization),
+    db: Session = Depends(get_db)
+):
+    """Stream a CSV or NDJSON body of properties into the catalog, a chunk per commit."""
+    if not token_data.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    if owner_id is not None and await run_in_threadpool(db.get, User, owner_id) is None:
+        raise HTTPException(status_code=404, detail="Owner not found")
+
+    parser = RecordParser(import_format)
+    importer = PropertyImporter(db, owner_id or token_data["user_id"], start_row, chunk_size)
+
+    async for data in request.stream():
+        for record in parser.feed(data):
+            if importer.add(record):
+                await run_in_threadpool(importer.flush)
+        if parser.error:
+            await run_in_threadpool(importer.fail, parser.error)
+        if importer.failure:
+            return importer.result()
+
+    for record in parser.close():
+        if importer.add(record):
+            await run_in_threadpool(importer.flush)
+    if parser.error:
+        await run_in_threadpool(importer.fail, parser.error)
+    await run_in_threadpool(importer.flush)
+    return importer.result()
+
+
+@router.get("/export/{entity}")
+def export_entity(
+    entity: str,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    gzip: bool = False,
+    updated_from: Optional[datetime] = Query(None, description="Inclusive lower bound on updated_at"),
+    updated_to: Optional[datetime] = Query(None, description="Exclusive upper bound on updated_at"),
+    token_data: dict = Depends(jwt_authorization)
+):
+    """Stream every row of properties, bookings or payments as CSV or NDJSON."""
+    if not token_data.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Permission denied")
+    if entity not in exports.EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown export {entity!r}")
+
+    filename = f"{entity}.{export_format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        exports.export_rows(entity, export_format, gzip, updated_from, updated_to),
+        media_type="application/gzip" if gzip else exports.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,17 +1,35 @@
 from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy import and_, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, Iterable, List, Set
+from core.config import USE_ASYNC_DB
 from database.models import Amenity, Property, property_amenity
 from database.session import get_db
-from routers.request_models.amenity_models import AmenityBase, AmenityOut
+from database.replicas import get_read_db, get_async_read_db
+from database.write_queue import run_write
+from routers.request_models.amenity_models import AmenityBase, AmenityOut, PropertyAmenitySet, AmenityAssignmentOut
 from decorator.jwt_decorator import jwt_authorization
+from utils.cache_utils import read_cache
 
 router = APIRouter()
 
+# Keeps IN lists well below SQLite's bound parameter limit
+IN_CHUNK_SIZE = 500
 
-@router.get("/amenities", response_model=List[AmenityOut])
-def list_amenities(db: Session = Depends(get_db)):
-    return db.query(Amenity).all()
+
+def _list_amenities(db: Session):
+    return [AmenityOut.model_validate(amenity, from_attributes=True).model_dump() for amenity in db.query(Amenity).all()]
+
+
+if USE_ASYNC_DB:
+    @router.get("/amenities", response_model=List[AmenityOut])
+    async def list_amenities(db: AsyncSession = Depends(get_async_read_db)):
+        return await read_cache.cached_async(read_cache.key("amenities"), lambda: db.run_sync(_list_amenities))
+else:
+    @router.get("/amenities", response_model=List[AmenityOut])
+    def list_amenities(db: Session = Depends(get_read_db)):
+        return read_cache.cached(read_cache.key("amenities"), lambda: _list_amenities(db))
 
 
 @router.post("/amenities", response_model=AmenityOut)
@@ -23,11 +41,7 @@ def add_amenity(
     if not token_data.get("is_admin"):
         raise HTTPException(status_code=403, detail="Only admins can add amenities")
 
-    new_amenity = Amenity(name=amenity.name)
-    db.add(new_amenity)
-    db.commit()
-    db.refresh(new_amenity)
-    return new_amenity
+    return run_write(db, _add_amenity, amenity.name)
 
 
 @router.put("/amenities/{amenity_id}", response_model=AmenityOut)
@@ -40,14 +54,7 @@ def update_amenity(
     if not token_data.get("is_admin"):
         raise HTTPException(status_code=403, detail="Only admins can update amenities")
 
-    amenity = db.query(Amenity).filter(Amenity.amenity_id == amenity_id).first()
-    if not amenity:
-        raise HTTPException(status_code=404, detail="Amenity not found")
-
-    amenity.name = update_data.name
-    db.commit()
-    db.refresh(amenity)
-    return amenity
+    return run_write(db, _update_amenity, amenity_id, update_data.name)
 
 
 @router.delete("/amenities/{amenity_id}")
@@ -59,22 +66,98 @@ def delete_amenity(
     if not token_data.get("is_admin"):
         raise HTTPException(status_code=403, detail="Only admins can delete amenities")
 
+    run_write(db, _delete_amenity, amenity_id)
+    return {"msg": "Amenity deleted"}
+
+
+# Write units for database.write_queue.run_write: flush, never commit
+def _add_amenity(db: Session, name: str) -> Amenity:
+    new_amenity = Amenity(name=name)
+    db.add(new_amenity)
+    read_cache.invalidate_after_commit(db, "amenities")
+    db.flush()
+    db.refresh(new_amenity)
+    return new_amenity
+
+
+def _get_amenity(db: Session, amenity_id: int) -> Amenity:
     amenity = db.query(Amenity).filter(Amenity.amenity_id == amenity_id).first()
     if not amenity:
         raise HTTPException(status_code=404, detail="Amenity not found")
+    return amenity
 
-    db.delete(amenity)
-    db.commit()
-    return {"msg": "Amenity deleted"}
 
+def _update_amenity(db: Session, amenity_id: int, name: str) -> Amenity:
+    amenity = _get_amenity(db, amenity_id)
+    amenity.name = name
+    read_cache.invalidate_after_commit(db, "amenities")
+    db.flush()
+    db.refresh(amenity)
+    return amenity
 
-@router.post("/properties/{property_id}/amenities")
-def assign_amenities_to_property(
-    property_id: int,
-    amenity_ids: List[int],
-    token_data: dict = Depends(jwt_authorization),
-    db: Session = Depends(get_db)
-):
+
+def _delete_amenity(db: Session, amenity_id: int) -> None:
+    db.delete(_get_amenity(db, amenity_id))
+    read_cache.invalidate_after_commit(db, "amenities")
+    db.flush()
+
+
+def _chunks(values: List[int]) -> Iterable[List[int]]:
+    for start in range(0, len(values), IN_CHUNK_SIZE):
+        yield values[start:start + IN_CHUNK_SIZE]
+
+
+def _check_amenities_exist(db: Session, amenity_ids: Iterable[int]) -> None:
+    wanted = list(dict.fromkeys(amenity_ids))
+    found = set()
+    for chunk in _chunks(wanted):
+        found.update(aid for aid, in db.query(Amenity.amenity_id).filter(Amenity.amenity_id.in_(chunk)))
+
+    missing = [aid for aid in wanted if aid not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Amenity {missing[0]} not found")
+
+
+def _apply_amenity_sets(db: Session, desired: Dict[int, Set[int]]):
+    """Bring ``property_amenity`` in line with ``desired``, touching only changed rows.
+
+    Returns:
+        Tuple: ``(added, removed)`` row counts
+    """
+    current: Dict[int, Set[int]] = {pid: set() for pid in desired}
+    for chunk in _chunks(list(desired)):
+        rows = db.execute(
+            property_amenity.select().where(property_amenity.c.property_id.in_(chunk))
+        )
+        for pid, aid in rows:
+            current[pid].add(aid)
+
+    to_add = [
+        {"pid": pid, "aid": aid}
+        for pid, amenity_ids in desired.items() for aid in sorted(amenity_ids - current[pid])
+    ]
+    to_remove = [
+        {"pid": pid, "aid": aid}
+        for pid, amenity_ids in desired.items() for aid in sorted(current[pid] - amenity_ids)
+    ]
+
+    if to_remove:
+        db.execute(
+            property_amenity.delete().where(and_(
+                property_amenity.c.property_id == bindparam("pid"),
+                property_amenity.c.amenity_id == bindparam("aid"),
+            )),
+            to_remove,
+        )
+    if to_add:
+        db.execute(
+            property_amenity.insert().values(property_id=bindparam("pid"), amenity_id=bindparam("aid")),
+            to_add,
+        )
+    return len(to_add), len(to_remove)
+
+
+def _assign_amenities(db: Session, property_id: int, amenity_ids: List[int], token_data: dict):
     property_obj = db.query(Property).filter(Property.property_id == property_id).first()
     if not property_obj:
         raise HTTPException(status_code=404, detail="Property not found")
@@ -82,19 +165,48 @@ def assign_amenities_to_property(
     if token_data["user_id"] != property_obj.owner_id and not token_data.get("is_admin"):
         raise HTTPException(status_code=403, detail="Not authorized to assign amenities")
 
-    for aid in amenity_ids:
-        exists = db.query(Amenity).filter(Amenity.amenity_id == aid).first()
-        if not exists:
-            raise HTTPException(status_code=404, detail=f"Amenity {aid} not found")
+    _check_amenities_exist(db, amenity_ids)
+    return _apply_amenity_sets(db, {property_id: set(amenity_ids)})
+
+
+def _bulk_assign_amenities(db: Session, desired: Dict[int, Set[int]], token_data: dict):
+    owners = {}
+    for chunk in _chunks(list(desired)):
+        owners.update(db.query(Property.property_id, Property.owner_id).filter(Property.property_id.in_(chunk)))
+
+    for property_id in desired:
+        if property_id not in owners:
+            raise HTTPException(status_code=404, detail=f"Property {property_id} not found")
+        if token_data["user_id"] != owners[property_id] and not token_data.get("is_admin"):
+            raise HTTPException(status_code=403, detail=f"Not authorized to assign amenities to property {property_id}")
 
-    # Delete old relations first
-    db.execute(property_amenity.delete().where(property_amenity.c.property_id == property_id))
+    _check_amenities_exist(db, (aid for amenity_ids in desired.values() for aid in amenity_ids))
+    return _apply_amenity_sets(db, desired)
 
-    # Insert new relations
-    insert_stmt = property_amenity.insert().values([
-        {"property_id": property_id, "amenity_id": aid} for aid in amenity_ids
-    ])
-    db.execute(insert_stmt)
-    db.commit()
 
-    return {"msg": "Amenities assigned successfully"}
+@router.post("/properties/{property_id}/amenities", response_model=AmenityAssignmentOut)
+def assign_amenities_to_property(
+    property_id: int,
+    amenity_ids: List[int],
+    token_data: dict = Depends(jwt_authorization),
+    db: Session = Depends(get_db)
+):
+    added, removed = run_write(db, _assign_amenities, property_id, amenity_ids, token_data)
+    return {"msg": "Amenities assigned successfully", "added": added, "removed": removed}
+
+
+@router.post("/properties/amenities/bulk", response_model=AmenityAssignmentOut)
+def bulk_assign_amenities(
+    assignments: List[PropertyAmenitySet],
+    token_data: dict = Depends(jwt_authorization),
+    db: Session = Depends(get_db)
+):
+    """Replace the amenity sets of many properties in one write unit."""
+    desired: Dict[int, Set[int]] = {}
+    for assignment in assignments:
+        if assignment.property_id in desired:
+            raise HTTPException(status_code=400, detail=f"Property {assignment.property_id} is listed twice")
+        desired[assignment.property_id] = set(assignment.amenity_ids)
+
+    added, removed = run_write(db, _bulk_assign_amenities, desired, token_data)
+    return {"msg": f"Amenities assigned to {len(desired)} properties", "added": added, "removed": removed}
@@ -1,53 +1,83 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from database.session import get_db
-from database.models import User, Token, UserProfile
-from utils.auth_utils import create_access_token, create_refresh_token, verify_password, hash_password
-from datetime import datetime, timedelta
-from core.config import ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
+from database.write_queue import run_write, run_write_async
+from database.models import User, UserProfile
+from utils.auth_utils import create_access_token, create_refresh_token, verify_password_async, hash_password_async
+from custom_exception.my_exceptions import ServiceBusy
+from datetime import datetime, timedelta, timezone
+from core.config import ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS, JWT_STATELESS
 from decorator.jwt_decorator import jwt_authorization
 from routers.request_models.user_models import UserCreate, UserLogin
+from utils.token_cache import token_cache
+from utils.revocations import revoke_user_tokens
+from utils.token_store import token_store
 
 
 
 router = APIRouter()
 
-@router.post("/signup/")
-def signup(user: UserCreate, db: Session = Depends(get_db)):
 
-    # Check if username or email already exists
-    existing_user = db.query(User).filter(User.email == user.email).first()
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
+# Blocking DB reads of the async endpoints below run in the threadpool and
+# writes go through database.write_queue; password hashing runs on the
+# dedicated pool in utils.auth_utils.
+def _find_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
 
-    # Hash password before storing
-    hashed_password = hash_password(user.password)
 
-    # Create new user
-    new_user = User(email=user.email, password=hashed_password, is_admin = 0, is_staff = 0)
+def _create_user(db: Session, email: str, hashed_password: str) -> int:
+    new_user = User(email=email, password=hashed_password, is_admin = 0, is_staff = 0)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    db.flush()
 
     # Create empty profile for the user
     new_profile = UserProfile(user_id=new_user.user_id)
     db.add(new_profile)
-    db.commit()
+    db.flush()
+    return new_user.user_id
+
+
+def _issue_tokens(db: Session, user_id: int, issued_at: float, tokens) -> None:
+    # Logging in ends the user's earlier sessions
+    if not JWT_STATELESS:
+        token_store.replace_user_tokens(db, user_id, tokens)
+    revoke_user_tokens(db, user_id, issued_at)
+
+
+def _end_sessions(db: Session, user_id: int) -> bool:
+    # Delete all tokens for this user (optional: or just the current token)
+    revoked = JWT_STATELESS or token_store.revoke_user(db, user_id)
+    revoke_user_tokens(db, user_id)
+    return bool(revoked)
+
+
+@router.post("/signup/")
+async def signup(user: UserCreate, db: Session = Depends(get_db)):
+
+    # Check if username or email already exists
+    existing_user = await run_in_threadpool(_find_user_by_email, db, user.email)
+    if existing_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
+
+    # Hash password before storing
+    try:
+        hashed_password = await hash_password_async(user.password)
+    except ServiceBusy as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
 
-    return {"msg": "User created successfully", "user_id": new_user.user_id}
+    user_id = await run_write_async(db, _create_user, user.email, hashed_password)
+
+    return {"msg": "User created successfully", "user_id": user_id}
 
 @router.post("/login/")
 async def login(request: UserLogin, db: Session = Depends(get_db)):
     try:
         # Get user with a single query
-        db_user = (
-            db.query(User)
-            .filter(User.email == request.email)
-            .first()
-        )
+        db_user = await run_in_threadpool(_find_user_by_email, db, request.email)
         
         # Early return if user doesn't exist or password is wrong
-        if not db_user or not verify_password(request.password, db_user.password):
+        if not db_user or not await verify_password_async(request.password, db_user.password):
             raise HTTPException(
                 status_code=401,
                 detail="Invalid email or password"
@@ -65,6 +95,7 @@ async def login(request: UserLogin, db: Session = Depends(get_db)):
 
         # Calculate token expiration times
         current_time = datetime.utcnow()
+        issued_at = current_time.replace(tzinfo=timezone.utc).timestamp()
         access_token_expires = timedelta(minutes=access_token_expire_minutes)
         refresh_token_expires = timedelta(days=refresh_token_expire_days)
 
@@ -73,13 +104,15 @@ async def login(request: UserLogin, db: Session = Depends(get_db)):
             "user_id": db_user.user_id,
             "is_admin": db_user.is_admin if db_user.is_admin is not None else 0,
             "is_staff": db_user.is_staff if db_user.is_admin is not None else 0,
-            "type": "access"  # Add token type for additional security
+            "type": "access",  # Add token type for additional security
+            "iat": issued_at,
         }
         refresh_token_data = {
             "user_id": db_user.user_id,
             "is_admin": db_user.is_admin,
             "is_staff": db_user.is_staff,
-            "type": "refresh"
+            "type": "refresh",
+            "iat": issued_at,
         }
 
         # Generate tokens
@@ -95,39 +128,24 @@ async def login(request: UserLogin, db: Session = Depends(get_db)):
 
         # Use a transaction for database operations
         try:
-            # Remove old tokens
-            # Check if tokens exist before deleting
-            existing_tokens = db.query(Token).filter(Token.user_id == db_user.user_id).all()
-            if existing_tokens:
-                db.query(Token).filter(Token.user_id == db_user.user_id).delete()
-
-            # Add new tokens
-            db.add_all([
-                Token(
-                    user_id=db_user.user_id,
-                    token_type="access",
-                    token=access_token,
-                    expires_at=current_time + access_token_expires
-                ),
-                Token(
-                    user_id=db_user.user_id,
-                    token_type="refresh",
-                    token=refresh_token,
-                    expires_at=current_time + refresh_token_expires
-                )
+            await run_write_async(db, _issue_tokens, refresh_token_data["user_id"], issued_at, [
+                ("access", access_token, current_time + access_token_expires),
+                ("refresh", refresh_token, current_time + refresh_token_expires),
             ])
-            db.commit()
         except Exception as e:
-            db.rollback()
             raise HTTPException(
                 status_code=500,
                 detail="Error while processing authentication"
             )
 
+        # Previous tokens were just deleted, drop their cached principals
+        token_cache.invalidate_user(refresh_token_data["user_id"])
+
+        # db_user is expired by the commit; reuse the values read before it
         return {
-            "user_id": db_user.user_id,
-            "is_admin": db_user.is_admin,
-            "is_staff": db_user.is_staff,
+            "user_id": refresh_token_data["user_id"],
+            "is_admin": refresh_token_data["is_admin"],
+            "is_staff": refresh_token_data["is_staff"],
             "access_token": access_token,
             "refresh_token": refresh_token,
             "token_type": "bearer",
@@ -136,6 +154,8 @@ async def login(request: UserLogin, db: Session = Depends(get_db)):
 
     except HTTPException:
         raise
+    except ServiceBusy as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -149,17 +169,14 @@ def logout(
     db: Session = Depends(get_db)
 ):
 
-    # Find the token and delete it (invalidate)
-    token = db.query(Token).filter(Token.user_id == token_data.user_id).first()
-    if not token:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-
     try:
-        # Delete all tokens for this user (optional: or just the current token)
-        db.query(Token).filter(Token.user_id == token.user_id).delete()
-        db.commit()
+        revoked = run_write(db, _end_sessions, token_data["user_id"])
     except Exception:
-        db.rollback()
         raise HTTPException(status_code=500, detail="Error during logout")
 
+    if not revoked:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    token_cache.invalidate_user(token_data["user_id"])
+
     return {"msg": "Successfully logged out"}
@@ -0,0 +1,126 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from typing import List, Optional
+
+from database.replicas import get_read_db
+from database.models import Property
+from custom_exception.my_exceptions import BookingError
+from database.session import get_db
+from decorator.jwt_decorator import jwt_authorization
+from routers.request_models.booking_models import (
+    AvailabilityOut, BookingCreate, BookingOut, QuoteBatchIn, QuoteOut, QuoteSummaryOut,
+)
+from services import bookings, pricing
+from services.availability import availability_index
+
+router = APIRouter()
+
+AVAILABILITY_SEARCH_DAYS = 365
+
+
+@router.get("/properties/{property_id}/availability", response_model=AvailabilityOut)
+def get_property_availability(
+    property_id: int,
+    start_date: date,
+    end_date: date,
+    nights: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_read_db)
+):
+    if end_date <= start_date:
+        raise HTTPException(status_code=400, detail="end_date must be after start_date")
+
+    if db.get(Property, property_id) is None:
+        raise HTTPException(status_code=404, detail="Property not found")
+
+    next_available_start = None
+    if nights:
+        next_available_start = availability_index.first_free_window(
+            property_id, nights, start_date, start_date + timedelta(days=AVAILABILITY_SEARCH_DAYS)
+        )
+
+    return {
+        "property_id": property_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "is_available": availability_index.is_available(property_id, start_date, end_date),
+        "next_available_start": next_available_start,
+    }
+
+
+def check_stay(start_date: date, end_date: date) -> None:
+    if end_date <= start_date:
+        raise HTTPException(status_code=400, detail="end_date must be after start_date")
+    if (end_date - start_date).days > pricing.MAX_STAY_NIGHTS:
+        raise HTTPException(status_code=400, detail=f"Stays are limited to {pricing.MAX_STAY_NIGHTS} nights")
+
+
+@router.get("/properties/{property_id}/quote", response_model=QuoteOut)
+def get_property_quote(
+    property_id: int,
+    start_date: date,
+    end_date: date,
+    db: Session = Depends(get_read_db)
+):
+    check_stay(start_date, end_date)
+    quote = pricing.quote(db, property_id, start_date, end_date)
+    if quote is None:
+        raise HTTPException(status_code=404, detail="Property not found")
+    return quote
+
+
+@router.post("/properties/quotes", response_model=List[QuoteSummaryOut])
+def quote_properties(body: QuoteBatchIn, db: Session = Depends(get_read_db)):
+    """Stay totals for many properties over the same dates. Unknown ids are omitted."""
+    check_stay(body.start_date, body.end_date)
+    if len(body.property_ids) > pricing.MAX_BATCH_PROPERTIES:
+        raise HTTPException(status_code=400, detail=f"At most {pricing.MAX_BATCH_PROPERTIES} properties per request")
+    quotes = pricing.quote_many(db, body.property_ids, body.start_date, body.end_date)
+    return list(quotes.values())
+
+
+def _booking_out(booking) -> dict:
+    return {
+        "booking_id": booking.booking_id,
+        "traveler_id": booking.traveler_id,
+        "property_id": booking.property_id,
+        "start_date": booking.start_date.date(),
+        "end_date": booking.end_date.date(),
+        "guests": booking.guests,
+        "status": booking.status.value,
+        "total_price": booking.total_price,
+        "hold_expires_at": booking.hold_expires_at,
+    }
+
+
+@router.post("/bookings", response_model=BookingOut)
+def create_booking(
+    body: BookingCreate,
+    db: Session = Depends(get_db),
+    token_data: dict = Depends(jwt_authorization)
+):
+    """Hold the dates as a pending booking; confirm it before the hold expires."""
+    check_stay(body.start_date, body.end_date)
+    try:
+        booking = bookings.create_hold(
+            db, token_data["user_id"], body.property_id, body.start_date, body.end_date, body.guests
+        )
+    except BookingError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    return _booking_out(booking)
+
+
+@router.post("/bookings/{booking_id}/confirm", response_model=BookingOut)
+def confirm_booking(booking_id: int, db: Session = Depends(get_db), token_data: dict = Depends(jwt_authorization)):
+    try:
+        return _booking_out(bookings.confirm(db, booking_id, token_data))
+    except BookingError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+
+@router.post("/bookings/{booking_id}/cancel", response_model=BookingOut)
+def cancel_booking(booking_id: int, db: Session = Depends(get_db), token_data: dict = Depends(jwt_authorization)):
+    try:
+        return _booking_out(bookings.cancel(db, booking_id, token_data))
+    except BookingError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
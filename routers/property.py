@@ -1,14 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+import math
+from datetime import date
 from typing import List, Optional
 
+from core.config import CACHE_LISTING_MAX_IDS, USE_ASYNC_DB
 from database.session import get_db
-from database.models import Property
-from routers.request_models.property_models import PropertyCreate, PropertyUpdate, PropertyOut
+from database.write_queue import run_write
+from database.replicas import get_read_db, get_async_read_db, read_session, async_read_session, prefers_primary
+from database.models import Property, PropertyRatingSummary
+from routers.request_models.property_models import (
+    PropertyCreate, PropertyUpdate, PropertyOut, PropertyPage, PropertySort, PropertyNearbyOut, PropertyDetailOut,
+)
 from decorator.jwt_decorator import jwt_authorization
+from utils.cache_utils import MISSING, read_cache
+from utils.pagination_utils import encode_cursor, decode_cursor
+from services import geo_index, listing_cache, pricing, ratings, search_index
 
 router = APIRouter()
 
+SORT_COLUMNS = {
+    PropertySort.id: Property.property_id,
+    PropertySort.price: Property.price_per_night,
+    PropertySort.created_at: Property.created_at,
+}
+STREAM_BATCH_SIZE = 500
+NDJSON = "application/x-ndjson"
+
 
 @router.post("/properties", response_model=PropertyOut)
 def create_property(
@@ -19,72 +40,167 @@ def create_property(
     if not token_data.get("is_admin") and not token_data.get("is_staff"):
         raise HTTPException(status_code=403, detail="Only property owners or admins can create properties")
 
-    new_property = Property(owner_id=token_data["user_id"], **property_in.dict())
+    return run_write(db, _create_property, token_data["user_id"], property_in.dict())
+
+
+# Write units for database.write_queue.run_write: flush, never commit
+def _create_property(db: Session, owner_id: int, values: dict) -> Property:
+    new_property = Property(owner_id=owner_id, **values)
     db.add(new_property)
-    db.commit()
+    db.flush()
     db.refresh(new_property)
     return new_property
 
 
-@router.get("/properties/{property_id}", response_model=PropertyOut)
-def get_property(property_id: int, db: Session = Depends(get_db)):
+def _get_owned_property(db: Session, property_id: int, token_data: dict, denied: str) -> Property:
     prop = db.query(Property).filter(Property.property_id == property_id).first()
     if not prop:
         raise HTTPException(status_code=404, detail="Property not found")
+
+    if token_data["user_id"] != prop.owner_id and not token_data.get("is_admin", 0):
+        raise HTTPException(status_code=403, detail=denied)
     return prop
 
 
-@router.put("/properties/{property_id}", response_model=PropertyOut)
-def update_property(
-    property_id: int,
-    updates: PropertyUpdate,
-    token_data: dict = Depends(jwt_authorization),
-    db: Session = Depends(get_db)
+def _update_property(db: Session, property_id: int, token_data: dict, values: dict) -> Property:
+    prop = _get_owned_property(db, property_id, token_data, "You are not allowed to update this property")
+    for key, value in values.items():
+        setattr(prop, key, value)
+
+    db.flush()
+    db.refresh(prop)
+    return prop
+
+
+def _delete_property(db: Session, property_id: int, token_data: dict) -> None:
+    prop = _get_owned_property(db, property_id, token_data, "Not authorized to delete this property")
+    db.delete(prop)
+    db.flush()
+    # The property entry itself is retired by services.listing_cache
+    read_cache.invalidate_after_commit(db, "property_images", property_id)
+
+
+def _parse_coordinates(value: str, count: int, name: str):
+    """``count`` numbers read as (lat, lng) pairs."""
+    try:
+        parts = [float(part) for part in value.split(",")]
+    except ValueError:
+        parts = []
+    # float() also accepts "inf" and "nan"
+    if len(parts) != count or not all(math.isfinite(part) for part in parts):
+        raise HTTPException(status_code=400, detail=f"{name} must be {count} comma separated numbers")
+    for lat, lng in zip(parts[::2], parts[1::2]):
+        if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+            raise HTTPException(
+                status_code=400, detail=f"{name} latitudes must be within [-90, 90] and longitudes within [-180, 180]",
+            )
+    return tuple(parts)
+
+
+# Declared before /properties/{property_id} so "nearby" is not taken for an id
+@router.get("/properties/nearby", response_model=List[PropertyNearbyOut])
+def list_nearby_properties(
+    near: Optional[str] = Query(None, description="lat,lng"),
+    radius_km: Optional[float] = Query(None, gt=0, le=1000),
+    bbox: Optional[str] = Query(None, description="min_lat,min_lng,max_lat,max_lng; min_lng > max_lng crosses the antimeridian"),
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    is_available: Optional[int] = 1,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_read_db)
 ):
+    center = _parse_coordinates(near, 2, "near") if near else None
+    box = _parse_coordinates(bbox, 4, "bbox") if bbox else None
+
+    if box is None and (center is None or radius_km is None):
+        raise HTTPException(status_code=400, detail="Provide near and radius_km, or bbox")
+    if radius_km is not None and center is None:
+        raise HTTPException(status_code=400, detail="radius_km requires near")
+
+    query = _filter_properties(db.query(Property), None, None, min_price, max_price, is_available)
+    results = geo_index.search(query, center=center, radius_km=radius_km, bbox=box, limit=limit)
+
+    return [
+        {**PropertyOut.model_validate(prop, from_attributes=True).model_dump(), "distance_km": round(distance, 3)}
+        for prop, distance in results
+    ]
+
+
+def _get_property(db: Session, property_id: int) -> dict:
     prop = db.query(Property).filter(Property.property_id == property_id).first()
     if not prop:
         raise HTTPException(status_code=404, detail="Property not found")
+    # Cached, so keep a plain copy rather than a session-bound instance
+    return PropertyOut.model_validate(prop, from_attributes=True).model_dump()
 
-    if token_data["user_id"] != prop.owner_id and not token_data.get("is_admin", 0):
-        raise HTTPException(status_code=403, detail="You are not allowed to update this property")
 
-    for key, value in updates.dict(exclude_unset=True).items():
-        setattr(prop, key, value)
+# Hot read endpoints run natively async on the AsyncSession stack when it is
+# enabled; the query code is shared and runs through AsyncSession.run_sync.
+if USE_ASYNC_DB:
+    @router.get("/properties/{property_id}", response_model=PropertyOut)
+    async def get_property(property_id: int, db: AsyncSession = Depends(get_async_read_db)):
+        key = read_cache.key("property", property_id)
+        return await read_cache.cached_async(key, lambda: db.run_sync(_get_property, property_id))
+else:
+    @router.get("/properties/{property_id}", response_model=PropertyOut)
+    def get_property(property_id: int, db: Session = Depends(get_read_db)):
+        key = read_cache.key("property", property_id)
+        return read_cache.cached(key, lambda: _get_property(db, property_id))
 
-    db.commit()
-    db.refresh(prop)
-    return prop
 
+def _get_property_detail(db: Session, property_id: int) -> dict:
+    """Property with images (cover first), amenities and rating summary.
 
-@router.delete("/properties/{property_id}")
-def delete_property(
-    property_id: int,
-    token_data: dict = Depends(jwt_authorization),
-    db: Session = Depends(get_db)
-):
-    prop = db.query(Property).filter(Property.property_id == property_id).first()
+    Always four statements: the property, one selectin load per collection
+    and the rating summary row.
+    """
+    prop = (
+        db.query(Property)
+        .options(selectinload(Property.images), selectinload(Property.amenities))
+        .filter(Property.property_id == property_id)
+        .first()
+    )
     if not prop:
         raise HTTPException(status_code=404, detail="Property not found")
 
-    if token_data["user_id"] != prop.owner_id and not token_data.get("is_admin", 0):
-        raise HTTPException(status_code=403, detail="Not authorized to delete this property")
+    detail = PropertyOut.model_validate(prop, from_attributes=True).model_dump()
+    detail["images"] = sorted(prop.images, key=lambda image: (not image.is_cover, image.image_id))
+    detail["amenities"] = sorted(prop.amenities, key=lambda amenity: amenity.name)
+    detail["rating"] = ratings.summary_out(db.get(PropertyRatingSummary, property_id))
+    return detail
 
-    db.delete(prop)
-    db.commit()
-    return {"msg": "Property deleted successfully"}
 
+if USE_ASYNC_DB:
+    @router.get("/properties/{property_id}/detail", response_model=PropertyDetailOut)
+    async def get_property_detail(property_id: int, db: AsyncSession = Depends(get_async_read_db)):
+        return await db.run_sync(_get_property_detail, property_id)
+else:
+    @router.get("/properties/{property_id}/detail", response_model=PropertyDetailOut)
+    def get_property_detail(property_id: int, db: Session = Depends(get_read_db)):
+        return _get_property_detail(db, property_id)
 
-@router.get("/properties", response_model=List[PropertyOut])
-def list_properties(
-    city: Optional[str] = None,
-    country: Optional[str] = None,
-    min_price: Optional[float] = None,
-    max_price: Optional[float] = None,
-    is_available: Optional[int] = 1,
+
+@router.put("/properties/{property_id}", response_model=PropertyOut)
+def update_property(
+    property_id: int,
+    updates: PropertyUpdate,
+    token_data: dict = Depends(jwt_authorization),
     db: Session = Depends(get_db)
 ):
-    query = db.query(Property)
+    return run_write(db, _update_property, property_id, token_data, updates.dict(exclude_unset=True))
+
+
+@router.delete("/properties/{property_id}")
+def delete_property(
+    property_id: int,
+    token_data: dict = Depends(jwt_authorization),
+    db: Session = Depends(get_db)
+):
+    run_write(db, _delete_property, property_id, token_data)
+    return {"msg": "Property deleted successfully"}
+
 
+def _filter_properties(query, city, country, min_price, max_price, is_available):
     if city:
         query = query.filter(Property.city.ilike(f"%{city}%"))
     if country:
@@ -95,7 +211,218 @@ def list_properties(
         query = query.filter(Property.price_per_night <= max_price)
     if is_available is not None:
         query = query.filter(Property.is_available == is_available)
+    return query
+
+
+def _search_properties(db, filters, q, sort_by, descending, position):
+    """Build the filtered, keyset-ordered `Property` query.
+
+    Returns:
+        Tuple: ``(query, sort_col)``
+    """
+    query = _filter_properties(db.query(Property), *filters)
+
+    rank = None
+    if q:
+        query, rank = search_index.apply_text_search(query, q)
+
+    if sort_by == PropertySort.relevance:
+        # Without the FTS index there is no rank to order by
+        sort_col = rank if rank is not None else Property.property_id
+    elif sort_by == PropertySort.rating:
+        query = query.outerjoin(PropertyRatingSummary, PropertyRatingSummary.property_id == Property.property_id)
+        # Averages are within 1-5, so unrated properties come last in either direction
+        sort_col = func.coalesce(PropertyRatingSummary.rating_avg, 0.0 if descending else 6.0)
+    else:
+        sort_col = SORT_COLUMNS[sort_by]
+
+    return _order_properties(query, sort_col, descending, position), sort_col
+
+
+def _order_properties(query, sort_col, descending, position):
+    """Apply keyset ordering on ``(sort_col, property_id)`` starting after ``position``."""
+    if sort_col is Property.property_id:
+        if position is not None:
+            last_id = position[1]
+            query = query.filter(Property.property_id < last_id if descending else Property.property_id > last_id)
+        return query.order_by(Property.property_id.desc() if descending else Property.property_id)
+
+    if position is not None:
+        key = tuple_(sort_col, Property.property_id)
+        after = tuple_(literal(position[0], sort_col.type), literal(position[1], Property.property_id.type))
+        query = query.filter(key < after if descending else key > after)
+
+    if descending:
+        return query.order_by(sort_col.desc(), Property.property_id.desc())
+    return query.order_by(sort_col, Property.property_id)
+
+
+def _serialize_property(prop) -> str:
+    return PropertyOut.model_validate(prop, from_attributes=True).model_dump_json() + "\n"
+
+
+def _stream_properties(listing):
+    # The request-scoped session is closed before the body is sent, so the
+    # stream owns its own session for the lifetime of the response.
+    with read_session(listing.primary) as db:
+        query, _ = _search_properties(db, *listing.search_args())
+        for prop in query.yield_per(STREAM_BATCH_SIZE):
+            yield _serialize_property(prop)
+
+
+async def _stream_properties_async(listing):
+    async with async_read_session(listing.primary) as db:
+        # Only builds the statement; rows are fetched by stream_scalars
+        query, _ = _search_properties(db.sync_session, *listing.search_args())
+        result = await db.stream_scalars(query.statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for prop in result:
+            yield _serialize_property(prop)
+
+
+class PropertyListing:
+    """Query parameters of GET /properties, validated into a keyset position."""
+
+    def __init__(
+        self,
+        request: Request,
+        city: Optional[str] = None,
+        country: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        is_available: Optional[int] = 1,
+        q: Optional[str] = Query(None, description="Full-text search over title, description, city and country"),
+        sort_by: Optional[PropertySort] = Query(None, description="Defaults to relevance with q, id otherwise"),
+        descending: bool = False,
+        limit: int = Query(50, ge=1, le=200),
+        cursor: Optional[str] = None,
+        stream: bool = False,
+        start_date: Optional[date] = Query(None, description="With end_date, adds the stay total to each item"),
+        end_date: Optional[date] = None,
+    ):
+        if sort_by is None:
+            sort_by = PropertySort.relevance if q else PropertySort.id
+        elif sort_by == PropertySort.relevance and not q:
+            raise HTTPException(status_code=400, detail="Sorting by relevance requires q")
+        if (start_date is None) != (end_date is None):
+            raise HTTPException(status_code=400, detail="start_date and end_date must be given together")
+        if start_date is not None and not 0 < (end_date - start_date).days <= pricing.MAX_STAY_NIGHTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"end_date must be after start_date, within {pricing.MAX_STAY_NIGHTS} nights",
+            )
+
+        self.filters = (city, country, min_price, max_price, is_available)
+        self.q = q
+        self.sort_by = sort_by
+        self.descending = descending
+        self.limit = limit
+        self.stream = stream
+        self.stay = (start_date, end_date) if start_date is not None else None
+        self.primary = prefers_primary(request)
+        self.sort_key = f"{sort_by.value}:{'desc' if descending else 'asc'}"
+        self.position = decode_cursor(cursor, self.sort_key, is_datetime=sort_by == PropertySort.created_at)
+
+    def search_args(self):
+        return self.filters, self.q, self.sort_by, self.descending, self.position
+
+
+def _hydrate_properties(db: Session, property_ids: List[int]) -> List[dict]:
+    """Serialized properties in ``property_ids`` order, from the read cache where possible."""
+    keys = {pid: read_cache.key("property", pid) for pid in property_ids}
+    found = {}
+    for pid, key in keys.items():
+        value = read_cache.get(key)
+        if value is not MISSING:
+            found[pid] = value
+
+    missing = [pid for pid in property_ids if pid not in found]
+    if missing:
+        for prop in db.query(Property).filter(Property.property_id.in_(missing)):
+            found[prop.property_id] = PropertyOut.model_validate(prop, from_attributes=True).model_dump()
+            read_cache.set(keys[prop.property_id], found[prop.property_id])
+
+    return [found[pid] for pid in property_ids if pid in found]
+
+
+def _cached_result_set(db: Session, listing: PropertyListing):
+    """Ascending ``(sort_value, property_id, price)`` rows of the listing's canonical filter set."""
+    key = listing_cache.cache_key(listing.filters, listing.q, listing.sort_by, listing.descending)
+    oversized = listing_cache.oversized_key(listing.filters, listing.q, listing.sort_by, listing.descending)
+
+    def load():
+        if read_cache.get(oversized) is not MISSING:
+            return None
+        # The rating sort value of unrated properties depends on the direction
+        query, sort_col = _search_properties(
+            db, listing_cache.widened_filters(listing.filters), listing.q, listing.sort_by, listing.descending, None
+        )
+        rows = query.with_entities(sort_col, Property.property_id, Property.price_per_night)
+        rows = rows.limit(CACHE_LISTING_MAX_IDS + 1).all()
+        # Oversized result sets are remembered as None and served from SQL
+        if listing_cache.too_large(rows):
+            read_cache.set(oversized, True)
+            return None
+        return [tuple(row) for row in (reversed(rows) if listing.descending else rows)]
+
+    return read_cache.cached(key, load)
+
+
+def _with_ratings(db: Session, items: List[dict]) -> List[dict]:
+    """Attach the rating summary of each listed property, read fresh rather than cached."""
+    by_id = ratings.summaries(db, [item["property_id"] for item in items])
+    rated = []
+    for item in items:
+        summary = by_id.get(item["property_id"])
+        rated.append({
+            **item,
+            "rating_average": round(summary.rating_avg, 2) if summary and summary.review_count else None,
+            "rating_count": summary.review_count if summary else 0,
+        })
+    return rated
+
+
+def _with_quotes(db: Session, items: List[dict], stay) -> List[dict]:
+    """Attach the stay total of each listed property, priced in one batch."""
+    if stay is None:
+        return items
+    quotes = pricing.quote_many(db, [item["property_id"] for item in items], *stay)
+    quoted = []
+    for item in items:
+        quote = quotes.get(item["property_id"])
+        quoted.append({**item, "total_price": quote["total_price"], "nights": quote["nights"]} if quote else item)
+    return quoted
+
+
+def _list_properties(db: Session, listing: PropertyListing) -> dict:
+    entries = _cached_result_set(db, listing) if read_cache.enabled else None
+    if entries is not None:
+        rows, has_more = listing_cache.page(entries, listing.filters, listing.descending, listing.position, listing.limit)
+        next_cursor = encode_cursor(listing.sort_key, rows[-1][0], rows[-1][1]) if has_more else None
+        items = _hydrate_properties(db, [pid for _, pid, _ in rows])
+        return {"items": _with_quotes(db, _with_ratings(db, items), listing.stay), "next_cursor": next_cursor}
+
+    query, sort_col = _search_properties(db, *listing.search_args())
+    rows = query.add_columns(sort_col).limit(listing.limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > listing.limit:
+        rows = rows[:listing.limit]
+        last, last_sort_value = rows[-1]
+        next_cursor = encode_cursor(listing.sort_key, last_sort_value, last.property_id)
 
-    return query.all()
+    items = [PropertyOut.model_validate(prop, from_attributes=True).model_dump() for prop, _ in rows]
+    return {"items": _with_quotes(db, _with_ratings(db, items), listing.stay), "next_cursor": next_cursor}
 
 
+if USE_ASYNC_DB:
+    @router.get("/properties", response_model=PropertyPage)
+    async def list_properties(listing: PropertyListing = Depends(), db: AsyncSession = Depends(get_async_read_db)):
+        if listing.stream:
+            return StreamingResponse(_stream_properties_async(listing), media_type=NDJSON)
+        return await db.run_sync(_list_properties, listing)
+else:
+    @router.get("/properties", response_model=PropertyPage)
+    def list_properties(listing: PropertyListing = Depends(), db: Session = Depends(get_read_db)):
+        if listing.stream:
+            return StreamingResponse(_stream_properties(listing), media_type=NDJSON)
+        return _list_properties(db, listing)
@@ -1,10 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from core.config import USE_ASYNC_DB
 from database.session import get_db
+from database.replicas import get_read_db, get_async_read_db
+from database.write_queue import run_write
 from database.models import Property, PropertyImage
 from decorator.jwt_decorator import jwt_authorization
 from routers.request_models.property_image_models import PropertyImageCreate, PropertyImageUpdate, PropertyImageOut
 from typing import List
+from utils.cache_utils import read_cache
 
 router = APIRouter()
 
@@ -16,6 +21,11 @@ def upload_image(
     token_data: dict = Depends(jwt_authorization),
     db: Session = Depends(get_db)
 ):
+    return run_write(db, _add_image, property_id, token_data, image_data.dict())
+
+
+# Write units for database.write_queue.run_write: flush, never commit
+def _add_image(db: Session, property_id: int, token_data: dict, values: dict) -> PropertyImage:
     property_obj = db.query(Property).filter(Property.property_id == property_id).first()
     if not property_obj:
         raise HTTPException(status_code=404, detail="Property not found")
@@ -23,56 +33,75 @@ def upload_image(
     if token_data["user_id"] != property_obj.owner_id and not token_data.get("is_admin"):
         raise HTTPException(status_code=403, detail="Not authorized to add images")
 
-    new_image = PropertyImage(property_id=property_id, **image_data.dict())
+    new_image = PropertyImage(property_id=property_id, **values)
     db.add(new_image)
-    db.commit()
+    read_cache.invalidate_after_commit(db, "property_images", property_id)
+    db.flush()
     db.refresh(new_image)
     return new_image
 
 
-@router.get("/properties/{property_id}/images", response_model=List[PropertyImageOut])
-def list_property_images(property_id: int, db: Session = Depends(get_db)):
-    images = db.query(PropertyImage).filter(PropertyImage.property_id == property_id).all()
-    return images
-
-
-@router.put("/properties/images/{image_id}", response_model=PropertyImageOut)
-def update_property_image(
-    image_id: int,
-    update_data: PropertyImageUpdate,
-    token_data: dict = Depends(jwt_authorization),
-    db: Session = Depends(get_db)
-):
+def _get_owned_image(db: Session, image_id: int, token_data: dict, denied: str) -> PropertyImage:
     image = db.query(PropertyImage).filter(PropertyImage.image_id == image_id).first()
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
 
     prop = db.query(Property).filter(Property.property_id == image.property_id).first()
     if token_data["user_id"] != prop.owner_id and not token_data.get("is_admin"):
-        raise HTTPException(status_code=403, detail="Not authorized to update image")
+        raise HTTPException(status_code=403, detail=denied)
+    return image
 
-    for key, value in update_data.dict(exclude_unset=True).items():
+
+def _update_image(db: Session, image_id: int, token_data: dict, values: dict) -> PropertyImage:
+    image = _get_owned_image(db, image_id, token_data, "Not authorized to update image")
+    for key, value in values.items():
         setattr(image, key, value)
 
-    db.commit()
+    read_cache.invalidate_after_commit(db, "property_images", image.property_id)
+    db.flush()
     db.refresh(image)
     return image
 
 
-@router.delete("/properties/images/{image_id}")
-def delete_property_image(
+def _delete_image(db: Session, image_id: int, token_data: dict) -> None:
+    image = _get_owned_image(db, image_id, token_data, "Not authorized to delete image")
+    db.delete(image)
+    read_cache.invalidate_after_commit(db, "property_images", image.property_id)
+    db.flush()
+
+
+def _list_property_images(db: Session, property_id: int):
+    images = db.query(PropertyImage).filter(PropertyImage.property_id == property_id).all()
+    return [PropertyImageOut.model_validate(image, from_attributes=True).model_dump() for image in images]
+
+
+if USE_ASYNC_DB:
+    @router.get("/properties/{property_id}/images", response_model=List[PropertyImageOut])
+    async def list_property_images(property_id: int, db: AsyncSession = Depends(get_async_read_db)):
+        key = read_cache.key("property_images", property_id)
+        return await read_cache.cached_async(key, lambda: db.run_sync(_list_property_images, property_id))
+else:
+    @router.get("/properties/{property_id}/images", response_model=List[PropertyImageOut])
+    def list_property_images(property_id: int, db: Session = Depends(get_read_db)):
+        key = read_cache.key("property_images", property_id)
+        return read_cache.cached(key, lambda: _list_property_images(db, property_id))
+
+
+@router.put("/properties/images/{image_id}", response_model=PropertyImageOut)
+def update_property_image(
     image_id: int,
+    update_data: PropertyImageUpdate,
     token_data: dict = Depends(jwt_authorization),
     db: Session = Depends(get_db)
 ):
-    image = db.query(PropertyImage).filter(PropertyImage.image_id == image_id).first()
-    if not image:
-        raise HTTPException(status_code=404, detail="Image not found")
+    return run_write(db, _update_image, image_id, token_data, update_data.dict(exclude_unset=True))
 
-    prop = db.query(Property).filter(Property.property_id == image.property_id).first()
-    if token_data["user_id"] != prop.owner_id and not token_data.get("is_admin"):
-        raise HTTPException(status_code=403, detail="Not authorized to delete image")
 
-    db.delete(image)
-    db.commit()
+@router.delete("/properties/images/{image_id}")
+def delete_property_image(
+    image_id: int,
+    token_data: dict = Depends(jwt_authorization),
+    db: Session = Depends(get_db)
+):
+    run_write(db, _delete_image, image_id, token_data)
     return {"msg": "Image deleted successfully"}
@@ -11,3 +11,14 @@ class AmenityOut(AmenityBase):
 
     class Config:
         orm_mode = True
+
+
+class PropertyAmenitySet(BaseModel):
+    property_id: int
+    amenity_ids: List[int]
+
+
+class AmenityAssignmentOut(BaseModel):
+    msg: str
+    added: int
+    removed: int
@@ -0,0 +1,64 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date, datetime
+
+
+class AvailabilityOut(BaseModel):
+    property_id: int
+    start_date: date
+    end_date: date
+    is_available: bool
+    next_available_start: Optional[date] = None
+
+
+class NightQuoteOut(BaseModel):
+    date: date
+    base_price: float
+    discount_percent: float
+    price: float
+    package_id: Optional[int] = None
+
+
+class QuoteOut(BaseModel):
+    property_id: int
+    start_date: date
+    end_date: date
+    nights: int
+    base_total: float
+    discount_total: float
+    total_price: float
+    package_ids: List[int]
+    nightly: List[NightQuoteOut]
+
+
+class QuoteBatchIn(BaseModel):
+    property_ids: List[int] = Field(..., min_length=1)
+    start_date: date
+    end_date: date
+
+
+class QuoteSummaryOut(BaseModel):
+    property_id: int
+    nights: int
+    base_total: float
+    discount_total: float
+    total_price: float
+
+
+class BookingCreate(BaseModel):
+    property_id: int
+    start_date: date
+    end_date: date
+    guests: int = Field(..., ge=1)
+
+
+class BookingOut(BaseModel):
+    booking_id: int
+    traveler_id: int
+    property_id: int
+    start_date: date
+    end_date: date
+    guests: int
+    status: str
+    total_price: float
+    hold_expires_at: Optional[datetime] = None
@@ -1,7 +1,10 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
 from enum import Enum
 
+from routers.request_models.amenity_models import AmenityOut
+from routers.request_models.property_image_models import PropertyImageOut
+
 
 class PropertyType(str, Enum):
     apartment = "apartment"
@@ -47,4 +50,42 @@ class PropertyOut(PropertyBase):
     owner_id: int
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+
+class PropertyNearbyOut(PropertyOut):
+    distance_km: float
+
+
+class PropertySort(str, Enum):
+    id = "id"
+    price = "price"
+    created_at = "created_at"
+    relevance = "relevance"
+    rating = "rating"
+
+
+class PropertyListItem(PropertyOut):
+    rating_average: Optional[float] = None
+    rating_count: int = 0
+    # Set when the listing is requested with start_date and end_date
+    total_price: Optional[float] = None
+    nights: Optional[int] = None
+
+
+class PropertyPage(BaseModel):
+    items: List[PropertyListItem]
+    next_cursor: Optional[str] = None
+
+
+class PropertyRatingOut(BaseModel):
+    count: int = 0
+    average: Optional[float] = None
+    # Number of reviews per star rating, 1 to 5
+    histogram: Dict[int, int] = {}
+
+
+class PropertyDetailOut(PropertyOut):
+    images: List[PropertyImageOut]
+    amenities: List[AmenityOut]
+    rating: PropertyRatingOut
@@ -15,6 +15,10 @@ class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     password: Optional[str] = None
 
+class UserRoleUpdate(BaseModel):
+    is_admin: Optional[int] = None
+    is_staff: Optional[int] = None
+
 class UserProfileUpdate(BaseModel):
     full_name: Optional[str] = None
     phone_number: Optional[str] = None
@@ -2,11 +2,14 @@ from fastapi import APIRouter, Depends, HTTPException, Path
 from sqlalchemy.orm import Session
 
 from database.session import get_db
+from database.replicas import get_read_db
 from database.models import User, UserProfile
+from database.write_queue import run_write, run_write_async
 from decorator.jwt_decorator import jwt_authorization
 
 from routers.request_models.user_models import UserUpdate, UserProfileUpdate  # Assumed schemas
-from utils.auth_utils import hash_password
+from utils.auth_utils import hash_password_async
+from custom_exception.my_exceptions import ServiceBusy
 from routers.response_models.user_models import UserResponse
 
 router = APIRouter()
@@ -23,30 +26,47 @@ def get_current_user_profile(
     return user
 
 
+# Write units for database.write_queue.run_write: flush, never commit
+def _apply_user_updates(db: Session, user_id: int, email, hashed_password):
+    user = db.query(User).filter(User.user_id == user_id).first()
+    if not user:
+        return None
+
+    if email:
+        user.email = email
+    if hashed_password:
+        user.password = hashed_password
+
+    db.flush()
+    db.refresh(user)
+    return user
+
+
 @router.put("/me")
-def update_current_user_info(
+async def update_current_user_info(
     updates: UserUpdate,
     token_data: dict = Depends(jwt_authorization),
     db: Session = Depends(get_db)
 ):
-    user = db.query(User).filter(User.user_id == token_data["user_id"]).first()
+    # Hash on the dedicated pool, then hand the write off without blocking the loop
+    hashed_password = None
+    if updates.password:
+        try:
+            hashed_password = await hash_password_async(updates.password)
+        except ServiceBusy as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    user = await run_write_async(db, _apply_user_updates, token_data["user_id"], updates.email, hashed_password)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    if updates.email:
-        user.email = updates.email
-    if updates.password:
-        user.password = hash_password(updates.password)
-
-    db.commit()
-    db.refresh(user)
     return {"msg": "User info updated", "user": user}
 
 
 @router.get("/{user_id}/profile")
 def get_user_profile(
     user_id: int = Path(..., gt=0),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
     if not profile:
@@ -64,15 +84,20 @@ def create_user_profile(
     if token_data["user_id"] != user_id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
+    profile = run_write(db, _create_profile, user_id, profile_data.dict())
+    return {"msg": "Profile created", "profile": profile}
+
+
+def _create_profile(db: Session, user_id: int, values: dict) -> UserProfile:
     existing = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
     if existing:
         raise HTTPException(status_code=400, detail="Profile already exists")
 
-    profile = UserProfile(user_id=user_id, **profile_data.dict())
+    profile = UserProfile(user_id=user_id, **values)
     db.add(profile)
-    db.commit()
+    db.flush()
     db.refresh(profile)
-    return {"msg": "Profile created", "profile": profile}
+    return profile
 
 
 @router.put("/{user_id}/profile")
@@ -85,16 +110,30 @@ def update_user_profile(
     if token_data["user_id"] != user_id and not token_data.get("is_admin", 0):
         raise HTTPException(status_code=403, detail="Not authorized")
 
+    profile = run_write(db, _update_profile, user_id, profile_data.dict(exclude_unset=True))
+    return {"msg": "Profile updated", "profile": profile}
+
+
+def _get_profile(db: Session, user_id: int) -> UserProfile:
     profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
 
-    for field, value in profile_data.dict(exclude_unset=True).items():
+def _update_profile(db: Session, user_id: int, values: dict) -> UserProfile:
+    profile = _get_profile(db, user_id)
+    for field, value in values.items():
         setattr(profile, field, value)
 
-    db.commit()
+    db.flush()
     db.refresh(profile)
-    return {"msg": "Profile updated", "profile": profile}
+    return profile
+
+
+def _delete_profile(db: Session, user_id: int) -> None:
+    db.delete(_get_profile(db, user_id))
+    db.flush()
 
 
 @router.delete("/{user_id}/profile")
@@ -106,10 +145,5 @@ def delete_user_profile(
     if not token_data.get("is_admin", 0):
         raise HTTPException(status_code=403, detail="Admin access required")
 
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
-    if not profile:
-        raise HTTPException(status_code=404, detail="Profile not found")
-
-    db.delete(profile)
-    db.commit()
+    run_write(db, _delete_profile, user_id)
     return {"msg": "Profile deleted"}
@@ -0,0 +1,197 @@
+"""Check that the queries behind the hot endpoints are served by indexes.
+
+Runs the query code of the listing, detail, image, amenity, booking, token
+and rating paths against a SQLite database, records ``EXPLAIN QUERY PLAN``
+for every statement and exits non-zero when one scans a whole table or sorts
+a listing in a temporary B-tree. Everything the checks write is rolled back.
+
+Usage (from a directory with dev.conf):
+    python -m scripts.check_query_plans
+    python -m scripts.check_query_plans --database sqlite:///./hotel.db -v
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from database.migrations import upgrade
+from database.models import (
+    Amenity, Booking, BookingStatus, Package, Property, PropertyImage, Review, Token, TokenRevocation, User,
+    property_amenity,
+)
+from routers.amenity import _apply_amenity_sets
+from routers.auth import _find_user_by_email
+from routers.property import _get_property_detail, _search_properties
+from routers.request_models.property_models import PropertySort
+from services import bookings, ratings, search_index
+from services.availability import AvailabilityIndex
+from utils.revocations import _purge_expired
+from utils.token_store import SqlTokenStore
+
+AVAILABLE = (None, None, None, None, 1)
+
+
+def _listing(sort_by, descending=False, filters=AVAILABLE, position=None, q=None):
+    def run(db, ids):
+        query, _ = _search_properties(db, filters, q, sort_by, descending, position)
+        query.limit(50).all()
+    return run
+
+
+def _hold(db, ids):
+    start = date.today() + timedelta(days=30)
+    bookings._create_hold(db, ids["user"], ids["property"], start, start + timedelta(days=3), 1)
+
+
+def _calendar(db, ids):
+    start = date.today() + timedelta(days=60)
+    AvailabilityIndex(sessionmaker(bind=db.get_bind())).is_available(ids["property"], start, start + timedelta(days=2))
+
+
+# (name, query code, whether sorting in a temporary B-tree is acceptable)
+CHECKS = [
+    ("GET /properties (default)", _listing(PropertySort.id), False),
+    ("GET /properties (next page)", _listing(PropertySort.id, position=(None, 10)), False),
+    ("GET /properties (descending)", _listing(PropertySort.id, descending=True), False),
+    ("GET /properties?sort_by=price", _listing(PropertySort.price, position=(120.0, 10)), False),
+    ("GET /properties?sort_by=price&min_price&max_price",
+     _listing(PropertySort.price, filters=(None, None, 50.0, 300.0, 1)), False),
+    ("GET /properties?sort_by=created_at", _listing(PropertySort.created_at, descending=True), False),
+    # Substring filters cannot use a B-tree; is_available still narrows the scan
+    ("GET /properties?city", _listing(PropertySort.id, filters=("par", None, None, None, 1)), False),
+    # Sorting on a joined aggregate cannot follow an index
+    ("GET /properties?sort_by=rating", _listing(PropertySort.rating), True),
+    ("GET /properties/{id}/detail", lambda db, ids: _get_property_detail(db, ids["property"]), True),
+    ("GET /properties/{id}/images",
+     lambda db, ids: db.query(PropertyImage).filter(PropertyImage.property_id == ids["property"]).all(), True),
+    ("POST /properties/{id}/amenities",
+     lambda db, ids: _apply_amenity_sets(db, {ids["property"]: {ids["amenity"]}}), True),
+    ("DELETE /amenities/{id} (association lookup)",
+     lambda db, ids: db.execute(property_amenity.select().where(property_amenity.c.amenity_id == ids["amenity"])).all(),
+     True),
+    ("POST /bookings", _hold, True),
+    ("availability calendar load", _calendar, True),
+    ("hold sweeper", lambda db, ids: bookings._expire_holds(db, datetime.utcnow()), True),
+    ("traveler bookings",
+     lambda db, ids: db.query(Booking).filter(Booking.traveler_id == ids["user"]).all(), True),
+    ("POST /auth/login", lambda db, ids: _find_user_by_email(db, "plans@example.com"), True),
+    ("token lookup", lambda db, ids: SqlTokenStore().lookup(db, "0" * 64), True),
+    ("token revoke", lambda db, ids: SqlTokenStore().revoke_user(db, ids["user"]), True),
+    ("token sweeper", lambda db, ids: SqlTokenStore().purge_expired(db, datetime.utcnow(), 1000), True),
+    ("revocation purge", lambda db, ids: _purge_expired(db, datetime.utcnow()), True),
+    ("rating summaries", lambda db, ids: ratings.summaries(db, [ids["property"]]), True),
+]
+
+
+class PlanRecorder:
+    """Runs ``EXPLAIN QUERY PLAN`` ahead of every statement executed on the engine."""
+
+    def __init__(self, engine):
+        self.plans = []
+        event.listen(engine, "before_cursor_execute", self._explain)
+
+    def _explain(self, conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            return
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        self.plans.append((statement, [row[3] for row in cursor.fetchall()]))
+
+
+def _seed(db: Session) -> dict:
+    user = User(email="plans@example.com", password="x", is_admin=0, is_staff=0)
+    db.add(user)
+    db.flush()
+    prop = Property(
+        owner_id=user.user_id, title="Plans", description="", address="", city="Paris", country="France",
+        price_per_night=100.0, max_guests=4, property_type="apartment", is_available=1,
+    )
+    amenity = Amenity(name="plans-wifi")
+    db.add_all([prop, amenity])
+    db.flush()
+    booking = Booking(
+        traveler_id=user.user_id, property_id=prop.property_id, start_date=datetime(2000, 1, 1),
+        end_date=datetime(2000, 1, 3), guests=1, status=BookingStatus.confirmed, total_price=200.0,
+    )
+    db.add_all([
+        booking,
+        PropertyImage(property_id=prop.property_id, image_url="plans.jpg", is_cover=1),
+        Package(property_id=prop.property_id, name="Week", discount_percent=10, min_nights=7),
+        Token(user_id=user.user_id, token_type="access", token_hash="1" * 64, expires_at=datetime(2000, 1, 1)),
+        TokenRevocation(user_id=user.user_id, revoked_before=0.0, expires_at=datetime(2000, 1, 1)),
+    ])
+    db.flush()
+    db.add(Review(booking_id=booking.booking_id, traveler_id=user.user_id, property_id=prop.property_id, rating=5))
+    db.flush()
+    return {"user": user.user_id, "property": prop.property_id, "amenity": amenity.amenity_id}
+
+
+def _problems(details, allow_sort):
+    problems = []
+    for detail in details:
+        words = detail.split()
+        # "SCAN t" reads every row; "SCAN t USING [COVERING] INDEX i" walks an index in order
+        if words[:1] == ["SCAN"] and "USING" not in words:
+            problems.append(detail)
+        if detail.startswith("USE TEMP B-TREE FOR ORDER BY") and not allow_sort:
+            problems.append(detail)
+    return problems
+
+
+def run_checks(engine, verbose: bool = False) -> int:
+    """Print one line per check. Returns the number of failed checks."""
+    upgrade(engine)
+    # Like the app at startup; the FTS table is not one of the models
+    with Session(engine) as db:
+        search_index.ensure_index(db)
+    recorder = PlanRecorder(engine)
+    failed = 0
+    with Session(engine) as db:
+        ids = _seed(db)
+        for name, run, allow_sort in CHECKS:
+            recorder.plans.clear()
+            with db.begin_nested():
+                run(db, ids)
+                db.flush()
+            problems = [(statement, _problems(details, allow_sort)) for statement, details in recorder.plans]
+            problems = [(statement, found) for statement, found in problems if found]
+            failed += bool(problems)
+            print(f"{'FAIL' if problems else 'ok  '} {name}")
+            for statement, found in problems:
+                print(f"     {' '.join(statement.split())}")
+                for detail in found:
+                    print(f"       -> {detail}")
+            if verbose and not problems:
+                for statement, details in recorder.plans:
+                    print(f"     {' '.join(statement.split())}")
+                    for detail in details:
+                        print(f"       {detail}")
+        db.rollback()
+    return failed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", help="SQLite URL to check, upgraded in place; defaults to a scratch database")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        engine = create_engine(args.database or f"sqlite:///{os.path.join(scratch, 'plans.db')}")
+        if engine.dialect.name != "sqlite":
+            parser.error("only SQLite query plans can be checked")
+        try:
+            failed = run_checks(engine, args.verbose)
+        finally:
+            engine.dispose()
+
+    print(f"{len(CHECKS) - failed}/{len(CHECKS)} hot paths use indexes")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Bulk import properties from a CSV or NDJSON file.
+
+Usage (from a directory with dev.conf):
+    python -m scripts.import_properties listings.csv --owner-id 1
+    python -m scripts.import_properties listings.ndjson --owner-id 1 --start-row 40001
+"""
+import argparse
+import json
+import os
+import sys
+
+from database.session import SessionLocal
+from services import geo_index, search_index
+from services.property_import import DEFAULT_CHUNK_SIZE, FORMATS, import_stream
+
+READ_SIZE = 1024 * 1024
+
+
+def read_blocks(path: str):
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(READ_SIZE)
+            if not data:
+                return
+            yield data
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--owner-id", type=int, required=True)
+    parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension")
+    parser.add_argument("--start-row", type=int, default=1, help="Resume with last_committed_row + 1")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or os.path.splitext(args.path)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        parser.error("cannot infer the format from the file name, pass --format")
+
+    with SessionLocal() as db:
+        # Enables full-text indexing of the imported rows, as on API startup
+        geo_index.ensure_index(db)
+        search_index.ensure_index(db)
+        result = import_stream(db, read_blocks(args.path), fmt, args.owner_id, args.start_row, args.chunk_size)
+
+    print(json.dumps(result, indent=2))
+    return 0 if result["completed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
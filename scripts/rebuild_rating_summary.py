@@ -0,0 +1,23 @@
+"""Recompute property_rating_summary from the reviews table.
+
+Usage (from a directory with dev.conf):
+    python -m scripts.rebuild_rating_summary
+"""
+import time
+
+from database import models  # noqa: F401 registers the tables
+from database.migrations import upgrade
+from database.session import SessionLocal, engine
+from services import ratings
+
+
+def main() -> None:
+    upgrade(engine)
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        total = ratings.rebuild(db)
+    print(f"Summarized {total} properties in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Per-property availability index over blocking bookings.
+
+Each property gets a lazily loaded, start-sorted list of ``[start, end)`` night
+intervals for its pending and confirmed bookings. Committed booking writes are
+applied incrementally through session events, so the index never reflects a
+transaction that was rolled back. A pending booking with ``hold_expires_at``
+stops blocking once the hold expires, before the sweeper cancels it.
+
+The index only hears about writes committed in this process. Other processes
+(workers, scripts) can book or free dates behind its back, so it is used to
+avoid work, never as the final word:
+
+* a calendar older than ``BOOKING_AVAILABILITY_TTL_SECONDS`` is reloaded, so
+  "free" answers are stale for at most that long (creating a hold still
+  checks the database under the property row lock);
+* a "busy" answer is checked against a fresh load before it is returned, so
+  dates freed elsewhere are never refused.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from core.config import BOOKING_AVAILABILITY_TTL_SECONDS
+from database.events import run_after_commit
+from database.models import Booking, BookingStatus
+from database.session import SessionLocal
+
+BLOCKING_STATUSES = (BookingStatus.pending, BookingStatus.confirmed)
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _blocked_interval(booking: Booking) -> Optional[Tuple[date, date, Optional[datetime]]]:
+    # A missing status gets the column default (pending) on insert
+    if booking.status is not None and BookingStatus(booking.status) not in BLOCKING_STATUSES:
+        return None
+    pending = booking.status is None or BookingStatus(booking.status) == BookingStatus.pending
+    return _as_date(booking.start_date), _as_date(booking.end_date), booking.hold_expires_at if pending else None
+
+
+class PropertyCalendar:
+    """Sorted, non-merged intervals of one property, keyed by booking id."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.loaded_at = 0.0
+        self.clear()
+
+    def clear(self) -> None:
+        self._starts: List[Tuple[date, int]] = []
+        self._intervals: Dict[int, Tuple[date, date]] = {}
+        self._hold_expiry: Dict[int, datetime] = {}
+        # Upper bound on interval length; only ever grows between reloads
+        self._max_span = timedelta(0)
+
+    def upsert(self, booking_id: int, start: date, end: date, hold_expires_at: Optional[datetime] = None) -> None:
+        self.remove(booking_id)
+        if end <= start:
+            return
+        self._intervals[booking_id] = (start, end)
+        if hold_expires_at is not None:
+            self._hold_expiry[booking_id] = hold_expires_at
+        insort(self._starts, (start, booking_id))
+        self._max_span = max(self._max_span, end - start)
+
+    def remove(self, booking_id: int) -> None:
+        interval = self._intervals.pop(booking_id, None)
+        if interval is None:
+            return
+        self._hold_expiry.pop(booking_id, None)
+        idx = bisect_left(self._starts, (interval[0], booking_id))
+        del self._starts[idx]
+
+    def _blocking(self, booking_id: int, now: datetime) -> bool:
+        expires_at = self._hold_expiry.get(booking_id)
+        return expires_at is None or expires_at > now
+
+    def _candidates(self, start: date, end: date, now: datetime):
+        """Yield blocking intervals that may overlap ``[start, end)`` in start order."""
+        lo = bisect_left(self._starts, (start - self._max_span, -1))
+        hi = bisect_left(self._starts, (end, -1))
+        for idx in range(lo, hi):
+            booking_id = self._starts[idx][1]
+            if self._blocking(booking_id, now):
+                yield self._intervals[booking_id]
+
+    def is_free(self, start: date, end: date, now: datetime) -> bool:
+        for booked_start, booked_end in self._candidates(start, end, now):
+            if booked_start < end and booked_end > start:
+                return False
+        return True
+
+    def first_free_window(self, nights: int, search_from: date, search_to: Optional[date], now: datetime) -> Optional[date]:
+        span = timedelta(days=nights)
+        candidate = search_from
+        lo = bisect_left(self._starts, (search_from - self._max_span, -1))
+
+        for _, booking_id in self._starts[lo:]:
+            if not self._blocking(booking_id, now):
+                continue
+            booked_start, booked_end = self._intervals[booking_id]
+            if booked_end <= candidate:
+                continue
+            if booked_start >= candidate + span:
+                break
+            candidate = booked_end
+
+        if search_to is not None and candidate + span > search_to:
+            return None
+        return candidate
+
+
+class AvailabilityIndex:
+    def __init__(self, session_factory, ttl_seconds: float = BOOKING_AVAILABILITY_TTL_SECONDS):
+        self._session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self._calendars: Dict[int, PropertyCalendar] = {}
+        self._lock = threading.Lock()
+
+    def _calendar(self, property_id: int, fresh: bool = False) -> PropertyCalendar:
+        """The property's calendar, loaded if missing, expired or ``fresh`` is asked for."""
+        with self._lock:
+            calendar = self._calendars.get(property_id)
+            if calendar is None:
+                calendar = self._calendars[property_id] = PropertyCalendar()
+
+        if fresh or self._expired(calendar):
+            # Reloaded in place under its lock: apply() waits, then replays its
+            # changes on top, which is harmless if the load already saw them
+            with calendar.lock:
+                if fresh or self._expired(calendar):
+                    self._load(property_id, calendar)
+        return calendar
+
+    def _expired(self, calendar: PropertyCalendar) -> bool:
+        return not calendar.loaded or time.monotonic() - calendar.loaded_at > self.ttl_seconds
+
+    def _load(self, property_id: int, calendar: PropertyCalendar) -> None:
+        db = self._session_factory()
+        try:
+            rows = (
+                db.query(Booking.booking_id, Booking.start_date, Booking.end_date, Booking.status, Booking.hold_expires_at)
+                .filter(Booking.property_id == property_id, Booking.status.in_(BLOCKING_STATUSES))
+                .all()
+            )
+        finally:
+            db.close()
+
+        calendar.clear()
+        for booking_id, start, end, status, hold_expires_at in rows:
+            if status != BookingStatus.pending:
+                hold_expires_at = None
+            calendar.upsert(booking_id, _as_date(start), _as_date(end), hold_expires_at)
+        calendar.loaded = True
+        calendar.loaded_at = time.monotonic()
+
+    def is_available(self, property_id: int, start: date, end: date) -> bool:
+        calendar = self._calendar(property_id)
+        with calendar.lock:
+            if calendar.is_free(start, end, datetime.utcnow()):
+                return True
+        # The blocking booking may have been cancelled by another process
+        calendar = self._calendar(property_id, fresh=True)
+        with calendar.lock:
+            return calendar.is_free(start, end, datetime.utcnow())
+
+    def first_free_window(self, property_id: int, nights: int, search_from: date, search_to: Optional[date] = None) -> Optional[date]:
+        calendar = self._calendar(property_id)
+        with calendar.lock:
+            window = calendar.first_free_window(nights, search_from, search_to, datetime.utcnow())
+        if window == search_from:
+            return window
+        calendar = self._calendar(property_id, fresh=True)
+        with calendar.lock:
+            return calendar.first_free_window(nights, search_from, search_to, datetime.utcnow())
+
+    def apply(self, changes) -> None:
+        """Apply committed ``(property_id, booking_id, interval or None)`` changes.
+
+        Properties that were never loaded are skipped: their first lookup
+        reads the already committed rows from the database.
+        """
+        for property_id, booking_id, interval in changes:
+            with self._lock:
+                calendar = self._calendars.get(property_id)
+            if calendar is None:
+                continue
+            with calendar.lock:
+                if not calendar.loaded:
+                    continue
+                if interval is None:
+                    calendar.remove(booking_id)
+                else:
+                    calendar.upsert(booking_id, *interval)
+
+    def invalidate(self, property_id: Optional[int] = None) -> None:
+        with self._lock:
+            if property_id is None:
+                self._calendars.clear()
+            else:
+                self._calendars.pop(property_id, None)
+
+
+availability_index = AvailabilityIndex(SessionLocal)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_booking_changes(session, flush_context):
+    changes = []
+
+    for obj in session.new:
+        if isinstance(obj, Booking):
+            changes.append((obj.property_id, obj.booking_id, _blocked_interval(obj)))
+
+    for obj in session.dirty:
+        if isinstance(obj, Booking) and session.is_modified(obj):
+            for old_property_id in inspect(obj).attrs.property_id.history.deleted:
+                if old_property_id is not None and old_property_id != obj.property_id:
+                    changes.append((old_property_id, obj.booking_id, None))
+            changes.append((obj.property_id, obj.booking_id, _blocked_interval(obj)))
+
+    for obj in session.deleted:
+        if isinstance(obj, Booking):
+            changes.append((obj.property_id, obj.booking_id, None))
+
+    if changes:
+        run_after_commit(session, availability_index.apply, changes)
@@ -0,0 +1,212 @@
+"""Booking holds, confirmation and cancellation.
+
+A new booking is a *hold*: a pending booking with ``hold_expires_at`` set,
+which blocks its dates until it is confirmed, cancelled or expires. Creating a
+hold checks for overlapping blocking bookings and inserts in one write unit,
+serialized per property:
+
+* in-process, by a per-property lock held until the write has committed, so
+  two request threads never check the same calendar concurrently;
+* across processes, by locking the property row (``SELECT ... FOR UPDATE``)
+  for the rest of the transaction. SQLite ignores the row lock but only ever
+  has one writer, and with group commit every unit runs in one writer thread.
+
+Expired holds stop blocking immediately; `hold_sweeper` cancels them in the
+background so they also drop out of the availability index and listings.
+"""
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from core.config import BOOKING_HOLD_MINUTES, BOOKING_HOLD_SWEEP_SECONDS
+from custom_exception.my_exceptions import BookingError
+from database.models import Booking, BookingStatus, Property
+from database.session import SessionLocal
+from database.write_queue import run_write
+from services import pricing
+from services.availability import availability_index
+from utils.periodic import PeriodicTask
+
+SWEEP_BATCH_SIZE = 500
+
+
+class PropertyLocks:
+    """One lock per property id, created on first use."""
+
+    def __init__(self):
+        self._locks: Dict[int, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, property_id: int) -> threading.Lock:
+        with self._lock:
+            lock = self._locks.get(property_id)
+            if lock is None:
+                lock = self._locks[property_id] = threading.Lock()
+            return lock
+
+
+property_locks = PropertyLocks()
+
+
+def _night(value: date) -> datetime:
+    return datetime.combine(value, time.min)
+
+
+def blocking_filter(now: datetime):
+    """Bookings that hold their dates at ``now``."""
+    return or_(
+        Booking.status == BookingStatus.confirmed,
+        and_(
+            Booking.status == BookingStatus.pending,
+            or_(Booking.hold_expires_at.is_(None), Booking.hold_expires_at > now),
+        ),
+    )
+
+
+def _create_hold(db: Session, traveler_id: int, property_id: int, start: date, end: date, guests: int) -> Booking:
+    prop = (
+        db.query(Property)
+        .filter(Property.property_id == property_id)
+        .with_for_update()
+        .first()
+    )
+    if prop is None:
+        raise BookingError("Property not found", status_code=404)
+    if not prop.is_available:
+        raise BookingError("Property is not available for booking")
+    if guests > prop.max_guests:
+        raise BookingError(f"Property allows at most {prop.max_guests} guests", status_code=400)
+
+    now = datetime.utcnow()
+    overlapping = (
+        db.query(Booking.booking_id)
+        .filter(
+            Booking.property_id == property_id,
+            Booking.start_date < _night(end),
+            Booking.end_date > _night(start),
+            blocking_filter(now),
+        )
+        .first()
+    )
+    if overlapping is not None:
+        raise BookingError("Dates are no longer available")
+
+    quote = pricing.quote_many(db, [property_id], start, end)[property_id]
+    booking = Booking(
+        traveler_id=traveler_id,
+        property_id=property_id,
+        start_date=_night(start),
+        end_date=_night(end),
+        guests=guests,
+        status=BookingStatus.pending,
+        total_price=quote["total_price"],
+        hold_expires_at=now + timedelta(minutes=BOOKING_HOLD_MINUTES),
+        created_by=traveler_id,
+    )
+    db.add(booking)
+    db.flush()
+    return booking
+
+
+def create_hold(db: Session, traveler_id: int, property_id: int, start: date, end: date, guests: int) -> Booking:
+    """Hold ``[start, end)`` for the traveler. Raises `BookingError` on a conflict."""
+    with property_locks(property_id):
+        # Earlier winners have committed and reached the index by now, so most
+        # losing attempts are turned away without a write transaction. A busy
+        # answer is rechecked against the database; a free one is settled by
+        # _create_hold under the row lock.
+        if db.get(Property, property_id) is not None and not availability_index.is_available(property_id, start, end):
+            raise BookingError("Dates are no longer available")
+        return run_write(db, _create_hold, traveler_id, property_id, start, end, guests)
+
+
+def _get_booking(db: Session, booking_id: int, principal: dict) -> Booking:
+    booking = db.get(Booking, booking_id)
+    if booking is None:
+        raise BookingError("Booking not found", status_code=404)
+    if booking.traveler_id != principal["user_id"] and not principal.get("is_admin"):
+        raise BookingError("Permission denied", status_code=403)
+    return booking
+
+
+def _confirm(db: Session, booking_id: int, principal: dict) -> Booking:
+    booking = _get_booking(db, booking_id, principal)
+    if booking.status == BookingStatus.confirmed:
+        return booking
+    if booking.status != BookingStatus.pending:
+        raise BookingError(f"Booking is {booking.status.value}")
+    if booking.hold_expires_at is not None and booking.hold_expires_at <= datetime.utcnow():
+        raise BookingError("Hold has expired")
+
+    booking.status = BookingStatus.confirmed
+    booking.hold_expires_at = None
+    booking.updated_by = principal["user_id"]
+    db.flush()
+    return booking
+
+
+def _cancel(db: Session, booking_id: int, principal: dict) -> Booking:
+    booking = _get_booking(db, booking_id, principal)
+    if booking.status == BookingStatus.cancelled:
+        return booking
+    if booking.status == BookingStatus.completed:
+        raise BookingError("Booking is completed")
+
+    booking.status = BookingStatus.cancelled
+    booking.hold_expires_at = None
+    booking.updated_by = principal["user_id"]
+    db.flush()
+    return booking
+
+
+def _booking_property(db: Session, booking_id: int) -> Optional[int]:
+    row = db.query(Booking.property_id).filter(Booking.booking_id == booking_id).first()
+    return row.property_id if row else None
+
+
+def _change_status(db: Session, fn, booking_id: int, principal: dict) -> Booking:
+    property_id = _booking_property(db, booking_id)
+    if property_id is None:
+        raise BookingError("Booking not found", status_code=404)
+    # Same lock as create_hold, so a confirm cannot race a hold on expiring dates
+    with property_locks(property_id):
+        return run_write(db, fn, booking_id, principal)
+
+
+def confirm(db: Session, booking_id: int, principal: dict) -> Booking:
+    return _change_status(db, _confirm, booking_id, principal)
+
+
+def cancel(db: Session, booking_id: int, principal: dict) -> Booking:
+    return _change_status(db, _cancel, booking_id, principal)
+
+
+def _expire_holds(db: Session, now: datetime) -> int:
+    # ORM updates rather than a bulk UPDATE, so the availability index hears about them
+    expired = (
+        db.query(Booking)
+        .filter(Booking.status == BookingStatus.pending, Booking.hold_expires_at <= now)
+        .limit(SWEEP_BATCH_SIZE)
+        .all()
+    )
+    for booking in expired:
+        booking.status = BookingStatus.cancelled
+    db.flush()
+    return len(expired)
+
+
+def expire_holds() -> int:
+    """Cancel holds that expired. Returns the number of cancelled bookings."""
+    total = 0
+    while True:
+        with SessionLocal() as db:
+            count = run_write(db, _expire_holds, datetime.utcnow())
+        total += count
+        if count < SWEEP_BATCH_SIZE:
+            return total
+
+
+hold_sweeper = PeriodicTask("hold-sweeper", BOOKING_HOLD_SWEEP_SECONDS, expire_holds)
@@ -0,0 +1,94 @@
+"""Streaming CSV / NDJSON exports for reporting.
+
+Rows are read through a server-side cursor in ``BATCH_SIZE`` batches and each
+batch is encoded (and optionally gzipped) into one chunk, so memory use does
+not grow with the size of the table.
+"""
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+
+from database.models import Booking, Payment, Property
+from database.replicas import read_session
+
+EXPORT_TABLES = {
+    "properties": Property.__table__,
+    "bookings": Booking.__table__,
+    "payments": Payment.__table__,
+}
+FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+BATCH_SIZE = 1000
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(columns, rows, header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _encode_ndjson(columns, rows) -> str:
+    return "".join(
+        json.dumps({name: _plain(value) for name, value in zip(columns, row)}, separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+def export_rows(
+    entity: str,
+    fmt: str,
+    gzip: bool = False,
+    updated_from: Optional[datetime] = None,
+    updated_to: Optional[datetime] = None,
+) -> Iterator[bytes]:
+    """Yield encoded chunks of ``entity`` rows with ``updated_from <= updated_at < updated_to``."""
+    table = EXPORT_TABLES[entity]
+    columns = [column.name for column in table.columns]
+    primary_key = list(table.primary_key.columns)[0]
+
+    query = select(table).order_by(primary_key)
+    if updated_from is not None:
+        query = query.where(table.c.updated_at >= updated_from)
+    if updated_to is not None:
+        query = query.where(table.c.updated_at < updated_to)
+
+    # wbits=31 writes a gzip container rather than a raw zlib stream
+    compressor = zlib.compressobj(wbits=31) if gzip else None
+
+    def emit(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    with read_session() as db:
+        result = db.execute(query.execution_options(stream_results=True, yield_per=BATCH_SIZE))
+        header = True
+        for rows in result.partitions():
+            chunk = _encode_csv(columns, rows, header) if fmt == "csv" else _encode_ndjson(columns, rows)
+            header = False
+            data = emit(chunk)
+            if data:
+                yield data
+
+        if header and fmt == "csv":
+            # No rows matched; still send the header
+            yield emit(_encode_csv(columns, [], True))
+
+    if compressor:
+        yield compressor.flush()
@@ -0,0 +1,146 @@
+import heapq
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, event, inspect, insert, or_
+from sqlalchemy.orm import Session
+
+from database.models import Property, PropertyGeoCell
+from utils.geo_utils import (
+    bbox_around, cell_for, cells_for_bbox, haversine_km, intersect_lng_ranges, lng_ranges, wrap_lng,
+)
+
+# Above this many grid cells the query switches to a latitude range scan
+MAX_QUERY_CELLS = 400
+REBUILD_BATCH_SIZE = 1000
+
+geo_table = PropertyGeoCell.__table__
+
+
+def _geo_row(property_id: int, lat: float, lng: float) -> dict:
+    return {"property_id": property_id, "cell": cell_for(lat, lng), "latitude": lat, "longitude": lng}
+
+
+@event.listens_for(Property, "after_insert")
+def _index_new_property(mapper, connection, target):
+    if target.latitude is not None and target.longitude is not None:
+        connection.execute(insert(geo_table).values(**_geo_row(target.property_id, target.latitude, target.longitude)))
+
+
+@event.listens_for(Property, "after_update")
+def _reindex_property(mapper, connection, target):
+    state = inspect(target)
+    if not (state.attrs.latitude.history.has_changes() or state.attrs.longitude.history.has_changes()):
+        return
+
+    connection.execute(delete(geo_table).where(geo_table.c.property_id == target.property_id))
+    if target.latitude is not None and target.longitude is not None:
+        connection.execute(insert(geo_table).values(**_geo_row(target.property_id, target.latitude, target.longitude)))
+
+
+@event.listens_for(Property, "before_delete")
+def _unindex_property(mapper, connection, target):
+    connection.execute(delete(geo_table).where(geo_table.c.property_id == target.property_id))
+
+
+def index_rows(db: Session, rows) -> None:
+    """Index ``(property_id, latitude, longitude)`` rows written without the ORM."""
+    values = [_geo_row(pid, lat, lng) for pid, lat, lng in rows if lat is not None and lng is not None]
+    if values:
+        db.execute(insert(geo_table), values)
+
+
+def rebuild(db: Session) -> int:
+    """Recreate the whole geo index from `properties`. Returns the number of indexed rows."""
+    db.execute(delete(geo_table))
+    query = (
+        db.query(Property.property_id, Property.latitude, Property.longitude)
+        .filter(Property.latitude.isnot(None), Property.longitude.isnot(None))
+        .order_by(Property.property_id)
+    )
+    total = 0
+    batch = []
+    for row in query.yield_per(REBUILD_BATCH_SIZE):
+        batch.append(tuple(row))
+        if len(batch) == REBUILD_BATCH_SIZE:
+            index_rows(db, batch)
+            total += len(batch)
+            batch = []
+    index_rows(db, batch)
+    total += len(batch)
+    db.commit()
+    return total
+
+
+def ensure_index(db: Session) -> None:
+    """Backfill the geo index for databases created before it existed."""
+    if db.query(PropertyGeoCell.property_id).first() is not None:
+        return
+    if db.query(Property.property_id).filter(Property.latitude.isnot(None)).first() is not None:
+        rebuild(db)
+
+
+def search(
+    query,
+    center: Optional[Tuple[float, float]] = None,
+    radius_km: Optional[float] = None,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    limit: int = 50,
+) -> List[Tuple[Property, float]]:
+    """Run a `Property` query restricted to a radius and/or bounding box.
+
+    Args:
+        query: `Property` query carrying any non-spatial filters
+        center: ``(lat, lng)`` to measure distances from; defaults to the bbox centre
+        radius_km: Keep only properties within this distance of ``center``
+        bbox: ``(min_lat, min_lng, max_lat, max_lng)`` to restrict to; ``min_lng > max_lng``
+            crosses the antimeridian
+        limit: Maximum number of results
+    Returns:
+        List[Tuple[Property, float]]: Properties with their distance in km, nearest first
+    """
+    around = bbox_around(center[0], center[1], radius_km) if radius_km is not None else None
+    if bbox is None:
+        bbox = around
+    ranges = lng_ranges(bbox[1], bbox[3])
+    if around is not None:
+        bbox = (max(bbox[0], around[0]), bbox[1], min(bbox[2], around[2]), bbox[3])
+        ranges = intersect_lng_ranges(ranges, lng_ranges(around[1], around[3]))
+
+    min_lat, min_lng, max_lat, max_lng = bbox
+    if center is None:
+        mid_lng = (min_lng + max_lng) / 2 if min_lng <= max_lng else wrap_lng((min_lng + max_lng + 360) / 2)
+        center = ((min_lat + max_lat) / 2, mid_lng)
+
+    if min_lat > max_lat or not ranges:
+        return []
+
+    query = query.join(PropertyGeoCell, PropertyGeoCell.property_id == Property.property_id)
+    # A box across the antimeridian is scanned as one range on each side of it
+    cells = []
+    for lo, hi in ranges:
+        range_cells = cells_for_bbox(min_lat, lo, max_lat, hi, MAX_QUERY_CELLS - len(cells))
+        if range_cells is None:
+            cells = None
+            break
+        cells.extend(range_cells)
+    if cells is not None:
+        query = query.filter(PropertyGeoCell.cell.in_(cells))
+    query = query.filter(
+        PropertyGeoCell.latitude.between(min_lat, max_lat),
+        or_(*(PropertyGeoCell.longitude.between(lo, hi) for lo, hi in ranges)),
+    )
+
+    candidates = query.with_entities(Property.property_id, PropertyGeoCell.latitude, PropertyGeoCell.longitude)
+    within = []
+    for property_id, lat, lng in candidates:
+        distance = haversine_km(center[0], center[1], lat, lng)
+        if radius_km is None or distance <= radius_km:
+            within.append((distance, property_id))
+
+    nearest = heapq.nsmallest(limit, within)
+    if not nearest:
+        return []
+
+    props = query.session.query(Property).filter(Property.property_id.in_([pid for _, pid in nearest])).all()
+    by_id = {prop.property_id: prop for prop in props}
+    return [(by_id[pid], distance) for distance, pid in nearest if pid in by_id]
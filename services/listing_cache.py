@@ -0,0 +1,135 @@
+"""Cached result sets for GET /properties.
+
+A result set is the ordered list of ``(sort_value, property_id, price)`` for
+one canonical filter set: cities and countries case-folded, the text query
+reduced to its search terms and the price range widened to whole buckets so
+that nearby ranges share an entry. The exact price range, the keyset position
+and the page size are applied in memory, and pages are hydrated from the
+per-property entries of the read cache.
+
+Every committed `Property` write bumps the catalog version, which retires all
+cached result sets at once, and the version of the written property itself.
+Review writes only retire result sets sorted by rating. Filter sets matching
+more than ``CACHE_LISTING_MAX_IDS`` properties are served from SQL and marked
+oversized until the cache TTL, across catalog versions.
+"""
+import math
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.config import CACHE_LISTING_MAX_IDS, CACHE_LISTING_PRICE_BUCKET
+from database.events import run_after_commit
+from database.models import Property, Review
+from services import search_index
+from utils.cache_utils import read_cache
+
+CATALOG = "catalog"
+RATINGS = "ratings"
+OVERSIZED = "listing_oversized"
+
+Entry = Tuple[object, int, float]
+
+
+def _text(value: Optional[str]) -> Optional[str]:
+    # The filters are case-insensitive substring matches; whitespace is significant
+    return value.lower() if value else None
+
+
+def _bucket_floor(price: Optional[float]) -> Optional[float]:
+    return math.floor(price / CACHE_LISTING_PRICE_BUCKET) * CACHE_LISTING_PRICE_BUCKET if price else None
+
+
+def _bucket_ceil(price: Optional[float]) -> Optional[float]:
+    return math.ceil(price / CACHE_LISTING_PRICE_BUCKET) * CACHE_LISTING_PRICE_BUCKET if price else None
+
+
+def widened_filters(filters) -> tuple:
+    """Canonical listing filters with the price range widened to whole buckets."""
+    city, country, min_price, max_price, is_available = filters
+    return _text(city), _text(country), _bucket_floor(min_price), _bucket_ceil(max_price), is_available
+
+
+def _params(filters, q: Optional[str], sort_by, descending: bool) -> tuple:
+    terms = search_index.match_expression(q) if q else None
+    direction = descending if sort_by.value == "rating" else None
+    return (*widened_filters(filters), terms, sort_by.value, direction)
+
+
+def cache_key(filters, q: Optional[str], sort_by, descending: bool = False) -> tuple:
+    """Read cache key of a result set; build it before querying the database.
+
+    Both directions share a result set, except the rating sort: unrated
+    properties go last either way, so its two orders are not mirror images.
+    """
+    ratings_version = read_cache.version(RATINGS) if sort_by.value == "rating" else None
+    return read_cache.key(CATALOG, None, ratings_version, *_params(filters, q, sort_by, descending))
+
+
+def oversized_key(filters, q: Optional[str], sort_by, descending: bool = False) -> tuple:
+    """Read cache key marking a filter set whose result set is too large to cache.
+
+    Unlike `cache_key` it survives catalog writes, so a busy catalog does not
+    repeat the capped load on every request just to find the set oversized
+    again. The mark expires with the cache TTL.
+    """
+    return read_cache.key(OVERSIZED, None, *_params(filters, q, sort_by, descending))
+
+
+def page(entries: List[Entry], filters, descending: bool, position, limit: int) -> Tuple[List[Entry], bool]:
+    """Cut one page out of an ascending result set.
+
+    Returns:
+        Tuple: ``(entries, has_more)``
+    """
+    _, _, min_price, max_price, _ = filters
+
+    def sort_key(entry: Entry):
+        return entry[0], entry[1]
+
+    if descending:
+        end = bisect_left(entries, tuple(position), key=sort_key) if position is not None else len(entries)
+        candidates = (entries[idx] for idx in range(end - 1, -1, -1))
+    else:
+        start = bisect_right(entries, tuple(position), key=sort_key) if position is not None else 0
+        candidates = (entries[idx] for idx in range(start, len(entries)))
+
+    selected = []
+    for entry in candidates:
+        price = entry[2]
+        if min_price and price < min_price:
+            continue
+        if max_price and price > max_price:
+            continue
+        selected.append(entry)
+        if len(selected) > limit:
+            return selected[:limit], True
+    return selected, False
+
+
+def too_large(rows) -> bool:
+    return len(rows) > CACHE_LISTING_MAX_IDS
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_property_writes(session, flush_context):
+    changed = [
+        obj.property_id for obj in session.dirty
+        if isinstance(obj, Property) and session.is_modified(obj)
+    ]
+    changed += [obj.property_id for obj in session.deleted if isinstance(obj, Property)]
+    created = any(isinstance(obj, Property) for obj in session.new)
+
+    if changed or created:
+        run_after_commit(session, _bump, changed)
+
+    if any(isinstance(obj, Review) for obj in (*session.new, *session.dirty, *session.deleted)):
+        run_after_commit(session, read_cache.bump, RATINGS)
+
+
+def _bump(property_ids) -> None:
+    read_cache.bump(CATALOG)
+    for property_id in property_ids:
+        read_cache.bump("property", property_id)
@@ -0,0 +1,153 @@
+"""Stay quotes: nightly prices with the best applicable package discount.
+
+A package discounts a night when the night's date falls within
+``valid_from``..``valid_to`` (dates, inclusive, open when null) and the stay is
+at least ``min_nights`` long. When several packages apply to a night, the
+largest discount wins (ties go to the lowest package id); discounts do not
+stack. Quotes are computed over a ``properties x nights`` matrix so a search
+page can price hundreds of properties in a handful of array operations.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List
+
+import numpy as np
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from database.models import Package, Property
+
+MAX_STAY_NIGHTS = 365
+MAX_BATCH_PROPERTIES = 500
+
+_NO_PACKAGE = np.iinfo(np.int64).max
+
+
+def _day_offset(value, start: date, default: int) -> int:
+    if value is None:
+        return default
+    day = value.date() if isinstance(value, datetime) else value
+    return (day - start).days
+
+
+def price_matrix(base_prices, nights: int, package_rows, package_columns):
+    """Vectorized core of the quote engine.
+
+    ``base_prices`` holds one nightly rate per property. ``package_rows`` maps
+    each package to its property's row, and ``package_columns`` is a tuple of
+    arrays ``(package_id, discount_percent, first_night, last_night)`` with
+    night offsets relative to the first night of the stay. Returns
+    ``(base, discount_percent, price, package_id)`` matrices of shape
+    ``(len(base_prices), nights)``; nights without a discount have package id -1.
+    """
+    base = np.repeat(np.asarray(base_prices, dtype=np.float64)[:, None], nights, axis=1)
+    discount = np.zeros_like(base)
+    chosen = np.full(base.shape, -1, dtype=np.int64)
+
+    package_ids, percents, first_night, last_night = package_columns
+    if len(package_ids):
+        offsets = np.arange(nights)
+        covered = (first_night[:, None] <= offsets) & (offsets <= last_night[:, None])
+        package_discount = np.where(covered, np.clip(percents, 0.0, 100.0)[:, None], 0.0)
+
+        # Best discount per (property, night) across that property's packages
+        np.maximum.at(discount, package_rows, package_discount)
+
+        winners = (package_discount > 0) & (package_discount == discount[package_rows])
+        best_ids = np.full(base.shape, _NO_PACKAGE, dtype=np.int64)
+        np.minimum.at(best_ids, package_rows, np.where(winners, package_ids[:, None], _NO_PACKAGE))
+        chosen = np.where(best_ids == _NO_PACKAGE, -1, best_ids)
+
+    price = np.round(base * (1.0 - discount / 100.0), 2)
+    return base, discount, price, chosen
+
+
+def _load_packages(db: Session, property_ids: List[int], start: date, end: date):
+    nights = (end - start).days
+    return (
+        db.query(Package)
+        .filter(
+            Package.property_id.in_(property_ids),
+            Package.discount_percent > 0,
+            or_(Package.min_nights.is_(None), Package.min_nights <= nights),
+            or_(Package.valid_from.is_(None), Package.valid_from < datetime.combine(end, time.min)),
+            or_(Package.valid_to.is_(None), Package.valid_to >= datetime.combine(start, time.min)),
+        )
+        .all()
+    )
+
+
+def _price(db: Session, property_ids: List[int], start: date, end: date):
+    nights = (end - start).days
+    rows = (
+        db.query(Property.property_id, Property.price_per_night)
+        .filter(Property.property_id.in_(property_ids))
+        .order_by(Property.property_id)
+        .all()
+    )
+    found = [pid for pid, _ in rows]
+    row_of = {pid: i for i, pid in enumerate(found)}
+
+    packages = _load_packages(db, found, start, end) if found else []
+    package_columns = (
+        np.array([p.package_id for p in packages], dtype=np.int64),
+        np.array([p.discount_percent for p in packages], dtype=np.float64),
+        np.array([_day_offset(p.valid_from, start, 0) for p in packages], dtype=np.int64),
+        np.array([_day_offset(p.valid_to, start, nights - 1) for p in packages], dtype=np.int64),
+    )
+    package_rows = np.array([row_of[p.property_id] for p in packages], dtype=np.int64)
+
+    matrices = price_matrix([price for _, price in rows], nights, package_rows, package_columns)
+    return found, matrices
+
+
+def quote_many(db: Session, property_ids: Iterable[int], start: date, end: date) -> Dict[int, dict]:
+    """Stay totals per property; unknown ids are left out."""
+    ids = sorted(set(property_ids))
+    if not ids:
+        return {}
+    found, (base, _, price, _) = _price(db, ids, start, end)
+    base_totals = np.round(base.sum(axis=1), 2)
+    totals = np.round(price.sum(axis=1), 2)
+
+    nights = (end - start).days
+    return {
+        pid: {
+            "property_id": pid,
+            "nights": nights,
+            "base_total": float(base_totals[i]),
+            "discount_total": round(float(base_totals[i] - totals[i]), 2),
+            "total_price": float(totals[i]),
+        }
+        for i, pid in enumerate(found)
+    }
+
+
+def quote(db: Session, property_id: int, start: date, end: date):
+    """Stay total with a per-night breakdown, or None for an unknown property."""
+    found, (base, discount, price, chosen) = _price(db, [property_id], start, end)
+    if not found:
+        return None
+
+    nightly = [
+        {
+            "date": start + timedelta(days=night),
+            "base_price": float(base[0, night]),
+            "discount_percent": float(discount[0, night]),
+            "price": float(price[0, night]),
+            "package_id": int(chosen[0, night]) if chosen[0, night] >= 0 else None,
+        }
+        for night in range(base.shape[1])
+    ]
+    base_total = round(float(base[0].sum()), 2)
+    total = round(float(price[0].sum()), 2)
+    return {
+        "property_id": property_id,
+        "start_date": start,
+        "end_date": end,
+        "nights": len(nightly),
+        "base_total": base_total,
+        "discount_total": round(base_total - total, 2),
+        "total_price": total,
+        "package_ids": sorted({night["package_id"] for night in nightly if night["package_id"] is not None}),
+        "nightly": nightly,
+    }
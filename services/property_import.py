@@ -0,0 +1,226 @@
+"""Streaming bulk import of properties from CSV or NDJSON.
+
+Input is fed as raw byte chunks and parsed incrementally, so uploads are never
+buffered whole. Rows are numbered from 1 (the CSV header is not a row),
+validated against `PropertyCreate` a chunk at a time and inserted with one
+batched core INSERT per chunk, each chunk its own write unit (see
+database.write_queue) so it commits or rolls back whole. ``last_committed_row``
+in the result is the resume point: re-run with ``start_row`` one past it.
+Input that is not UTF-8 stops the import after committing the rows parsed
+before it, and the failure names the byte offset of the bad byte.
+"""
+import codecs
+import csv
+import json
+from typing import Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from database.models import Property
+from database.write_queue import run_write
+from routers.request_models.property_models import PropertyCreate
+from services import geo_index, listing_cache, search_index
+from utils.cache_utils import read_cache
+
+FORMATS = ("csv", "ndjson")
+DEFAULT_CHUNK_SIZE = 1000
+# Per-row errors beyond this are only counted
+MAX_REPORTED_ERRORS = 1000
+
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+
+class RecordParser:
+    """Incremental CSV / NDJSON parser yielding ``(row, record, error)``."""
+
+    def __init__(self, fmt: str):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported import format {fmt!r}")
+        self.fmt = fmt
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._pending = ""
+        self._record = ""
+        self._header: Optional[List[str]] = None
+        self._row = 0
+        self._fed = 0
+        # Set once the input turns out not to be UTF-8; nothing is parsed after that
+        self.error: Optional[str] = None
+
+    def _decode(self, data: bytes, final: bool = False) -> None:
+        try:
+            self._pending += self._decoder.decode(data, final)
+        except UnicodeDecodeError as e:
+            # e.object is the decoder's buffered bytes plus data, minus any BOM;
+            # the lines completed before the bad byte are still parsed
+            self._pending += e.object[:e.start].decode("utf-8")
+            offset = self._fed + len(data) - len(e.object) + e.start
+            self.error = f"Input is not valid UTF-8 at byte {offset}"
+        self._fed += len(data)
+
+    def feed(self, data: bytes) -> Iterator[Record]:
+        if self.error is not None:
+            return
+        self._decode(data)
+        *lines, self._pending = self._pending.split("\n")
+        for line in lines:
+            yield from self._line(line + "\n")
+
+    def close(self) -> Iterator[Record]:
+        if self.error is not None:
+            return
+        self._decode(b"", final=True)
+        if self.error is not None:
+            return
+        if self._pending:
+            yield from self._line(self._pending)
+            self._pending = ""
+        if self._record.strip():
+            # Unterminated quoted CSV field
+            self._row += 1
+            yield self._row, None, "Unterminated quoted field"
+        self._record = ""
+
+    def _line(self, line: str) -> Iterator[Record]:
+        if self.fmt == "ndjson":
+            if not line.strip():
+                return
+            self._row += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield self._row, None, f"Invalid JSON: {e}"
+                return
+            if not isinstance(record, dict):
+                yield self._row, None, "Expected a JSON object"
+                return
+            yield self._row, record, None
+            return
+
+        # A CSV record may span lines inside a quoted field
+        self._record += line
+        if self._record.count('"') % 2:
+            return
+        text, self._record = self._record, ""
+        if not text.strip():
+            return
+
+        values = next(csv.reader([text]))
+        if self._header is None:
+            self._header = [name.strip() for name in values]
+            return
+
+        self._row += 1
+        if len(values) != len(self._header):
+            yield self._row, None, f"Expected {len(self._header)} columns, got {len(values)}"
+            return
+        yield self._row, {name: (value if value != "" else None) for name, value in zip(self._header, values)}, None
+
+
+def _insert_chunk(db: Session, values: List[dict]) -> None:
+    """Write unit for database.write_queue.run_write: flush, never commit."""
+    ids = db.scalars(
+        insert(Property).returning(Property.property_id, sort_by_parameter_order=True),
+        values,
+    ).all()
+    # Core inserts skip the mapper events that keep the indexes in sync
+    for property_id, row in zip(ids, values):
+        row["property_id"] = property_id
+    geo_index.index_rows(db, [(row["property_id"], row["latitude"], row["longitude"]) for row in values])
+    search_index.index_rows(db, values)
+    read_cache.invalidate_after_commit(db, listing_cache.CATALOG)
+
+
+class PropertyImporter:
+    def __init__(self, db: Session, owner_id: int, start_row: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.db = db
+        self.owner_id = owner_id
+        self.start_row = start_row
+        self.chunk_size = chunk_size
+        self.pending: List[Record] = []
+        self.imported = 0
+        self.skipped = 0
+        self.error_count = 0
+        self.errors: List[dict] = []
+        self.last_committed_row = start_row - 1
+        self.failure: Optional[str] = None
+
+    def add(self, record: Record) -> bool:
+        """Queue a parsed record. Returns True once a chunk is ready to flush."""
+        if record[0] < self.start_row:
+            self.skipped += 1
+            return False
+        self.pending.append(record)
+        return len(self.pending) >= self.chunk_size
+
+    def _error(self, row: int, message) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    def flush(self) -> None:
+        """Validate the pending chunk, then insert and commit it as one write unit."""
+        if not self.pending or self.failure:
+            return
+        chunk, self.pending = self.pending, []
+
+        values = []
+        for row, record, error in chunk:
+            if error is not None:
+                self._error(row, error)
+                continue
+            try:
+                prop = PropertyCreate.model_validate(record)
+            except ValidationError as e:
+                self._error(row, e.errors(include_url=False, include_context=False, include_input=False))
+                continue
+            values.append({"owner_id": self.owner_id, **prop.model_dump()})
+
+        try:
+            if values:
+                run_write(self.db, _insert_chunk, values)
+        except Exception as e:
+            self.failure = f"Rows {chunk[0][0]}-{chunk[-1][0]} were not imported: {e}"
+            return
+
+        self.imported += len(values)
+        self.last_committed_row = chunk[-1][0]
+
+    def fail(self, message: str) -> None:
+        """Stop at malformed input, committing the rows parsed before it."""
+        self.flush()
+        if self.failure is None:
+            self.failure = f"{message}; rows after {self.last_committed_row} were not imported"
+
+    def result(self) -> dict:
+        return {
+            "completed": self.failure is None,
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "last_committed_row": self.last_committed_row,
+            "failure": self.failure,
+        }
+
+
+def import_stream(db: Session, chunks, fmt: str, owner_id: int, start_row: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """Import from an iterable of byte chunks, e.g. an open file read in blocks."""
+    parser = RecordParser(fmt)
+    importer = PropertyImporter(db, owner_id, start_row, chunk_size)
+    for data in chunks:
+        for record in parser.feed(data):
+            if importer.add(record):
+                importer.flush()
+        if parser.error:
+            importer.fail(parser.error)
+        if importer.failure:
+            return importer.result()
+    for record in parser.close():
+        if importer.add(record):
+            importer.flush()
+    if parser.error:
+        importer.fail(parser.error)
+    importer.flush()
+    return importer.result()
@@ -0,0 +1,135 @@
+"""Incrementally maintained review aggregates per property.
+
+Every review insert, update and delete applies its delta to the property's
+`PropertyRatingSummary` row on the same connection, so the summary commits or
+rolls back together with the review.
+"""
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import case, delete, event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from database.models import PropertyRatingSummary, Review
+
+RATINGS = range(1, 6)
+REBUILD_BATCH_SIZE = 1000
+
+summary_table = PropertyRatingSummary.__table__
+
+
+def _bucket(rating: int) -> str:
+    return f"rating_{rating}"
+
+
+def _apply(connection, property_id: Optional[int], rating: Optional[int], sign: int) -> None:
+    """Add (``sign=1``) or remove (``sign=-1``) one rating from a property's summary."""
+    if property_id is None or rating not in RATINGS:
+        return
+
+    c = summary_table.c
+    new_count = c.review_count + sign
+    new_sum = c.rating_sum + sign * rating
+    result = connection.execute(
+        update(summary_table)
+        .where(c.property_id == property_id)
+        .values({
+            c.review_count: new_count,
+            c.rating_sum: new_sum,
+            # SET expressions see the old column values
+            c.rating_avg: case((new_count > 0, new_sum * 1.0 / new_count), else_=None),
+            c[_bucket(rating)]: c[_bucket(rating)] + sign,
+        })
+    )
+    if result.rowcount == 0 and sign > 0:
+        row = {_bucket(r): 0 for r in RATINGS}
+        row.update({
+            "property_id": property_id,
+            "review_count": 1,
+            "rating_sum": rating,
+            "rating_avg": float(rating),
+            _bucket(rating): 1,
+        })
+        connection.execute(insert(summary_table).values(**row))
+
+
+@event.listens_for(Review, "after_insert")
+def _add_review(mapper, connection, target):
+    _apply(connection, target.property_id, target.rating, 1)
+
+
+@event.listens_for(Review.rating, "set", active_history=True)
+@event.listens_for(Review.property_id, "set", active_history=True)
+def _load_old_value(target, value, oldvalue, initiator):
+    # active_history loads the previous value of an expired attribute on set,
+    # so _change_review can subtract it
+    return value
+
+
+@event.listens_for(Review, "after_update")
+def _change_review(mapper, connection, target):
+    state = inspect(target)
+    rating_history = state.attrs.rating.history
+    property_history = state.attrs.property_id.history
+    if not (rating_history.has_changes() or property_history.has_changes()):
+        return
+
+    old_rating = rating_history.deleted[0] if rating_history.deleted else target.rating
+    old_property_id = property_history.deleted[0] if property_history.deleted else target.property_id
+    _apply(connection, old_property_id, old_rating, -1)
+    _apply(connection, target.property_id, target.rating, 1)
+
+
+@event.listens_for(Review, "after_delete")
+def _remove_review(mapper, connection, target):
+    _apply(connection, target.property_id, target.rating, -1)
+
+
+def rebuild(db: Session) -> int:
+    """Recompute every summary row from `reviews`. Returns the number of summarized properties."""
+    db.execute(delete(summary_table))
+    counts = [func.sum(case((Review.rating == r, 1), else_=0)).label(_bucket(r)) for r in RATINGS]
+    query = (
+        select(
+            Review.property_id,
+            func.count().label("review_count"),
+            func.sum(Review.rating).label("rating_sum"),
+            *counts,
+        )
+        .where(Review.rating.in_(list(RATINGS)))
+        .group_by(Review.property_id)
+    )
+
+    total = 0
+    for rows in db.execute(query.execution_options(yield_per=REBUILD_BATCH_SIZE)).partitions():
+        values = [{**row._asdict(), "rating_avg": row.rating_sum / row.review_count} for row in rows]
+        db.execute(insert(summary_table), values)
+        total += len(values)
+    db.commit()
+    return total
+
+
+def ensure_summary(db: Session) -> None:
+    """Backfill the summary for databases created before it existed."""
+    if db.query(PropertyRatingSummary.property_id).first() is not None:
+        return
+    if db.query(Review.review_id).first() is not None:
+        rebuild(db)
+
+
+def summaries(db: Session, property_ids: Iterable[int]) -> Dict[int, PropertyRatingSummary]:
+    ids = list(property_ids)
+    if not ids:
+        return {}
+    rows = db.query(PropertyRatingSummary).filter(PropertyRatingSummary.property_id.in_(ids))
+    return {row.property_id: row for row in rows}
+
+
+def summary_out(summary: Optional[PropertyRatingSummary]) -> dict:
+    """Rating summary in the shape of `PropertyRatingOut`."""
+    if summary is None or not summary.review_count:
+        return {"count": 0, "average": None, "histogram": {r: 0 for r in RATINGS}}
+    return {
+        "count": summary.review_count,
+        "average": round(summary.rating_avg, 2),
+        "histogram": {r: getattr(summary, _bucket(r)) for r in RATINGS},
+    }
@@ -0,0 +1,152 @@
+import re
+from typing import Optional
+
+from sqlalchemy import Column, Integer, MetaData, Table, Text, delete, event, func, insert, inspect, literal_column, or_, select, text
+from sqlalchemy.orm import Session
+
+from database.models import Property
+
+INDEXED_COLUMNS = ("title", "description", "city", "country")
+# bm25 column weights, in INDEXED_COLUMNS order
+COLUMN_WEIGHTS = (10.0, 1.0, 5.0, 5.0)
+REBUILD_BATCH_SIZE = 1000
+
+# FTS5 virtual table keyed by rowid = property_id. It lives outside
+# Base.metadata because create_all cannot create virtual tables.
+property_fts = Table(
+    "property_fts",
+    MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    *(Column(name, Text) for name in INDEXED_COLUMNS),
+)
+
+_CREATE_FTS = text(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS property_fts USING fts5("
+    + ", ".join(INDEXED_COLUMNS)
+    + ", tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Set by ensure_index() once the FTS5 table is known to exist
+enabled = False
+
+
+def _fts_row(property_id: int, target) -> dict:
+    row = {name: getattr(target, name) for name in INDEXED_COLUMNS}
+    row["rowid"] = property_id
+    return row
+
+
+def _indexes(connection) -> bool:
+    return enabled and connection.dialect.name == "sqlite"
+
+
+@event.listens_for(Property, "after_insert")
+def _index_new_property(mapper, connection, target):
+    if _indexes(connection):
+        connection.execute(insert(property_fts).values(**_fts_row(target.property_id, target)))
+
+
+@event.listens_for(Property, "after_update")
+def _reindex_property(mapper, connection, target):
+    if not _indexes(connection):
+        return
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in INDEXED_COLUMNS):
+        return
+    connection.execute(delete(property_fts).where(property_fts.c.rowid == target.property_id))
+    connection.execute(insert(property_fts).values(**_fts_row(target.property_id, target)))
+
+
+@event.listens_for(Property, "before_delete")
+def _unindex_property(mapper, connection, target):
+    if _indexes(connection):
+        connection.execute(delete(property_fts).where(property_fts.c.rowid == target.property_id))
+
+
+def index_rows(db: Session, rows) -> None:
+    """Index property dicts (with ``property_id``) written without the ORM."""
+    if not _indexes(db.connection()):
+        return
+    values = [{"rowid": row["property_id"], **{name: row.get(name) for name in INDEXED_COLUMNS}} for row in rows]
+    if values:
+        db.execute(insert(property_fts), values)
+
+
+def rebuild(db: Session) -> int:
+    """Recreate the full-text index from `properties`. Returns the number of indexed rows."""
+    if not _indexes(db.connection()):
+        return 0
+
+    db.execute(delete(property_fts))
+    columns = [getattr(Property, name) for name in INDEXED_COLUMNS]
+    query = db.query(Property.property_id, *columns).order_by(Property.property_id)
+
+    total = 0
+    batch = []
+    for row in query.yield_per(REBUILD_BATCH_SIZE):
+        batch.append(row._asdict())
+        if len(batch) == REBUILD_BATCH_SIZE:
+            index_rows(db, batch)
+            total += len(batch)
+            batch = []
+    index_rows(db, batch)
+    total += len(batch)
+    db.commit()
+    return total
+
+
+def ensure_index(db: Session) -> None:
+    """Create the FTS5 table on SQLite and backfill it when it is empty."""
+    global enabled
+
+    if db.get_bind().dialect.name != "sqlite":
+        return
+    try:
+        db.execute(_CREATE_FTS)
+        db.commit()
+    except Exception:
+        # SQLite built without FTS5: text search falls back to ilike
+        db.rollback()
+        return
+
+    enabled = True
+    if db.execute(select(property_fts.c.rowid).limit(1)).first() is None:
+        if db.query(Property.property_id).first() is not None:
+            rebuild(db)
+
+
+def match_expression(q: str) -> Optional[str]:
+    """Build an FTS5 query matching every term of ``q`` as a prefix."""
+    terms = _TOKEN_RE.findall(q.lower())
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def apply_text_search(query, q: str):
+    """Restrict a `Property` query to rows matching ``q``.
+
+    Returns:
+        Tuple: ``(query, rank)`` where ``rank`` is a bm25 column (lower is
+        better) to order by, or None when full-text search is unavailable.
+    """
+    expression = match_expression(q)
+    if expression is None:
+        return query, None
+
+    if not enabled:
+        for term in _TOKEN_RE.findall(q.lower()):
+            pattern = f"%{term}%"
+            query = query.filter(or_(*(getattr(Property, name).ilike(pattern) for name in INDEXED_COLUMNS)))
+        return query, None
+
+    fts = literal_column("property_fts")
+    ranked = (
+        select(property_fts.c.rowid.label("property_id"), func.bm25(fts, *COLUMN_WEIGHTS).label("rank"))
+        .where(fts.op("MATCH")(expression))
+        .subquery("ranked")
+    )
+    query = query.join(ranked, ranked.c.property_id == Property.property_id)
+    return query, ranked.c.rank
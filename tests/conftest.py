@@ -0,0 +1,76 @@
+"""Shared fixtures.
+
+The app reads dev.conf from the working directory when it is imported, so
+the tests run from a scratch directory holding their own config and SQLite
+database; importing app modules has to wait until this file has run.
+"""
+import os
+import tempfile
+import uuid
+
+import pytest
+
+WORKDIR = tempfile.mkdtemp(prefix="hotel-tests-")
+with open(os.path.join(WORKDIR, "dev.conf"), "w") as f:
+    f.write(f"""[Jwt]
+SECRET_KEY = test-secret
+ALGORITHM = HS256
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = 7
+
+[Database]
+URL = sqlite:///{os.path.join(WORKDIR, "hotel.db")}
+
+[PasswordHashing]
+WORKERS = 1
+""")
+os.chdir(WORKDIR)
+
+PASSWORD = "test-password"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def signup(client):
+    """Creates a user with a unique email and returns ``(user_id, auth headers)``."""
+
+    def create(is_admin: bool = False):
+        from database.models import User
+        from database.session import SessionLocal
+
+        email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+        response = client.post("/rest/v1/auth/signup/", json={"email": email, "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        user_id = response.json()["user_id"]
+        if is_admin:
+            with SessionLocal() as db:
+                db.query(User).filter(User.user_id == user_id).update({"is_admin": 1, "is_staff": 1})
+                db.commit()
+
+        response = client.post("/rest/v1/auth/login/", json={"email": email, "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        return user_id, {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return create
+
+
+@pytest.fixture(scope="session")
+def admin_headers(signup):
+    return signup(is_admin=True)[1]
+
+
+@pytest.fixture(params=[False, True], ids=["request-session", "group-commit"])
+def group_commit(request, monkeypatch):
+    """Runs the test with write units on the request session, then on the writer thread."""
+    from database import write_queue
+    from database.write_queue import WriteQueue, WriterSession
+
+    monkeypatch.setattr(write_queue, "write_queue", WriteQueue(WriterSession) if request.param else None)
@@ -0,0 +1,16 @@
+from database.models import User, UserProfile
+from database.session import SessionLocal
+
+
+def test_delete_user_removes_profile_and_tokens(client, signup, admin_headers):
+    user_id, headers = signup()
+    with SessionLocal() as db:
+        assert db.query(UserProfile).filter(UserProfile.user_id == user_id).count() == 1
+
+    response = client.delete(f"/rest/v1/admin/delete-user/{user_id}", headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+    with SessionLocal() as db:
+        assert db.get(User, user_id) is None
+        assert db.query(UserProfile).filter(UserProfile.user_id == user_id).count() == 0
+    assert client.get("/rest/v1/user/me", headers=headers).status_code == 401
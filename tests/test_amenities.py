@@ -0,0 +1,72 @@
+import uuid
+
+from database.models import Property, property_amenity
+from database.session import SessionLocal
+
+AMENITY = "/rest/v1/amenity"
+
+
+def _add(client, headers):
+    response = client.post(f"{AMENITY}/amenities", headers=headers, json={"name": f"amenity-{uuid.uuid4().hex}"})
+    assert response.status_code == 200, response.text
+    return response.json()["amenity_id"]
+
+
+def _property(owner_id):
+    with SessionLocal() as db:
+        prop = Property(
+            owner_id=owner_id, title="Amenities", description="d", price_per_night=100, address="a", city="Goa",
+            country="India", max_guests=2, property_type="apartment", is_available=1,
+        )
+        db.add(prop)
+        db.commit()
+        return prop.property_id
+
+
+def _assigned(property_id):
+    with SessionLocal() as db:
+        rows = db.execute(property_amenity.select().where(property_amenity.c.property_id == property_id))
+        return {aid for _, aid in rows}
+
+
+def test_amenity_crud(client, admin_headers):
+    amenity_id = _add(client, admin_headers)
+
+    renamed = client.put(f"{AMENITY}/amenities/{amenity_id}", headers=admin_headers, json={"name": f"renamed-{amenity_id}"})
+    assert renamed.status_code == 200
+    names = {a["amenity_id"]: a["name"] for a in client.get(f"{AMENITY}/amenities").json()}
+    assert names[amenity_id] == f"renamed-{amenity_id}"
+
+    assert client.delete(f"{AMENITY}/amenities/{amenity_id}", headers=admin_headers).status_code == 200
+    assert amenity_id not in {a["amenity_id"] for a in client.get(f"{AMENITY}/amenities").json()}
+    assert client.delete(f"{AMENITY}/amenities/{amenity_id}", headers=admin_headers).status_code == 404
+
+
+def test_assign_replaces_amenity_set(client, admin_headers):
+    first, second, third = (_add(client, admin_headers) for _ in range(3))
+    property_id = _property(1)
+
+    response = client.post(f"{AMENITY}/properties/{property_id}/amenities", headers=admin_headers, json=[first, second])
+    assert response.json()["added"] == 2
+    response = client.post(f"{AMENITY}/properties/{property_id}/amenities", headers=admin_headers, json=[second, third])
+    assert (response.json()["added"], response.json()["removed"]) == (1, 1)
+    assert _assigned(property_id) == {second, third}
+
+
+def test_bulk_assign_is_all_or_nothing(client, signup, admin_headers):
+    owner_id, headers = signup()
+    amenity_id = _add(client, admin_headers)
+    mine, other = _property(owner_id), _property(owner_id + 10_000)
+
+    response = client.post(f"{AMENITY}/properties/amenities/bulk", headers=headers, json=[
+        {"property_id": mine, "amenity_ids": [amenity_id]},
+        {"property_id": other, "amenity_ids": [amenity_id]},
+    ])
+    assert response.status_code == 403
+    assert _assigned(mine) == set()
+
+    response = client.post(f"{AMENITY}/properties/amenities/bulk", headers=headers, json=[
+        {"property_id": mine, "amenity_ids": [amenity_id]},
+    ])
+    assert response.status_code == 200
+    assert _assigned(mine) == {amenity_id}
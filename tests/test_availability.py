@@ -0,0 +1,73 @@
+"""The availability index only hears about this process's commits; writes
+from other processes are simulated with Core statements, which fire no ORM
+events."""
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import insert, update
+
+from database.models import Booking, BookingStatus, Property
+from database.session import engine, SessionLocal
+from services.availability import availability_index
+
+BOOKING = "/rest/v1/booking"
+
+
+@pytest.fixture
+def property_id():
+    with SessionLocal() as db:
+        prop = Property(
+            owner_id=1, title="Calendar", description="d", price_per_night=100, address="a", city="Goa",
+            country="India", max_guests=4, property_type="apartment", is_available=1,
+        )
+        db.add(prop)
+        db.commit()
+        return prop.property_id
+
+
+def _availability(client, property_id, start, end):
+    response = client.get(f"{BOOKING}/properties/{property_id}/availability?start_date={start}&end_date={end}")
+    assert response.status_code == 200, response.text
+    return response.json()["is_available"]
+
+
+def _book(client, headers, property_id, start, end):
+    return client.post(f"{BOOKING}/bookings", headers=headers, json={
+        "property_id": property_id, "start_date": str(start), "end_date": str(end), "guests": 1,
+    })
+
+
+def test_cancellation_elsewhere_frees_dates(client, signup, property_id):
+    _, headers = signup()
+    start, end = date(2030, 1, 2), date(2030, 1, 4)
+    booked = _book(client, headers, property_id, start, end)
+    assert booked.status_code == 200, booked.text
+    assert _availability(client, property_id, start, end) is False
+
+    with engine.begin() as connection:
+        connection.execute(
+            update(Booking.__table__)
+            .where(Booking.booking_id == booked.json()["booking_id"])
+            .values(status=BookingStatus.cancelled)
+        )
+
+    assert _availability(client, property_id, start, end) is True
+    assert _book(client, headers, property_id, start, end).status_code == 200
+
+
+def test_booking_elsewhere_is_refused(client, signup, property_id, monkeypatch):
+    traveler_id, headers = signup()
+    start, end = date(2030, 3, 1), date(2030, 3, 5)
+    assert _availability(client, property_id, start, end) is True
+
+    with engine.begin() as connection:
+        connection.execute(insert(Booking.__table__).values(
+            traveler_id=traveler_id, property_id=property_id, start_date=datetime(2030, 3, 2),
+            end_date=datetime(2030, 3, 3), guests=1, status=BookingStatus.confirmed, total_price=100,
+        ))
+
+    # The calendar still says free, but the hold is checked against the database
+    assert _book(client, headers, property_id, start, end).status_code == 409
+    # Once the calendar expires the endpoint sees the booking too
+    monkeypatch.setattr(availability_index, "ttl_seconds", 0)
+    assert _availability(client, property_id, start, end) is False
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+import threading
+
+from tests.conftest import WORKDIR
+from utils.periodic import PeriodicTask
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_main_has_no_side_effects(tmp_path):
+    with open(os.path.join(WORKDIR, "dev.conf")) as f:
+        config = f.read().replace(os.path.join(WORKDIR, "hotel.db"), str(tmp_path / "hotel.db"))
+    (tmp_path / "dev.conf").write_text(config)
+
+    script = "import threading, main; print(','.join(sorted(t.name for t in threading.enumerate())))"
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=tmp_path, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": PACKAGE_DIR},
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "MainThread"
+    # Not migrated: no tables were created
+    assert not (tmp_path / "hotel.db").exists() or (tmp_path / "hotel.db").stat().st_size == 0
+
+
+def test_periodic_task_stops_and_restarts():
+    ran = threading.Event()
+    task = PeriodicTask("test-periodic", 0.01, ran.set)
+
+    task.start()
+    assert ran.wait(1)
+    task.stop()
+    assert "test-periodic" not in {thread.name for thread in threading.enumerate()}
+
+    ran.clear()
+    task.start()
+    assert ran.wait(1)
+    task.stop()
@@ -0,0 +1,33 @@
+import pytest
+
+from utils.metrics import Counter, Histogram, _Family
+
+
+def test_family_without_samples_cannot_be_instantiated():
+    class Incomplete(_Family):
+        kind = "untyped"
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "Missing _samples")
+
+
+def test_render_counter_and_histogram():
+    counter = Counter("test_total", "Counted things.", ("route",))
+    counter.inc(("/a",), 2)
+    assert counter.render().splitlines() == [
+        "# HELP test_total Counted things.", "# TYPE test_total counter", 'test_total{route="/a"} 2',
+    ]
+
+    histogram = Histogram("test_seconds", "Timed things.", (), (0.1, 1))
+    histogram.observe((), 0.5)
+    assert histogram.render().splitlines()[2:] == [
+        'test_seconds_bucket{le="0.1"} 0', 'test_seconds_bucket{le="1"} 1', 'test_seconds_bucket{le="+Inf"} 1',
+        "test_seconds_sum 0.5", "test_seconds_count 1",
+    ]
+
+
+def test_metrics_endpoint(client):
+    client.get("/rest/v1/amenity/amenities")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'http_requests_total{method="GET",route="/rest/v1/amenity/amenities",status="200"}' in response.text
@@ -0,0 +1,61 @@
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from database.models import Amenity, Property, PropertyImage
+from database.session import SessionLocal, engine
+from routers.property import _get_property_detail
+
+# BEGIN plus the four queries of _get_property_detail, whatever the number of images or amenities
+DETAIL_STATEMENTS = 5
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _create_property(images: int, amenities: int) -> int:
+    with SessionLocal() as db:
+        prop = Property(
+            owner_id=1, title="Detail test", description="d", price_per_night=100, address="a", city="Goa",
+            country="India", max_guests=2, property_type="apartment", is_available=1,
+        )
+        prop.images = [PropertyImage(image_url=f"https://img/{i}.jpg", is_cover=int(i == 0)) for i in range(images)]
+        prop.amenities = [Amenity(name=f"detail-{uuid.uuid4().hex}") for i in range(amenities)]
+        db.add(prop)
+        db.commit()
+        return prop.property_id
+
+
+@pytest.mark.parametrize("images, amenities", [(1, 1), (6, 8)])
+def test_detail_statement_count_is_fixed(client, images, amenities):
+    property_id = _create_property(images, amenities)
+
+    with SessionLocal() as db, count_statements() as statements:
+        detail = _get_property_detail(db, property_id)
+
+    assert len(detail["images"]) == images
+    assert len(detail["amenities"]) == amenities
+    assert len(statements) == DETAIL_STATEMENTS, statements
+
+
+def test_detail_endpoint_statement_count(client):
+    property_id = _create_property(images=4, amenities=5)
+
+    with count_statements() as statements:
+        response = client.get(f"/rest/v1/property/properties/{property_id}/detail")
+
+    assert response.status_code == 200, response.text
+    assert len(statements) == DETAIL_STATEMENTS, statements
@@ -0,0 +1,79 @@
+import uuid
+
+from services.property_import import RecordParser
+
+HEADER = "title,description,price_per_night,address,city,country,latitude,longitude,max_guests,property_type\n"
+
+
+def _row(i: int, city: str = "Goa") -> str:
+    return f"Flat {i},Nice,80,{i} Main St,{city},India,15.4,73.8,2,apartment\n"
+
+
+def test_parser_reports_offset_of_invalid_utf8():
+    valid = (HEADER + _row(1)).encode()
+    parser = RecordParser("csv")
+    records = list(parser.feed(b"\xef\xbb\xbf" + valid + _row(2, "M\xfcnchen").encode("latin-1")))
+
+    # The complete row before the bad byte is still parsed
+    assert [(row, record["title"]) for row, record, _ in records] == [(1, "Flat 1")]
+    assert parser.error == f"Input is not valid UTF-8 at byte {3 + len(valid) + len('Flat 2,Nice,80,2 Main St,M')}"
+    assert list(parser.close()) == []
+
+
+def test_parser_offset_spans_chunks():
+    parser = RecordParser("ndjson")
+    list(parser.feed(b'{"a": "\xc3'))
+    list(parser.feed(b"("))
+    assert parser.error == "Input is not valid UTF-8 at byte 7"
+
+
+def test_import_of_latin1_csv_fails_with_resume_point(client, admin_headers):
+    body = (HEADER + _row(1) + _row(2)).encode() + _row(3, "M\xfcnchen").encode("latin-1") + _row(4).encode()
+    response = client.post(
+        "/rest/v1/admin/import-properties?format=csv&chunk_size=1", content=body, headers=admin_headers,
+    )
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["completed"] is False
+    assert result["imported"] == 2
+    assert result["last_committed_row"] == 2
+    assert result["failure"].startswith("Input is not valid UTF-8 at byte ")
+
+
+def test_resume_after_failed_chunk(client, admin_headers, group_commit, monkeypatch):
+    from database.models import Property
+    from database.session import SessionLocal
+    from services import geo_index
+
+    city = f"Resume-{uuid.uuid4().hex[:8]}"
+    body = (HEADER + "".join(_row(i, city) for i in range(1, 7))).encode()
+    url = "/rest/v1/admin/import-properties?format=csv&chunk_size=2"
+
+    index_rows = geo_index.index_rows
+    calls = []
+
+    def fail_second_chunk(db, rows):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        index_rows(db, rows)
+
+    monkeypatch.setattr(geo_index, "index_rows", fail_second_chunk)
+    result = client.post(url, content=body, headers=admin_headers).json()
+    assert result["completed"] is False
+    assert (result["imported"], result["last_committed_row"]) == (2, 2)
+    assert result["failure"].startswith("Rows 3-4 were not imported")
+
+    def imported_titles():
+        with SessionLocal() as db:
+            return sorted(title for title, in db.query(Property.title).filter(Property.city == city))
+
+    # The failed chunk rolled back whole, including its property rows
+    assert imported_titles() == ["Flat 1", "Flat 2"]
+
+    monkeypatch.setattr(geo_index, "index_rows", index_rows)
+    result = client.post(f"{url}&start_row={result['last_committed_row'] + 1}", content=body, headers=admin_headers).json()
+    assert result["completed"] is True
+    assert (result["skipped"], result["imported"], result["last_committed_row"]) == (2, 4, 6)
+    assert imported_titles() == [f"Flat {i}" for i in range(1, 7)]
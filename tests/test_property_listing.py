@@ -0,0 +1,93 @@
+import uuid
+
+import pytest
+
+from database.models import Property, PropertyRatingSummary
+from database.session import SessionLocal
+from utils.cache_utils import read_cache
+
+PROPERTIES = "/rest/v1/property/properties"
+
+
+@pytest.fixture
+def rated_city():
+    """A city of five properties: three rated 2.0, 4.5 and 3.0, and two unrated."""
+    city = f"Ratingville-{uuid.uuid4().hex[:8]}"
+    with SessionLocal() as db:
+        ids = []
+        for rating in (2.0, None, 4.5, None, 3.0):
+            prop = Property(
+                owner_id=1, title="Rated", description="d", price_per_night=100, address="a", city=city,
+                country="India", max_guests=2, property_type="apartment", is_available=1,
+            )
+            db.add(prop)
+            db.flush()
+            if rating is not None:
+                db.add(PropertyRatingSummary(
+                    property_id=prop.property_id, review_count=1, rating_sum=int(rating), rating_avg=rating,
+                ))
+            ids.append(prop.property_id)
+        db.commit()
+    return city, ids
+
+
+def _pages(client, city, descending, limit=2):
+    averages, cursor = [], None
+    while True:
+        query = f"{PROPERTIES}?city={city}&sort_by=rating&descending={str(descending).lower()}&limit={limit}"
+        response = client.get(query + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200, response.text
+        body = response.json()
+        averages += [item["rating_average"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return averages
+
+
+@pytest.mark.parametrize("cached", [True, False])
+@pytest.mark.parametrize("descending, expected", [
+    (False, [2.0, 3.0, 4.5, None, None]),
+    (True, [4.5, 3.0, 2.0, None, None]),
+])
+def test_rating_sort_puts_unrated_last(client, rated_city, monkeypatch, cached, descending, expected):
+    monkeypatch.setattr(read_cache, "enabled", cached)
+    city, _ = rated_city
+    assert _pages(client, city, descending) == expected
+
+
+def test_oversized_result_set_is_not_reloaded_after_writes(client, monkeypatch):
+    from routers import property as property_router
+    from services import listing_cache
+
+    monkeypatch.setattr(property_router, "CACHE_LISTING_MAX_IDS", 2)
+    monkeypatch.setattr(listing_cache, "CACHE_LISTING_MAX_IDS", 2)
+    searches = []
+    search_properties = property_router._search_properties
+    monkeypatch.setattr(property_router, "_search_properties", lambda *args: searches.append(args) or search_properties(*args))
+
+    city = f"Bigtown-{uuid.uuid4().hex[:8]}"
+
+    def add_property():
+        with SessionLocal() as db:
+            db.add(Property(
+                owner_id=1, title="Big", description="d", price_per_night=100, address="a", city=city,
+                country="India", max_guests=2, property_type="apartment", is_available=1,
+            ))
+            db.commit()
+
+    def listed():
+        response = client.get(f"{PROPERTIES}?city={city}&limit=50")
+        assert response.status_code == 200, response.text
+        return len(response.json()["items"])
+
+    for _ in range(3):
+        add_property()
+    assert listed() == 3
+    # The capped load, then the SQL page
+    assert len(searches) == 2
+
+    # The write retires the catalog version, but not the oversized mark
+    add_property()
+    searches.clear()
+    assert listed() == 4
+    assert len(searches) == 1
@@ -0,0 +1,69 @@
+import pytest
+
+NEARBY = "/rest/v1/property/properties/nearby"
+
+
+@pytest.mark.parametrize("query", [
+    "near=inf,0&radius_km=3",
+    "near=nan,10&radius_km=3",
+    "near=91,0&radius_km=3",
+    "near=0,-181&radius_km=3",
+    "near=1,2,3&radius_km=3",
+    "bbox=0,0,inf,10",
+    "bbox=-95,0,10,10",
+    "bbox=0,0,10,200",
+])
+def test_nearby_rejects_invalid_coordinates(client, query):
+    response = client.get(f"{NEARBY}?{query}")
+    assert response.status_code == 400, response.text
+
+
+@pytest.mark.parametrize("radius", ["inf", "nan", "-1"])
+def test_nearby_rejects_invalid_radius(client, radius):
+    assert client.get(f"{NEARBY}?near=10,10&radius_km={radius}").status_code == 422
+
+
+def test_nearby_accepts_boundary_coordinates(client):
+    assert client.get(f"{NEARBY}?near=90,180&radius_km=3").status_code == 200
+    assert client.get(f"{NEARBY}?bbox=-90,-180,90,180").status_code == 200
+
+
+def _property_at(lat, lng):
+    from database.models import Property
+    from database.session import SessionLocal
+
+    with SessionLocal() as db:
+        prop = Property(
+            owner_id=1, title="Dateline", description="d", price_per_night=100, address="a", city="Suva",
+            country="Fiji", max_guests=2, property_type="villa", is_available=1, latitude=lat, longitude=lng,
+        )
+        db.add(prop)
+        db.commit()
+        return prop.property_id
+
+
+@pytest.fixture(scope="module")
+def dateline_properties():
+    return {"east": _property_at(-17.5, 179.95), "west": _property_at(-17.5, -179.95), "far": _property_at(-17.5, 175.0)}
+
+
+def _ids(response):
+    assert response.status_code == 200, response.text
+    return {prop["property_id"] for prop in response.json()}
+
+
+def test_nearby_radius_wraps_antimeridian(client, dateline_properties):
+    found = _ids(client.get(f"{NEARBY}?near=-17.5,179.9&radius_km=20"))
+    assert {dateline_properties["east"], dateline_properties["west"]} <= found
+    assert dateline_properties["far"] not in found
+
+
+def test_nearby_bbox_across_antimeridian(client, dateline_properties):
+    found = _ids(client.get(f"{NEARBY}?bbox=-18,179.5,-17,-179.5"))
+    assert {dateline_properties["east"], dateline_properties["west"]} <= found
+    assert dateline_properties["far"] not in found
+
+    # Combined with a radius, only the overlap is searched
+    found = _ids(client.get(f"{NEARBY}?bbox=-18,179.5,-17,-179.5&near=-17.5,-179.9&radius_km=10"))
+    assert dateline_properties["west"] in found
+    assert dateline_properties["east"] not in found
@@ -0,0 +1,14 @@
+from sqlalchemy import create_engine
+
+from scripts.check_query_plans import run_checks
+
+
+def test_hot_paths_use_indexes(tmp_path, capsys):
+    # A fresh engine: connections that prepared statements before the indexes existed keep their old plans
+    engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+    try:
+        failed = run_checks(engine)
+    finally:
+        engine.dispose()
+
+    assert failed == 0, capsys.readouterr().out
@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+from sqlalchemy import create_engine, func
+
+from database import replicas as replicas_module
+from database.models import Property
+from database.replicas import ReplicaSession, ReplicaSet, _replica_options, read_session
+from database.session import SessionLocal
+
+
+def test_replica_url_sets_its_own_pool():
+    url, options = _replica_options("sqlite:////tmp/replica.db?pool_size=3&max_overflow=1")
+    assert url == "sqlite:////tmp/replica.db"
+    assert (options["pool_size"], options["max_overflow"]) == (3, 1)
+
+    _, options = _replica_options("sqlite:////tmp/replica.db")
+    assert (options["pool_size"], options["max_overflow"]) == (10, 15)
+
+
+def test_failing_replica_read_falls_back_to_primary(monkeypatch):
+    # An empty database connects fine but fails every query, like a broken replica
+    empty = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'replica.db')}")
+    replica_set = ReplicaSet([empty], retry_seconds=30)
+    monkeypatch.setattr(replicas_module, "replicas", replica_set)
+    with SessionLocal() as db:
+        expected = db.query(func.count(Property.property_id)).scalar()
+
+    with read_session() as db:
+        assert isinstance(db, ReplicaSession)
+        assert db.query(func.count(Property.property_id)).scalar() == expected
+
+    assert replica_set.status()[0]["healthy"] is False
+    with read_session() as db:
+        assert not isinstance(db, ReplicaSession)
+
+
+def test_replica_status_lists_sync_and_async_replicas(client, admin_headers):
+    response = client.get("/rest/v1/admin/replica-status", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json() == {"replicas": [], "async_replicas": []}
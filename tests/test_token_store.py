@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.auth_utils import token_digest
+from utils.token_store import MemoryTokenStore, SqlTokenStore, TokenStore
+
+
+def test_incomplete_backend_fails_on_instantiation():
+    class LookupOnly(TokenStore):
+        def lookup(self, db, digest):
+            return None
+
+    with pytest.raises(TypeError):
+        LookupOnly()
+
+
+def test_backends_are_complete():
+    SqlTokenStore()
+    MemoryTokenStore()
+
+
+def test_memory_store_round_trip():
+    store = MemoryTokenStore()
+    expires_at = datetime.utcnow() + timedelta(minutes=5)
+    store.replace_user_tokens(None, 7, [("access", "token-a", expires_at), ("refresh", "token-b", expires_at)])
+
+    assert store.lookup(None, token_digest("token-a")) == 7
+    assert store.revoke_user(None, 7) == 2
+    assert store.lookup(None, token_digest("token-a")) is None
@@ -0,0 +1,70 @@
+"""Request writes run as write units, both on the request session and on the
+group-commit writer thread."""
+from database.models import Property
+from database.session import SessionLocal
+
+
+def _property(owner_id):
+    with SessionLocal() as db:
+        prop = Property(
+            owner_id=owner_id, title="Images", description="d", price_per_night=100, address="a", city="Goa",
+            country="India", max_guests=2, property_type="apartment", is_available=1,
+        )
+        db.add(prop)
+        db.commit()
+        return prop.property_id
+
+
+def test_profile_writes(client, signup, admin_headers, group_commit):
+    user_id, headers = signup()
+    profile_url = f"/rest/v1/user/{user_id}/profile"
+
+    # Signup creates an empty profile
+    assert client.post(profile_url, headers=headers, json={"full_name": "Ada"}).status_code == 400
+    updated = client.put(profile_url, headers=headers, json={"full_name": "Ada"})
+    assert updated.status_code == 200
+    assert client.get(profile_url).json()["full_name"] == "Ada"
+
+    assert client.delete(profile_url, headers=admin_headers).status_code == 200
+    assert client.get(profile_url).status_code == 404
+    assert client.delete(profile_url, headers=admin_headers).status_code == 404
+    assert client.post(profile_url, headers=headers, json={"bio": "again"}).status_code == 200
+    assert client.get(profile_url).json()["bio"] == "again"
+
+
+def test_image_writes(client, signup, group_commit):
+    owner_id, headers = signup()
+    property_id = _property(owner_id)
+    images_url = f"/rest/v1/property-image/properties/{property_id}/images"
+
+    added = client.post(images_url, headers=headers, json={"image_url": "https://example.com/a.jpg"})
+    assert added.status_code == 200, added.text
+    image_id = added.json()["image_id"]
+
+    updated = client.put(f"/rest/v1/property-image/properties/images/{image_id}", headers=headers,
+                         json={"image_url": "https://example.com/b.jpg", "is_cover": 1})
+    assert updated.json()["is_cover"] == 1
+    assert [image["image_url"] for image in client.get(images_url).json()] == ["https://example.com/b.jpg"]
+
+    _, stranger = signup()
+    denied = client.delete(f"/rest/v1/property-image/properties/images/{image_id}", headers=stranger)
+    assert denied.status_code == 403
+    assert client.delete(f"/rest/v1/property-image/properties/images/{image_id}", headers=headers).status_code == 200
+    assert client.get(images_url).json() == []
+
+
+def test_admin_user_writes(client, signup, admin_headers, group_commit):
+    user_id, headers = signup()
+
+    promoted = client.put(f"/rest/v1/admin/update-user-role/{user_id}", headers=admin_headers, json={"is_staff": 1})
+    assert promoted.json()["is_staff"] == 1
+    assert client.get("/rest/v1/user/me", headers=headers).json()["is_staff"] == 1
+
+    assert client.delete(f"/rest/v1/admin/delete-user/{user_id}", headers=admin_headers).status_code == 200
+    assert client.delete(f"/rest/v1/admin/delete-user/{user_id}", headers=admin_headers).status_code == 404
+
+
+def test_logout(client, signup, group_commit):
+    _, headers = signup()
+    assert client.post("/rest/v1/auth/logout/", headers=headers).status_code == 200
+    assert client.get("/rest/v1/user/me", headers=headers).status_code == 401
@@ -1,3 +1,8 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
 # from jose import JWTError, jwt
@@ -5,9 +10,18 @@ import jwt
 from jwt.exceptions import InvalidTokenError
 from typing import Optional
 from core.config import SECRET_KEY, ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, REFRESH_TOKEN_EXPIRE_DAYS
+from core.config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT
+from custom_exception.my_exceptions import ServiceBusy
+
+logger = logging.getLogger(__name__)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is CPU bound; it runs on its own small pool so it neither blocks the
+# event loop nor starves the threadpool that serves sync endpoints.
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT)
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -16,6 +30,41 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def _run_hashing(fn, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise ServiceBusy("Too many password operations in progress, try again later")
+    try:
+        future = _hash_executor.submit(fn, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the bounded hashing pool.
+
+    Raises:
+        ServiceBusy: When the pool's queue limit is reached
+    """
+    return await _run_hashing(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bounded hashing pool.
+
+    Raises:
+        ServiceBusy: When the pool's queue limit is reached
+    """
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+def token_digest(token: str) -> str:
+    """Return a fixed-length SHA-256 hex digest of a raw token."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token.
     
@@ -32,6 +81,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         "exp": expire,
         "token_type": "access"
     })
+    # Fractional seconds, so a revocation cutoff never catches tokens issued right after it
+    to_encode.setdefault("iat", datetime.now(timezone.utc).timestamp())
 
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -45,26 +96,23 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None)
     Returns:
         str: Encoded JWT token
     """
-    print("Starting create_refresh_token with data:", data)
     to_encode = data.copy()
-    print("Data copied successfully")
-    
+
     try:
         expire = datetime.now(timezone.utc) + (expires_delta if expires_delta 
                                              else timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
-        print("Expiration calculated:", expire)
-        
         to_encode.update({
             "exp": expire,
             "token_type": "refresh"
         })
-        print("Payload updated:", to_encode)
-        
+        to_encode.setdefault("iat", datetime.now(timezone.utc).timestamp())
+
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-        print("Token encoded successfully")
+        logger.debug("Issued refresh token for user %s, expires %s", data.get("user_id"), expire)
         return encoded_jwt
-    except Exception as e:
-        print("Error occurred:", str(e))
+    except Exception:
+        # Never log the payload: it carries the claims of a live token
+        logger.exception("Failed to encode refresh token for user %s", data.get("user_id"))
         raise
 
 def verify_token(token: str, verify_type: Optional[str] = None) -> Optional[dict]:
@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from core.config import CACHE_ENABLED, CACHE_MAX_BYTES, CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS
+from database.events import run_after_commit
+
+MISSING = object()
+
+
+def estimate_size(value) -> int:
+    """Rough in-memory footprint of a cached value, in bytes."""
+    return len(repr(value))
+
+
+class ReadCache:
+    """Read-through LRU cache with TTL and a byte budget.
+
+    Keys embed a version per ``(namespace, entity_id)``. Writers bump that
+    version once their transaction commits, so entries written under an older
+    version are never read again and simply age out. Readers must build the
+    key *before* querying the database: a result read concurrently with a
+    write then lands under the old version.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: int = 300, enabled: bool = True):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: "OrderedDict[tuple, Tuple[object, float, int]]" = OrderedDict()
+        self._versions: Dict[Tuple[str, Optional[Hashable]], int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def version(self, namespace: str, entity_id: Optional[Hashable] = None) -> int:
+        return self._versions.get((namespace, entity_id), 0)
+
+    def key(self, namespace: str, entity_id: Optional[Hashable] = None, *params) -> tuple:
+        return (namespace, entity_id, self.version(namespace, entity_id)) + params
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return MISSING
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: tuple, value) -> None:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def cached(self, key: tuple, load):
+        """Return the cached value for ``key`` or store ``load()``."""
+        if not self.enabled:
+            return load()
+        value = self.get(key)
+        if value is MISSING:
+            value = load()
+            self.set(key, value)
+        return value
+
+    async def cached_async(self, key: tuple, load):
+        """Like `cached`, for a ``load`` returning an awaitable."""
+        if not self.enabled:
+            return await load()
+        value = self.get(key)
+        if value is MISSING:
+            value = await load()
+            self.set(key, value)
+        return value
+
+    def bump(self, namespace: str, entity_id: Optional[Hashable] = None) -> None:
+        with self._lock:
+            version_key = (namespace, entity_id)
+            self._versions[version_key] = self._versions.get(version_key, 0) + 1
+
+    def invalidate_after_commit(self, db: Session, namespace: str, entity_id: Optional[Hashable] = None) -> None:
+        """Bump the version once ``db``'s transaction commits."""
+        run_after_commit(db, self.bump, namespace, entity_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _remove(self, key: tuple) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+read_cache = ReadCache(
+    max_entries=CACHE_MAX_ENTRIES,
+    max_bytes=CACHE_MAX_BYTES,
+    ttl_seconds=CACHE_TTL_SECONDS,
+    enabled=CACHE_ENABLED,
+)
@@ -0,0 +1,85 @@
+import math
+from typing import List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+# Grid cells are CELL_DEGREES wide on both axes (~11 km at the equator)
+CELL_DEGREES = 0.1
+_LAT_CELLS = int(round(180 / CELL_DEGREES))
+_LNG_CELLS = int(round(360 / CELL_DEGREES))
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _lat_index(lat: float) -> int:
+    return min(int((lat + 90) // CELL_DEGREES), _LAT_CELLS - 1)
+
+
+def _lng_index(lng: float) -> int:
+    return min(int((lng + 180) // CELL_DEGREES), _LNG_CELLS - 1)
+
+
+def cell_for(lat: float, lng: float) -> int:
+    """Integer grid cell id containing the point."""
+    return _lat_index(lat) * _LNG_CELLS + _lng_index(lng)
+
+
+def bbox_around(lat: float, lng: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """Bounding box ``(min_lat, min_lng, max_lat, max_lng)`` enclosing a circle.
+
+    Longitudes wrap: a box crossing the antimeridian has ``min_lng > max_lng``.
+    """
+    d_lat = radius_km / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(lat))
+    d_lng = 180.0 if cos_lat < 1e-6 else radius_km / (KM_PER_DEGREE * cos_lat)
+    if d_lng >= 180.0:
+        min_lng, max_lng = -180.0, 180.0
+    else:
+        min_lng, max_lng = lng - d_lng, lng + d_lng
+        if min_lng < -180.0:
+            min_lng += 360.0
+        elif max_lng > 180.0:
+            max_lng -= 360.0
+    return max(-90.0, lat - d_lat), min_lng, min(90.0, lat + d_lat), max_lng
+
+
+def lng_ranges(min_lng: float, max_lng: float) -> List[Tuple[float, float]]:
+    """Split a longitude span into non-wrapping ``(min, max)`` ranges.
+
+    ``min_lng > max_lng`` means the span crosses the antimeridian.
+    """
+    if min_lng <= max_lng:
+        return [(min_lng, max_lng)]
+    return [(min_lng, 180.0), (-180.0, max_lng)]
+
+
+def intersect_lng_ranges(a: List[Tuple[float, float]], b: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    ranges = []
+    for a_min, a_max in a:
+        for b_min, b_max in b:
+            lo, hi = max(a_min, b_min), min(a_max, b_max)
+            if lo <= hi:
+                ranges.append((lo, hi))
+    return ranges
+
+
+def wrap_lng(lng: float) -> float:
+    """Longitude normalised to ``[-180, 180)``."""
+    return (lng + 180.0) % 360.0 - 180.0
+
+
+def cells_for_bbox(min_lat: float, min_lng: float, max_lat: float, max_lng: float, max_cells: int) -> Optional[List[int]]:
+    """Grid cells covering a bounding box, or None when more than ``max_cells`` are needed."""
+    lat_range = range(_lat_index(min_lat), _lat_index(max_lat) + 1)
+    lng_range = range(_lng_index(min_lng), _lng_index(max_lng) + 1)
+    if len(lat_range) * len(lng_range) > max_cells:
+        return None
+    return [lat_idx * _LNG_CELLS + lng_idx for lat_idx in lat_range for lng_idx in lng_range]
@@ -0,0 +1,283 @@
+"""Request and database metrics in Prometheus text format.
+
+`MetricsMiddleware` times every HTTP request and labels it with the route
+template (``/rest/v1/property/properties/{property_id}``), never the raw path,
+so label cardinality stays bounded. `instrument_engine` hooks the cursor
+events of an engine; statements run while a request is in flight are charged
+to it through a context variable, which `run_in_threadpool` and the write
+queue carry into their threads.
+
+Every update is a dict lookup and a few additions under a lock, cheap enough
+to leave on in production.
+"""
+import threading
+from abc import ABC, abstractmethod
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+from core.config import METRICS_LATENCY_BUCKETS
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_ROUTE = "<unmatched>"
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+ROW_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000)
+DB_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Family(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+    @abstractmethod
+    def _samples(self):
+        """Yield the exposition lines of every labelled series."""
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, labels: Tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in sorted(values):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, labels: Tuple, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def _samples(self):
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(series):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._families = []
+
+    def register(self, family: _Family) -> _Family:
+        self._families.append(family)
+        return family
+
+    def render(self) -> str:
+        return "\n".join(family.render() for family in self._families) + "\n"
+
+
+registry = Registry()
+
+requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status"),
+))
+request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency, until the response body is sent.",
+    ("method", "route"), METRICS_LATENCY_BUCKETS,
+))
+requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.",
+))
+request_queries = registry.register(Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request.", ("method", "route"), QUERY_BUCKETS,
+))
+request_db_time = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per HTTP request.", ("method", "route"), DB_TIME_BUCKETS,
+))
+request_rows = registry.register(Histogram(
+    "http_request_db_rows", "Rows fetched from SQL results per HTTP request.", ("method", "route"), ROW_BUCKETS,
+))
+db_queries_total = registry.register(Counter(
+    "db_queries_total", "SQL statements executed, including those outside requests.",
+))
+db_query_seconds_total = registry.register(Counter(
+    "db_query_seconds_total", "Time spent executing SQL statements, including those outside requests.",
+))
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "rows")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Database accounting of the request being served, or None outside requests."""
+    return _request_stats.get()
+
+
+class _RowCountingCursor:
+    """DBAPI cursor proxy that counts the rows SQLAlchemy fetches from it."""
+
+    __slots__ = ("_cursor", "_stats")
+
+    def __init__(self, cursor, stats: RequestStats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    db_queries_total.inc()
+    db_query_seconds_total.inc(amount=elapsed)
+
+    stats = _request_stats.get()
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.db_seconds += elapsed
+    # The result reads rows from context.cursor, which is set up after this hook
+    if context.cursor is cursor and cursor.description is not None:
+        context.cursor = _RowCountingCursor(cursor, stats)
+
+
+def instrument_engine(sync_engine) -> None:
+    """Count and time every statement of ``sync_engine`` (an AsyncEngine's ``.sync_engine``)."""
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_label(scope) -> str:
+    """Route template of a request scope, once the router has matched it."""
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE) if route is not None else UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed responses are timed to their last chunk."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            requests_in_flight.dec()
+            _request_stats.reset(token)
+            # The router fills in scope["route"] while dispatching
+            labels = (scope["method"], route_label(scope))
+            requests_total.inc((*labels, str(status)))
+            request_duration.observe(labels, elapsed)
+            request_queries.observe(labels, stats.queries)
+            request_db_time.observe(labels, stats.db_seconds)
+            request_rows.observe(labels, stats.rows)
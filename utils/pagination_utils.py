@@ -0,0 +1,46 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException
+
+
+def encode_cursor(sort_key: str, sort_value: Any, last_id: int) -> str:
+    """Encode the position after ``(sort_value, last_id)`` as an opaque token.
+
+    Args:
+        sort_key: Identifies the ordering the cursor belongs to, e.g. ``price:asc``
+        sort_value: Sort column value of the last row on the page
+        last_id: Primary key of the last row on the page
+    Returns:
+        str: URL-safe cursor token
+    """
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_key, sort_value, last_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], sort_key: str, is_datetime: bool = False) -> Optional[Tuple[Any, int]]:
+    """Decode a cursor produced by ``encode_cursor`` for the same ordering.
+
+    Raises:
+        HTTPException: 400 when the cursor is malformed or was issued for a
+            different ordering.
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_key, sort_value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+        if is_datetime and sort_value is not None:
+            sort_value = datetime.fromisoformat(sort_value)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if cursor_key != sort_key or not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+
+    return sort_value, last_id
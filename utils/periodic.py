@@ -0,0 +1,45 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Run ``fn()`` every ``interval_seconds`` on a daemon thread.
+
+    A failing run is logged and retried on the next tick. An interval of 0 or
+    less disables the task.
+    """
+
+    def __init__(self, name: str, interval_seconds: float, fn):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.fn = fn
+        self.runs = 0
+        self.failures = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval_seconds <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the thread and wait for a run in progress; the task can be started again."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self._stop.clear()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.fn()
+                self.runs += 1
+            except Exception:
+                self.failures += 1
+                logger.exception("Periodic task %s failed", self.name)
@@ -0,0 +1,234 @@
+"""Opt-in slow query log and N+1 detector.
+
+`instrument_engine` times every statement. One slower than
+``QUERY_PROFILER_SLOW_QUERY_MS`` is logged with its statement template, the
+shape of its parameters (types only, never values), its duration and the
+route of the request that ran it. `QueryProfilerMiddleware` counts templates
+per request; when one runs more than ``QUERY_PROFILER_REPEAT_THRESHOLD``
+times the request is logged as an N+1 suspect.
+
+Events go as JSON lines to a rotating file and are aggregated in `offenders`
+for GET /rest/v1/admin/query-profile.
+"""
+import json
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Optional
+
+from sqlalchemy import event
+
+from core.config import (
+    QUERY_PROFILER_LOG_BACKUP_COUNT, QUERY_PROFILER_LOG_FILE, QUERY_PROFILER_LOG_MAX_BYTES,
+    QUERY_PROFILER_MAX_OFFENDERS, QUERY_PROFILER_REPEAT_THRESHOLD, QUERY_PROFILER_SLOW_QUERY_MS,
+)
+from utils.metrics import route_label
+
+BACKGROUND = "<background>"
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+# Expanding IN parameters render one placeholder per value
+_IN_LIST = re.compile(
+    r"\bIN\s*\(\s*(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+|\$\d+))*\s*\)",
+    re.IGNORECASE,
+)
+_VALUES_ROWS = re.compile(r"(VALUES\s*\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def statement_template(statement: str) -> str:
+    """Statement with literals and placeholder lists collapsed, so repeats of one query share a template."""
+    template = _WHITESPACE.sub(" ", statement).strip()
+    template = _STRING.sub("?", template)
+    template = _NUMBER.sub("?", template)
+    template = _IN_LIST.sub("IN (?...)", template)
+    return _VALUES_ROWS.sub(r"\1, ...", template)
+
+
+def _value_shape(params) -> str:
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in params.items()) + "}"
+    if isinstance(params, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in params) + ")"
+    return type(params).__name__
+
+
+def parameter_shape(parameters, executemany: bool) -> str:
+    """Types of the bound parameters, e.g. ``(int, str)`` or ``12 x (int, int)``."""
+    if executemany:
+        rows = list(parameters or ())
+        return f"{len(rows)} x {_value_shape(rows[0])}" if rows else "0 x ()"
+    return _value_shape(parameters or ())
+
+
+def _json_logger() -> logging.Logger:
+    logger = logging.getLogger("query_profiler")
+    logger.setLevel(logging.INFO)
+    # Structured lines only; keep them out of the application log
+    logger.propagate = False
+    return logger
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps({
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            **record.event,
+        }, default=str)
+
+
+logger = _json_logger()
+
+
+def _log(event_fields: dict) -> None:
+    logger.info(event_fields["event"], extra={"event": event_fields})
+
+
+class OffenderStats:
+    """Slow statements and N+1 suspects aggregated per ``(kind, route, template)``."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: Dict[tuple, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, route: str, template: str, duration_ms: float, executions: int = 1,
+               parameters: Optional[str] = None) -> None:
+        key = (kind, route, template)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    # Make room by dropping the offender that has cost the least so far
+                    del self._entries[min(self._entries, key=lambda k: self._entries[k]["total_ms"])]
+                entry = self._entries[key] = {
+                    "kind": kind, "route": route, "template": template,
+                    "count": 0, "total_ms": 0.0, "max_ms": 0.0, "max_executions": 0,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["max_executions"] = max(entry["max_executions"], executions)
+            entry["last_seen"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            if parameters is not None:
+                entry["parameters"] = parameters
+
+    def top(self, kind: str, limit: int, sort_by: str = "total_ms") -> list:
+        with self._lock:
+            entries = [dict(entry) for entry in self._entries.values() if entry["kind"] == kind]
+        entries.sort(key=lambda entry: entry[sort_by], reverse=True)
+        for entry in entries:
+            entry["total_ms"] = round(entry["total_ms"], 3)
+            entry["max_ms"] = round(entry["max_ms"], 3)
+        return entries[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+offenders = OffenderStats(QUERY_PROFILER_MAX_OFFENDERS)
+enabled = False
+
+
+class RequestProfile:
+    __slots__ = ("scope", "templates", "lock")
+
+    def __init__(self, scope):
+        self.scope = scope
+        # template -> [executions, total ms]
+        self.templates: Dict[str, list] = {}
+        self.lock = threading.Lock()
+
+
+_request_profile: ContextVar[Optional[RequestProfile]] = ContextVar("query_profile", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._profiler_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_profiler_started", None)
+    if started is None:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    template = statement_template(statement)
+    profile = _request_profile.get()
+
+    if profile is not None:
+        with profile.lock:
+            counts = profile.templates.get(template)
+            if counts is None:
+                counts = profile.templates[template] = [0, 0.0]
+            counts[0] += 1
+            counts[1] += duration_ms
+
+    if duration_ms >= QUERY_PROFILER_SLOW_QUERY_MS:
+        route = route_label(profile.scope) if profile is not None else BACKGROUND
+        method = profile.scope["method"] if profile is not None else None
+        shape = parameter_shape(parameters, executemany)
+        offenders.record("slow_query", route, template, duration_ms, parameters=shape)
+        _log({
+            "event": "slow_query", "method": method, "route": route, "duration_ms": round(duration_ms, 3),
+            "statement": template, "parameters": shape,
+        })
+
+
+def _check_repeats(profile: RequestProfile) -> None:
+    route = route_label(profile.scope)
+    for template, (executions, total_ms) in profile.templates.items():
+        if executions > QUERY_PROFILER_REPEAT_THRESHOLD:
+            offenders.record("n_plus_one", route, template, total_ms, executions=executions)
+            _log({
+                "event": "n_plus_one", "method": profile.scope["method"], "route": route,
+                "executions": executions, "total_ms": round(total_ms, 3), "statement": template,
+            })
+
+
+def instrument_engine(sync_engine) -> None:
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def enable(log_file: str = QUERY_PROFILER_LOG_FILE) -> None:
+    """Attach the rotating JSON log. Engines are instrumented separately."""
+    global enabled
+    if enabled:
+        return
+    handler = RotatingFileHandler(
+        log_file, maxBytes=QUERY_PROFILER_LOG_MAX_BYTES, backupCount=QUERY_PROFILER_LOG_BACKUP_COUNT,
+    )
+    handler.setFormatter(_JsonFormatter())
+    logger.addHandler(handler)
+    enabled = True
+
+
+class QueryProfilerMiddleware:
+    """Collects the statement templates of each request and flags repeated ones once it ends."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope)
+        token = _request_profile.set(profile)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_profile.reset(token)
+            _check_repeats(profile)
@@ -0,0 +1,278 @@
+"""On-demand sampling profiler for single requests.
+
+An admin sends ``X-Profile: 1`` with a request. `RequestProfilerMiddleware`
+checks the bearer token through `jwt_authorization`, then a sampler thread
+takes the stacks of every thread working on that request every
+``PROFILING_INTERVAL_MS``. That means the event loop thread while the
+request's task is the one running, and any worker or writer thread running
+inside a copy of the request's context (run_in_threadpool and the write
+queue both copy it). Samples where no thread works on the request are
+counted as ``<waiting>``, so the sample count tracks wall time; so is work
+handed to an executor that does not copy the context, such as password
+hashing.
+
+The stacks are stored in collapsed format (``frame;frame;frame count``,
+readable by flamegraph.pl and speedscope) next to a JSON summary, and the
+response carries an ``X-Profile-Id`` header to download them from
+/rest/v1/admin/profiles. Requests without the header only pay for the
+header lookup.
+"""
+import asyncio
+import contextvars
+import dis
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import List, Optional
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+from core.config import PROFILING_DIRECTORY, PROFILING_INTERVAL_MS, PROFILING_MAX_SECONDS, PROFILING_MAX_STORED
+from database.session import SessionLocal
+from decorator.jwt_decorator import jwt_authorization
+from utils.metrics import route_label
+
+HEADER = b"x-profile"
+ID_HEADER = b"x-profile-id"
+WAITING = "<waiting>"
+_ON_VALUES = {b"1", b"true", b"yes"}
+
+_session: contextvars.ContextVar[Optional["_Sampler"]] = contextvars.ContextVar("profile_session", default=None)
+
+
+@lru_cache(maxsize=None)
+def _context_run_lines(code) -> frozenset:
+    """Lines of ``code`` that call ``context.run(...)``, as thread pools do for each call they run."""
+    lines = set()
+    previous = None
+    for instruction in dis.get_instructions(code):
+        if (previous is not None and previous.opname == "LOAD_FAST" and previous.argval == "context"
+                and instruction.argval == "run"):
+            lines.add(instruction.positions.lineno)
+        previous = instruction
+    return frozenset(lines)
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, loop, task, interval: float, max_seconds: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.loop = loop
+        self.task = task
+        self.loop_thread = threading.get_ident()
+        self.interval = interval
+        self.deadline = time.monotonic() + max_seconds
+        self.stacks = Counter()
+        self.samples = 0
+        self.truncated = False
+        self._labels = {}
+        self._halt = threading.Event()
+
+    def run(self) -> None:
+        while not self._halt.wait(self.interval):
+            if time.monotonic() > self.deadline:
+                self.truncated = True
+                return
+            self._sample()
+
+    def stop(self) -> None:
+        self._halt.set()
+        self.join()
+
+    def _sample(self) -> None:
+        frames = sys._current_frames()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        busy = False
+        for ident, frame in frames.items():
+            if ident == self.ident:
+                continue
+            if ident == self.loop_thread:
+                if asyncio.current_task(self.loop) is not self.task:
+                    continue
+            elif not self._in_request_context(frame):
+                continue
+            self.stacks[self._collapse(names.get(ident, str(ident)), frame)] += 1
+            busy = True
+        if not busy:
+            self.stacks[WAITING] += 1
+        self.samples += 1
+
+    def _in_request_context(self, frame) -> bool:
+        # The context local outlives the call, so only a frame that is inside context.run() counts
+        while frame is not None:
+            if frame.f_lineno in _context_run_lines(frame.f_code):
+                context = frame.f_locals.get("context")
+                if isinstance(context, contextvars.Context) and context.get(_session) is self:
+                    return True
+            frame = frame.f_back
+        return False
+
+    def _label(self, frame) -> str:
+        code = frame.f_code
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}".replace(";", ",")
+        return label
+
+    def _collapse(self, thread_name: str, frame) -> str:
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame))
+            frame = frame.f_back
+        labels.append(thread_name.replace(";", ","))
+        return ";".join(reversed(labels))
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Profiles on disk as ``<id>.collapsed`` plus a ``<id>.json`` summary, newest ``max_stored`` kept."""
+
+    def __init__(self, directory: str, max_stored: int):
+        self.directory = directory
+        self.max_stored = max_stored
+        self._lock = threading.Lock()
+
+    def _path(self, profile_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.{suffix}")
+
+    def save(self, summary: dict, collapsed: str) -> None:
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(summary["id"], "collapsed"), "w") as f:
+                f.write(collapsed)
+            with open(self._path(summary["id"], "json"), "w") as f:
+                json.dump(summary, f)
+            for stale in self.list()[self.max_stored:]:
+                self.delete(stale["id"])
+
+    def list(self) -> List[dict]:
+        """Summaries, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        summaries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(self.directory, name)) as f:
+                        summaries.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return sorted(summaries, key=lambda summary: summary["created_at"], reverse=True)
+
+    def collapsed_path(self, profile_id: str) -> Optional[str]:
+        path = self._path(profile_id, "collapsed")
+        return path if os.path.isfile(path) else None
+
+    def delete(self, profile_id: str) -> bool:
+        found = False
+        for suffix in ("collapsed", "json"):
+            try:
+                os.remove(self._path(profile_id, suffix))
+                found = True
+            except FileNotFoundError:
+                pass
+        return found
+
+
+profile_store = ProfileStore(PROFILING_DIRECTORY, PROFILING_MAX_STORED)
+# One profile at a time: each sample walks every thread's stack
+_active = threading.Lock()
+
+
+def _authorize(authorization: Optional[str]) -> dict:
+    with SessionLocal() as db:
+        return jwt_authorization(authorization, db)
+
+
+class RequestProfilerMiddleware:
+    def __init__(self, app, interval_ms: float = PROFILING_INTERVAL_MS, max_seconds: float = PROFILING_MAX_SECONDS):
+        self.app = app
+        self.interval = interval_ms / 1000
+        self.max_seconds = max_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = authorization = None
+        for name, value in scope["headers"]:
+            if name == HEADER:
+                requested = value
+            elif name == b"authorization":
+                authorization = value
+        if requested is None or requested.strip().lower() not in _ON_VALUES:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            principal = await run_in_threadpool(_authorize, authorization and authorization.decode("latin-1"))
+            if not principal.get("is_admin"):
+                raise HTTPException(status_code=403, detail="Permission denied")
+        except HTTPException as e:
+            await JSONResponse({"detail": e.detail}, status_code=e.status_code)(scope, receive, send)
+            return
+
+        if not _active.acquire(blocking=False):
+            await JSONResponse(
+                {"detail": "Another request is being profiled, try again later"}, status_code=503,
+            )(scope, receive, send)
+            return
+        try:
+            await self._profile(scope, receive, send, principal)
+        finally:
+            _active.release()
+
+    async def _profile(self, scope, receive, send, principal):
+        profile_id = uuid.uuid4().hex
+        sampler = _Sampler(asyncio.get_running_loop(), asyncio.current_task(), self.interval, self.max_seconds)
+        status = 500
+        saved = False
+        started = time.perf_counter()
+
+        def finish():
+            nonlocal saved
+            sampler.stop()
+            saved = True
+            profile_store.save({
+                "id": profile_id,
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route_label(scope),
+                "status": status,
+                "user_id": principal.get("user_id"),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                "interval_ms": self.interval * 1000,
+                "samples": sampler.samples,
+                "waiting_samples": sampler.stacks.get(WAITING, 0),
+                "truncated": sampler.truncated,
+            }, sampler.collapsed())
+
+        async def send_with_profile(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (ID_HEADER, profile_id.encode())]}
+            elif message["type"] == "http.response.body" and not message.get("more_body") and not saved:
+                # Stored before the last chunk goes out, so the id is downloadable once the client has it
+                finish()
+            await send(message)
+
+        token = _session.set(sampler)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            _session.reset(token)
+            if not saved:
+                finish()
@@ -0,0 +1,128 @@
+"""Token revocation for stateless JWT verification.
+
+Revoking a user records a cutoff: every token of that user with an ``iat``
+claim before it is rejected. One entry per user covers logout, login
+(which replaces earlier sessions), role changes and deletion, and each entry
+is kept only until the longest-lived token issued before it has expired.
+
+Cutoffs are persisted in `token_revocations` and mirrored in
+`revocation_filter`, which `jwt_authorization` checks without touching the
+database. Every process rebuilds the filter at startup and reloads it every
+``JWT_REVOCATION_REFRESH_SECONDS`` to pick up revocations made elsewhere.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from core.config import ACCESS_TOKEN_EXPIRE_MINUTES, JWT_REVOCATION_REFRESH_SECONDS, REFRESH_TOKEN_EXPIRE_DAYS
+from database.events import run_after_commit
+from database.models import TokenRevocation
+from database.session import SessionLocal
+from database.write_queue import run_write
+from utils.periodic import PeriodicTask
+from utils.token_cache import token_cache
+
+# No token issued before a cutoff outlives it by more than this
+MAX_TOKEN_LIFETIME = max(
+    timedelta(minutes=int(ACCESS_TOKEN_EXPIRE_MINUTES)),
+    timedelta(days=int(REFRESH_TOKEN_EXPIRE_DAYS)),
+)
+
+
+class RevocationFilter:
+    """Per-user revocation cutoffs, as ``user_id -> (revoked_before, expires_at)`` unix times."""
+
+    def __init__(self):
+        self._cutoffs: Dict[int, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def is_revoked(self, user_id: int, issued_at: Optional[float]) -> bool:
+        entry = self._cutoffs.get(user_id)
+        if entry is None:
+            return False
+        # Tokens from before iat was issued cannot be placed relative to the cutoff
+        return issued_at is None or issued_at < entry[0]
+
+    def add(self, user_id: int, revoked_before: float, expires_at: float) -> None:
+        with self._lock:
+            current = self._cutoffs.get(user_id)
+            if current is None or current[0] < revoked_before:
+                self._cutoffs[user_id] = (revoked_before, expires_at)
+
+    def replace(self, entries: Iterable[Tuple[int, float, float]]) -> Set[int]:
+        """Swap in a fresh set of cutoffs. Returns the users whose cutoff changed."""
+        cutoffs = {user_id: (revoked_before, expires_at) for user_id, revoked_before, expires_at in entries}
+        with self._lock:
+            changed = set()
+            for user_id, entry in cutoffs.items():
+                previous = self._cutoffs.get(user_id)
+                if previous is None or previous[0] != entry[0]:
+                    changed.add(user_id)
+            # Keep local cutoffs that committed after the reload read its rows
+            for user_id, entry in self._cutoffs.items():
+                if user_id not in cutoffs or cutoffs[user_id][0] < entry[0]:
+                    if entry[1] > time.time():
+                        cutoffs[user_id] = entry
+            self._cutoffs = cutoffs
+        return changed
+
+    def stats(self) -> dict:
+        return {"users": len(self._cutoffs)}
+
+
+revocation_filter = RevocationFilter()
+
+
+def revoke_user_tokens(db: Session, user_id: int, revoked_before: Optional[float] = None) -> None:
+    """Revoke the user's tokens issued before ``revoked_before`` (default: now).
+
+    Runs inside the caller's transaction; the in-memory filter is updated once
+    it commits.
+    """
+    if revoked_before is None:
+        revoked_before = time.time()
+    expires_at = datetime.utcfromtimestamp(revoked_before) + MAX_TOKEN_LIFETIME
+
+    row = db.get(TokenRevocation, user_id)
+    if row is None:
+        db.add(TokenRevocation(user_id=user_id, revoked_before=revoked_before, expires_at=expires_at))
+    elif row.revoked_before < revoked_before:
+        row.revoked_before = revoked_before
+        row.expires_at = expires_at
+    db.flush()
+
+    run_after_commit(
+        db, revocation_filter.add, user_id, revoked_before, revoked_before + MAX_TOKEN_LIFETIME.total_seconds()
+    )
+
+
+def _purge_expired(db: Session, now: datetime) -> int:
+    return db.execute(delete(TokenRevocation).where(TokenRevocation.expires_at <= now)).rowcount
+
+
+def refresh_revocations() -> None:
+    """Reload the filter from the database and drop expired revocations."""
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        rows = (
+            db.query(TokenRevocation.user_id, TokenRevocation.revoked_before)
+            .filter(TokenRevocation.expires_at > now)
+            .all()
+        )
+    lifetime = MAX_TOKEN_LIFETIME.total_seconds()
+    changed = revocation_filter.replace(
+        (user_id, revoked_before, revoked_before + lifetime) for user_id, revoked_before in rows
+    )
+    # Principals cached before another process revoked them
+    for user_id in changed:
+        token_cache.invalidate_user(user_id)
+
+    with SessionLocal() as db:
+        run_write(db, _purge_expired, now)
+
+
+revocation_refresher = PeriodicTask("revocation-refresh", JWT_REVOCATION_REFRESH_SECONDS, refresh_revocations)
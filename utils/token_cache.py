@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from core.config import TOKEN_CACHE_MAX_SIZE
+
+
+class TokenCache:
+    """Bounded LRU cache of verified token principals.
+
+    Entries are keyed by the token digest and expire together with the
+    token's ``exp`` claim. A reverse index from ``user_id`` to digests lets
+    login, logout and role changes drop every cached token of a user.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            principal, expires_at = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(principal)
+
+    def set(self, key: str, principal: dict, expires_at: float) -> None:
+        if expires_at <= time.time():
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (dict(principal), expires_at)
+            self._by_user.setdefault(principal["user_id"], set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _remove(self, key: str) -> None:
+        principal, _ = self._entries.pop(key)
+        keys = self._by_user.get(principal["user_id"])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[principal["user_id"]]
+
+
+token_cache = TokenCache(max_size=TOKEN_CACHE_MAX_SIZE)
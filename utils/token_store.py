@@ -0,0 +1,130 @@
+"""Storage of issued tokens, keyed by digest.
+
+Only the SHA-256 digest of a JWT is stored (see `token_digest`), so a leaked
+table does not leak usable tokens and lookups hit a fixed-length unique index.
+Write methods take the session of the surrounding write unit and only flush;
+the caller commits. The in-memory backend ignores the session and is meant for
+tests and single-process development.
+"""
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from core.config import TOKEN_STORE_BACKEND, TOKEN_STORE_SWEEP_BATCH_SIZE, TOKEN_STORE_SWEEP_SECONDS
+from database.models import Token
+from database.session import SessionLocal
+from database.write_queue import run_write
+from utils.auth_utils import token_digest
+from utils.periodic import PeriodicTask
+
+# (token_type, raw token, expires_at)
+IssuedToken = Tuple[str, str, datetime]
+
+
+class TokenStore(ABC):
+    @abstractmethod
+    def replace_user_tokens(self, db: Session, user_id: int, tokens: Iterable[IssuedToken]) -> None:
+        """Drop every token of the user and store ``tokens`` instead."""
+
+    @abstractmethod
+    def lookup(self, db: Session, digest: str) -> Optional[int]:
+        """Return the user id of a stored token, or None. Expiry is left to the JWT ``exp`` check."""
+
+    @abstractmethod
+    def revoke_user(self, db: Session, user_id: int) -> int:
+        """Delete every token of the user. Returns the number deleted."""
+
+    @abstractmethod
+    def purge_expired(self, db: Session, now: datetime, limit: int) -> int:
+        """Delete up to ``limit`` tokens that expired before ``now``."""
+
+
+class SqlTokenStore(TokenStore):
+    def replace_user_tokens(self, db: Session, user_id: int, tokens: Iterable[IssuedToken]) -> None:
+        db.execute(delete(Token).where(Token.user_id == user_id))
+        db.add_all([
+            Token(user_id=user_id, token_type=token_type, token_hash=token_digest(token), expires_at=expires_at)
+            for token_type, token, expires_at in tokens
+        ])
+        db.flush()
+
+    def lookup(self, db: Session, digest: str) -> Optional[int]:
+        return db.scalar(select(Token.user_id).where(Token.token_hash == digest))
+
+    def revoke_user(self, db: Session, user_id: int) -> int:
+        return db.execute(delete(Token).where(Token.user_id == user_id)).rowcount
+
+    def purge_expired(self, db: Session, now: datetime, limit: int) -> int:
+        # Bounded batches keep each delete transaction, and the write lock, short
+        batch = select(Token.token_id).where(Token.expires_at <= now).limit(limit).scalar_subquery()
+        return db.execute(delete(Token).where(Token.token_id.in_(batch))).rowcount
+
+
+class MemoryTokenStore(TokenStore):
+    def __init__(self):
+        self._tokens: Dict[str, Tuple[int, str, datetime]] = {}
+        self._by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def replace_user_tokens(self, db, user_id: int, tokens: Iterable[IssuedToken]) -> None:
+        with self._lock:
+            self._revoke(user_id)
+            for token_type, token, expires_at in tokens:
+                digest = token_digest(token)
+                self._tokens[digest] = (user_id, token_type, expires_at)
+                self._by_user.setdefault(user_id, set()).add(digest)
+
+    def lookup(self, db, digest: str) -> Optional[int]:
+        with self._lock:
+            entry = self._tokens.get(digest)
+        return entry[0] if entry is not None else None
+
+    def revoke_user(self, db, user_id: int) -> int:
+        with self._lock:
+            return self._revoke(user_id)
+
+    def purge_expired(self, db, now: datetime, limit: int) -> int:
+        with self._lock:
+            expired = [digest for digest, (_, _, expires_at) in self._tokens.items() if expires_at <= now][:limit]
+            for digest in expired:
+                user_id = self._tokens.pop(digest)[0]
+                digests = self._by_user.get(user_id)
+                digests.discard(digest)
+                if not digests:
+                    del self._by_user[user_id]
+            return len(expired)
+
+    def _revoke(self, user_id: int) -> int:
+        digests = self._by_user.pop(user_id, set())
+        for digest in digests:
+            del self._tokens[digest]
+        return len(digests)
+
+
+def make_token_store(backend: str) -> TokenStore:
+    if backend == "sql":
+        return SqlTokenStore()
+    if backend == "memory":
+        return MemoryTokenStore()
+    raise ValueError(f"Unknown token store backend {backend!r}")
+
+
+token_store = make_token_store(TOKEN_STORE_BACKEND)
+
+
+def sweep_expired(batch_size: int = TOKEN_STORE_SWEEP_BATCH_SIZE) -> int:
+    """Delete every expired token, one committed batch at a time."""
+    total = 0
+    while True:
+        with SessionLocal() as db:
+            count = run_write(db, token_store.purge_expired, datetime.utcnow(), batch_size)
+        total += count
+        if count < batch_size:
+            return total
+
+
+token_sweeper = PeriodicTask("token-sweeper", TOKEN_STORE_SWEEP_SECONDS, sweep_expired)